@@ -1,13 +1,32 @@
-from .core.engine import SentinelOwl
-from .config import AppConfig
-from .cli import cli
-
 __version__ = "0.1.0"
-__all__ = ["SentinelOwl", "AppConfig"]
+__all__ = ["SentinelOwl", "SentinelFleet", "AppConfig"]
+
+
+def __getattr__(name):
+    # Heavy subsystems (OpenCV, numpy, pydantic, tornado) load on first use
+    if name == "SentinelOwl":
+        from .core.engine import SentinelOwl
+
+        return SentinelOwl
+    if name == "SentinelFleet":
+        from .core.fleet import SentinelFleet
+
+        return SentinelFleet
+    if name == "AppConfig":
+        from .config import AppConfig
+
+        return AppConfig
+    if name == "cli":
+        from .cli import cli
+
+        return cli
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def main():
     """Entry point for the SentinelOwl CLI"""
+    from .cli import cli
+
     cli()
 
 
@@ -1,7 +1,4 @@
 import click
-from sentinelowl.config import AppConfig  # 改为绝对导入
-from sentinelowl.core.engine import SentinelOwl  # 改为绝对导入
-import asyncio
 
 
 @click.group()
@@ -19,6 +16,10 @@ def cli():
 @click.option("--interval", default=5, type=int, help="Detection interval in seconds")
 def start(camera_url, interval):
     """Start the SentinelOwl monitoring service"""
+    import asyncio
+    from sentinelowl.config import AppConfig
+    from sentinelowl.core.engine import SentinelOwl
+
     config = AppConfig(camera={"url": camera_url}, detection={"interval": interval})
 
     owl = SentinelOwl(config)
@@ -29,6 +30,29 @@ def start(camera_url, interval):
         print("\n🦉 SentinelOwl stopped.")
 
 
+@cli.command()
+@click.argument("config_path", type=click.Path(exists=True, dir_okay=False))
+def fleet(config_path):
+    """Monitor every printer listed under "fleet" in a JSON config file"""
+    import asyncio
+    from pydantic import ValidationError
+    from sentinelowl.config import AppConfig
+    from sentinelowl.core.fleet import SentinelFleet
+
+    try:
+        with open(config_path) as f:
+            config = AppConfig.model_validate_json(f.read())
+        owls = SentinelFleet(config)
+    except (ValidationError, ValueError) as e:
+        raise click.ClickException(str(e))
+
+    print(f"🦉 Starting SentinelOwl fleet of {len(owls.members)} printers...")
+    try:
+        asyncio.run(owls.run())
+    except KeyboardInterrupt:
+        print("\n🦉 SentinelOwl stopped.")
+
+
 @cli.command()
 def version():
     """Show the version of SentinelOwl"""
@@ -47,5 +71,171 @@ def validate(camera_url, model_path):
     main(camera_url, model_path)
 
 
+@cli.command()
+@click.option(
+    "--source",
+    default="synthetic://1280x720",
+    help="synthetic://WIDTHxHEIGHT or a local video file",
+)
+@click.option(
+    "--model",
+    default="placeholder",
+    help='"placeholder" or the path to an ONNX model',
+)
+@click.option("--frames", default=200, type=int, help="Number of frames to measure")
+@click.option("--json", "json_path", default=None, help="Write the report as JSON")
+@click.option("--min-fps", default=None, type=float, help="Fail below this FPS")
+@click.option(
+    "--max-p95-ms", default=None, type=float, help="Fail if any stage p95 exceeds this"
+)
+@click.option(
+    "--max-rss-mb", default=None, type=float, help="Fail if peak RSS exceeds this"
+)
+def bench(source, model, frames, json_path, min_fps, max_p95_ms, max_rss_mb):
+    """Benchmark the capture and detection pipeline"""
+    from sentinelowl.scripts.bench import main
+
+    if not main(source, model, frames, json_path, min_fps, max_p95_ms, max_rss_mb):
+        raise SystemExit(1)
+
+
+@cli.command()
+@click.option(
+    "--source",
+    default="synthetic://640x480",
+    help="synthetic://WIDTHxHEIGHT or a local video file",
+)
+@click.option(
+    "--model",
+    default="placeholder",
+    help='"placeholder" or the path to an ONNX model',
+)
+@click.option("--duration", default=1800.0, type=float, help="Soak length in seconds")
+@click.option("--rate", default=20.0, type=float, help="Detections per second")
+@click.option(
+    "--sample-interval", default=10.0, type=float, help="Seconds between samples"
+)
+@click.option("--clients", default=2, type=int, help="Simulated websocket clients")
+@click.option("--threaded", is_flag=True, help="Read the camera on a reader thread")
+@click.option("--json", "json_path", default=None, help="Write the report as JSON")
+@click.option("--max-rss-slope", default=64.0, type=float, help="Fail above MB/hour")
+@click.option(
+    "--max-traced-slope",
+    default=8.0,
+    type=float,
+    help="Fail if traced Python memory grows faster (MB/hour)",
+)
+@click.option("--max-fd-slope", default=10.0, type=float, help="Fail above FDs/hour")
+@click.option(
+    "--max-thread-slope", default=10.0, type=float, help="Fail above threads/hour"
+)
+def soak(
+    source,
+    model,
+    duration,
+    rate,
+    sample_interval,
+    clients,
+    threaded,
+    json_path,
+    max_rss_slope,
+    max_traced_slope,
+    max_fd_slope,
+    max_thread_slope,
+):
+    """Run the engine for a long stretch and fail on resource growth"""
+    from sentinelowl.scripts.soak import main
+
+    max_slopes = {
+        "rss_mb": max_rss_slope,
+        "traced_mb": max_traced_slope,
+        "fds": max_fd_slope,
+        "threads": max_thread_slope,
+    }
+    try:
+        passed = main(
+            source,
+            model,
+            duration,
+            rate,
+            sample_interval,
+            clients,
+            threaded,
+            json_path,
+            max_slopes,
+        )
+    except (FileNotFoundError, ValueError) as e:
+        raise click.ClickException(str(e))
+    if not passed:
+        raise SystemExit(1)
+
+
+@cli.command("optimize-model")
+@click.argument("model_path")
+@click.option(
+    "--quantize",
+    type=click.Choice(["none", "dynamic", "static"]),
+    default="none",
+    help="Produce an int8 variant before optimizing",
+)
+@click.option(
+    "--calibration",
+    default=None,
+    help="Image directory or video for static quantization",
+)
+@click.option(
+    "--frames", default=None, help="Image directory or video to compare accuracy on"
+)
+@click.option(
+    "--graph-optimization",
+    type=click.Choice(["basic", "extended", "all"]),
+    default="all",
+    help="ONNX Runtime optimization level to bake into the cached graph",
+)
+def optimize_model(model_path, quantize, calibration, frames, graph_optimization):
+    """Quantize a model and cache its optimized graph for fast startup"""
+    from sentinelowl.scripts.optimize_model import main
+
+    try:
+        main(model_path, quantize, calibration, frames, graph_optimization)
+    except (FileNotFoundError, RuntimeError, ValueError) as e:
+        raise click.ClickException(str(e))
+
+
+@cli.command()
+@click.argument("footage")
+@click.option("--labels", default=None, help="CSV of source,onset_frame")
+@click.option(
+    "--config",
+    "config_path",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON app config whose model section is evaluated",
+)
+@click.option(
+    "--model",
+    default=None,
+    help='Override the configured model: "placeholder" or a model path',
+)
+@click.option("--batch-size", default=32, type=int, help="Frames per inference batch")
+@click.option("--stride", default=1, type=int, help="Evaluate every Nth frame")
+@click.option(
+    "--workers", default=None, type=int, help="Decode processes (default: all cores)"
+)
+@click.option("--json", "json_path", default=None, help="Write the report as JSON")
+def evaluate(
+    footage, labels, config_path, model, batch_size, stride, workers, json_path
+):
+    """Score recorded footage and sweep alarm thresholds"""
+    from sentinelowl.scripts.evaluate import main
+
+    try:
+        main(
+            footage, labels, model, batch_size, stride, workers, json_path, config_path
+        )
+    except (FileNotFoundError, ValueError) as e:
+        raise click.ClickException(str(e))
+
+
 if __name__ == "__main__":
     cli()
@@ -1,12 +1,29 @@
+from typing import Dict, List, Optional, Tuple
 from pydantic import BaseModel
 
 
 class CameraConfig(BaseModel):
-    """Configuration for camera input"""
+    """Configuration for camera input
+
+    HTTP "mjpeg" and "snapshot" cameras are read natively either way: with
+    ``threaded`` a receiver thread keeps the newest frame, without it each
+    capture reads the next MJPEG part or polls the snapshot URL once.
+    Threaded "rtsp" cameras decode through ffmpeg when it is installed;
+    anything else goes through OpenCV.
+    """
 
     url: str = "http://localhost:8080/?action=stream"
-    type: str = "mjpeg"  # or "rtsp"
+    type: str = "mjpeg"  # or "rtsp", "snapshot", "synthetic", "file" (looped)
     reconnect_interval: int = 5
+    timeout: float = 10.0  # Network read/connect timeout in seconds
+    decode_scale: int = 1  # Decode downscale factor: 1, 2, 4 or 8
+    poll_interval: float = 1.0  # Seconds between requests for "snapshot" cameras
+    threaded: bool = False  # Drain the stream on a background reader thread
+    reconnect_max_interval: float = 60.0  # Backoff ceiling for threaded mode
+    reconnect_jitter: float = 0.2  # Random +/- fraction applied to each backoff
+    decode_mode: str = "all"  # Threaded "rtsp" via ffmpeg: "all" or "keyframes"
+    frame_step: int = 1  # "rtsp" via ffmpeg: keep every Nth decoded frame
+    ffmpeg_path: str = "ffmpeg"  # "rtsp" falls back to OpenCV if not found
 
 
 class DetectionConfig(BaseModel):
@@ -15,14 +32,93 @@ class DetectionConfig(BaseModel):
     interval: int = 5  # Detection interval in seconds
     warning_threshold: float = 0.7
     critical_threshold: float = 0.85
+    min_interval: float = 1.0  # Fastest adaptive interval, near the warning level
+    max_interval: float = 30.0  # Slowest adaptive interval, for a healthy print
+    smoothing: float = 0.5  # EWMA weight of the newest confidence (0.0 to 1.0]
+    hysteresis: float = 0.05  # Margin below a threshold before an alarm clears
+    motion_gate: bool = False  # Skip inference when the scene has not changed
+    motion_threshold: float = 0.02  # Mean abs. thumbnail difference (0.0 to 1.0)
+    motion_thumbnail_width: int = 32  # Width of the grayscale comparison thumbnail
+    motion_refresh_interval: int = 12  # Force inference at least every N ticks
+    queue_size: int = 1  # Frames buffered between pipeline stages (drop-oldest)
+    suspend_when_idle: bool = True  # Release camera and model between print jobs
+    analyze_on_layer_change: bool = True  # Run an extra pass on each new layer
 
 
 class ModelConfig(BaseModel):
     """Configuration for AI models"""
 
-    type: str = "placeholder"  # Model type (e.g., "placeholder", "onnx")
+    type: str = "placeholder"  # Model type: "placeholder", "onnx" or "yolo"
     warning_threshold: float = 0.7
     critical_threshold: float = 0.85
+    path: Optional[str] = None  # Path to the model file (required for "onnx")
+    class_index: Optional[int] = None  # Defect class; required for multi-class outputs
+    intra_op_threads: int = 0  # 0 lets ONNX Runtime pick
+    inter_op_threads: int = 0  # 0 lets ONNX Runtime pick
+    graph_optimization: str = "all"  # "disable", "basic", "extended" or "all"
+    use_optimized_cache: bool = True  # Load the graph cached by optimize-model
+    roi: Optional[Tuple[int, int, int, int]] = None  # Crop (x, y, w, h) before resize
+    letterbox: bool = False  # Keep aspect ratio and pad instead of stretching
+    workers: int = 0  # Inference worker processes; 0 runs the model in-process
+    frame_slots: int = 0  # Shared-memory frame slots; 0 means 2 per worker
+    max_frame_bytes: int = 1920 * 1080 * 3  # Size of each frame slot
+    prefilter: Optional["ModelConfig"] = None  # Cheap first stage of a cascade
+    prefilter_threshold: float = 0.3  # Prefilter score that escalates a frame
+    class_names: List[str] = []  # Detector classes, in output order
+    class_thresholds: Dict[str, Tuple[float, float]] = {}  # Name → (warn, crit)
+    box_format: str = "yolov8"  # Raw head layout: "yolov8" or "yolov5"
+    score_threshold: float = 0.25  # Detector candidates below this are dropped
+    iou_threshold: float = 0.45  # NMS overlap above which boxes are merged
+    max_detections: int = 100  # Boxes kept per frame after NMS
+
+
+class PrinterConfig(BaseModel):
+    """Configuration for the Moonraker connection"""
+
+    host: str = "localhost"
+    port: int = 7125
+    api_key: Optional[str] = None  # Sent as X-Api-Key when set
+    timeout: float = 5.0  # Request timeout before falling back to HTTP
+    reconnect_interval: float = 1.0  # Initial websocket reconnect backoff
+    reconnect_max_interval: float = 30.0  # Websocket reconnect backoff ceiling
+
+
+class EvidenceConfig(BaseModel):
+    """Configuration for the on-disk ring buffer of recent frames"""
+
+    enabled: bool = False
+    path: str = "/tmp/sentinelowl/frames.ring"  # Memory-mapped ring buffer file
+    capacity: int = 64  # Number of most recent analysed frames kept
+    slot_bytes: int = 1920 * 1080 * 3  # Largest frame (raw or compressed) stored
+    clip_dir: str = "/tmp/sentinelowl/clips"  # Where warning/critical clips go
+    clip_fps: float = 5.0
+
+
+class HistoryConfig(BaseModel):
+    """Configuration for the in-process detection history"""
+
+    enabled: bool = True
+    chunk_size: int = 65536  # Samples per preallocated chunk
+    max_samples: int = 1_000_000  # ~9 MB; the oldest chunks are dropped beyond
+    path: Optional[str] = None  # Append-only file to persist and reload history
+
+
+class SnapshotConfig(BaseModel):
+    """Annotated snapshot and MJPEG stream of the analysed frames"""
+
+    jpeg_quality: int = 80
+    linger: float = 10.0  # Keep encoding this long after the last snapshot request
+    timeout: float = 5.0  # Longest wait for a fresh frame before serving a stale one
+
+
+class FleetPrinterConfig(BaseModel):
+    """One printer of a fleet; unset sections fall back to AppConfig's"""
+
+    name: str  # Unique key of the printer in the plugin API
+    camera: CameraConfig = CameraConfig()
+    printer: PrinterConfig = PrinterConfig()
+    detection: Optional[DetectionConfig] = None
+    model: Optional[ModelConfig] = None  # Printers with equal models share one
 
 
 class AppConfig(BaseModel):
@@ -31,3 +127,8 @@ class AppConfig(BaseModel):
     camera: CameraConfig = CameraConfig()
     detection: DetectionConfig = DetectionConfig()
     model: ModelConfig = ModelConfig()
+    printer: PrinterConfig = PrinterConfig()
+    evidence: EvidenceConfig = EvidenceConfig()
+    history: HistoryConfig = HistoryConfig()
+    snapshot: SnapshotConfig = SnapshotConfig()
+    fleet: List[FleetPrinterConfig] = []  # Monitor these printers in one process
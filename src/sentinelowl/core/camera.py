@@ -1,7 +1,13 @@
-import cv2
 import time
+import threading
 from typing import Optional, Tuple
 from ..config import CameraConfig
+from ..utils.backoff import backoff_delay
+from .sources import CapturedFrame, is_buffered_source, open_source
+
+MIN_RECONNECT_DELAY = (
+    0.1  # Floor for reader-thread retries, even when the interval is 0
+)
 
 
 class CameraConnectionError(Exception):
@@ -11,19 +17,48 @@ class CameraConnectionError(Exception):
 
 
 class CameraHandler:
-    """Handler for camera input"""
+    """Handler for camera input
+
+    By default frames are read synchronously in ``capture_frame()``. With
+    ``CameraConfig.threaded`` a reader thread continuously drains the stream
+    into a single latest-frame slot and handles reconnects with exponential
+    backoff, so callers never block on the camera. Buffered sources (see
+    ``sources.is_buffered_source``) already receive in the background and
+    decode on demand, so they are used directly instead of a reader thread.
+    """
 
-    def __init__(self, config: CameraConfig):
+    def __init__(self, config: CameraConfig, performance=None):
         self._retry_count = 0
         self.max_retries = 3  # ✅ 新增最大重试次数
         self.config = config
+        self.performance = performance  # Passed on to sources that time decoding
         self.cap = None
-        self._initialize_camera()
+
+        self._latest: Optional[CapturedFrame] = None
+        self._sequence = 0
+        self._frame_ready = threading.Condition()
+        self._stop_event = threading.Event()
+        self._reader: Optional[threading.Thread] = None
+
+        self._buffered = config.threaded and is_buffered_source(config)
+        if config.threaded and not self._buffered:
+            self._reader = threading.Thread(
+                target=self._reader_loop, name="sentinelowl-camera", daemon=True
+            )
+            self._reader.start()
+        else:
+            self._initialize_camera()
+
+    def _open_capture(self):
+        """Open the underlying capture source"""
+        return open_source(self.config)
 
     def _initialize_camera(self):
         """Initialize the camera connection"""
         try:
-            self.cap = cv2.VideoCapture(self.config.url)
+            self.cap = self._open_capture()
+            if hasattr(self.cap, "performance"):
+                self.cap.performance = self.performance
             if not self.cap.isOpened():
                 raise RuntimeError(f"Failed to open camera: {self.config.url}")
             print(f"🟢 Camera connected: {self.config.url}")
@@ -33,6 +68,10 @@ class CameraHandler:
 
     def capture_frame(self) -> Optional[Tuple[bool, any]]:
         """Capture a single frame from the video stream"""
+        if self.config.threaded:
+            latest = self.latest_frame()
+            return latest.image if latest is not None else None
+
         if self.cap is None:
             self._reconnect_camera()
             if self.cap is None:
@@ -46,8 +85,92 @@ class CameraHandler:
 
         return frame
 
+    def latest_frame(self) -> Optional[CapturedFrame]:
+        """Return the freshest frame from the reader thread without waiting"""
+        if self._buffered:
+            return self.cap.latest() if self.cap is not None else None
+        return self._latest
+
+    def latest_encoded(self) -> Optional[Tuple[bytes, int, float]]:
+        """(compressed bytes, sequence, timestamp) from buffered sources, else None"""
+        if self._buffered and self.cap is not None:
+            return self.cap.latest_encoded()
+        return None
+
+    def wait_frame(
+        self, after_sequence: int = 0, timeout: Optional[float] = None
+    ) -> Optional[CapturedFrame]:
+        """Block until a frame newer than ``after_sequence`` is available"""
+        if self._buffered:
+            if self.cap is None:
+                return None
+            return self.cap.wait(after_sequence, timeout=timeout)
+
+        with self._frame_ready:
+            self._frame_ready.wait_for(
+                lambda: self._stop_event.is_set()
+                or (
+                    self._latest is not None and self._latest.sequence > after_sequence
+                ),
+                timeout=timeout,
+            )
+            latest = self._latest
+        if latest is None or latest.sequence <= after_sequence:
+            return None
+        return latest
+
+    def _publish(self, frame):
+        """Replace the latest-frame slot and wake up waiters"""
+        self._sequence += 1
+        with self._frame_ready:
+            self._latest = CapturedFrame(frame, self._sequence, time.monotonic())
+            self._frame_ready.notify_all()
+
+    def _backoff_base(self) -> float:
+        return max(self.config.reconnect_interval, MIN_RECONNECT_DELAY)
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter for reconnect attempt ``attempt``"""
+        delay = backoff_delay(
+            attempt,
+            self._backoff_base(),
+            self.config.reconnect_max_interval,
+            self.config.reconnect_jitter,
+        )
+        return max(delay, MIN_RECONNECT_DELAY)
+
+    def _reader_loop(self):
+        """Continuously drain the stream into the latest-frame slot"""
+        attempt = 0
+        while not self._stop_event.is_set():
+            if self.cap is None:
+                self._initialize_camera()
+
+            ret, frame = self.cap.read() if self.cap is not None else (False, None)
+            if not ret:
+                if self.cap is not None:
+                    self.cap.release()
+                    self.cap = None
+                delay = self._backoff_delay(attempt)
+                if (
+                    self._backoff_base() * 2**attempt
+                    < self.config.reconnect_max_interval
+                ):
+                    attempt += 1  # Stop counting once the ceiling is reached
+                print(f"Retrying camera connection in {delay:.1f} seconds...")
+                self._stop_event.wait(delay)
+                continue
+
+            attempt = 0
+            self._publish(frame)
+
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
     def _reconnect_camera(self):
         if self._retry_count >= self.max_retries:
+            self._retry_count = 0  # The next capture starts a new round
             raise CameraConnectionError(
                 f"Failed to reconnect after {self.max_retries} attempts"
             )
@@ -65,6 +188,15 @@ class CameraHandler:
 
     def release(self):
         """Release the camera resources"""
+        if self._reader is not None:
+            self._stop_event.set()
+            with self._frame_ready:
+                self._frame_ready.notify_all()
+            self._reader.join(timeout=5)
+            self._reader = None
+            print("Camera resources released.")
+            return
+
         if self.cap is not None:
             self.cap.release()
             print("Camera resources released.")
@@ -1,7 +1,11 @@
-import random
-from typing import NamedTuple
+import time
+from typing import NamedTuple, Optional
+import numpy as np
 from ..config import DetectionConfig
-from .models import PlaceholderModel
+from .models import create_model
+from .motion import MotionGate
+from .performance import PerformanceMonitor
+from .preprocess import Preprocessor
 
 
 class DetectionResult(NamedTuple):
@@ -10,20 +14,133 @@ class DetectionResult(NamedTuple):
     confidence: float  # Confidence score (0.0 to 1.0)
     is_warning: bool  # Whether the result is a warning
     is_critical: bool  # Whether the result is critical
+    boxes: Optional[np.ndarray] = None  # (N, 4) x1, y1, x2, y2 in frame pixels
+    scores: Optional[np.ndarray] = None  # (N,) box scores, highest first
+    classes: Optional[np.ndarray] = None  # (N,) class indices
+    defect_type: Optional[str] = None  # Class name of the highest-scoring box
+
+
+class PreparedFrame(NamedTuple):
+    """Frame after the motion gate and (when possible) preprocessing"""
+
+    input: object  # Model input tensor, or the raw frame
+    skip: bool  # The motion gate saw no change; reuse the last result
+    reference: Optional[np.ndarray] = None  # Gate thumbnail, committed by infer()
 
 
 class DefectDetector:
-    """Defect detection handler"""
+    """Defect detection handler
 
-    def __init__(self, config: DetectionConfig):
-        self.model = PlaceholderModel(
-            warning_threshold=config.warning_threshold,
-            critical_threshold=config.critical_threshold,
-        )
+    ``analyze()`` handles a frame in one call. For pipelined use it is split
+    into ``prepare()`` (motion gate and preprocessing) and ``infer()``,
+    which may run concurrently on different threads: models exposing a
+    ``preprocessor`` get a second, private one for ``prepare()``, so the
+    tensor handed to ``infer()`` never aliases the model's bound input.
+    The motion gate only adopts a frame as its reference in ``infer()``, so
+    frames dropped between the stages do not count as analysed.
+    """
+
+    def __init__(
+        self,
+        config: DetectionConfig,
+        gate: Optional[MotionGate] = None,
+        performance: Optional[PerformanceMonitor] = None,
+        model=None,
+    ):
+        # A model passed in is shared with other detectors and not closed here
+        self._owns_model = model is None
+        self.model = create_model(config) if model is None else model
+        self.gate = gate
+        self.performance = performance
+        self.last_result: Optional[DetectionResult] = None
+        self.last_skipped = False  # Whether the last analyze() reused a result
+        self._preprocessor = None
+        model_preprocessor = getattr(self.model, "preprocessor", None)
+        if model_preprocessor is not None:
+            self._preprocessor = Preprocessor(
+                model_preprocessor.output.shape,
+                dtype=model_preprocessor.output.dtype,
+                roi=model_preprocessor.roi,
+                letterbox=model_preprocessor.letterbox,
+            )
 
     def analyze(self, frame) -> DetectionResult:
         """Analyze a frame for potential defects"""
+        if self.gate is not None:
+            changed = self.gate.should_analyze(frame)
+            if not changed and self.last_result is not None:
+                self.last_skipped = True
+                return self.last_result
+        return self._predict(frame)
+
+    def prepare(self, frame) -> PreparedFrame:
+        """Motion-gate and preprocess a frame ahead of ``infer()``"""
+        reference = None
+        if self.gate is not None:
+            if not self.gate.should_analyze(frame, commit=False):
+                return PreparedFrame(frame, skip=True)
+            reference = self.gate.thumbnail()
+        if self._preprocessor is None:
+            return PreparedFrame(frame, skip=False, reference=reference)
+        start = time.perf_counter()
+        tensor = self._preprocessor(frame).copy()
+        if self.performance is not None:
+            self.performance.record_stage("preprocess", time.perf_counter() - start)
+        return PreparedFrame(tensor, skip=False, reference=reference)
+
+    def infer(self, prepared: PreparedFrame) -> DetectionResult:
+        """Run the model on a ``prepare()``d frame"""
+        if prepared.skip and self.last_result is not None:
+            self.last_skipped = True
+            return self.last_result
+        if prepared.reference is not None:
+            self.gate.commit(prepared.reference)
+        preprocessed = self._preprocessor is not None and not prepared.skip
+        return self._predict(prepared.input, preprocessed)
+
+    def _predict(self, frame, preprocessed: bool = False) -> DetectionResult:
+        start = time.perf_counter()
         confidence, is_warning, is_critical = self.model.predict(frame)
-        return DetectionResult(
+        if self.performance is not None:
+            timings = getattr(self.model, "timings", None)
+            if timings:
+                for stage, seconds in timings.items():
+                    if not (preprocessed and stage == "preprocess"):
+                        self.performance.record_stage(stage, seconds)
+            else:
+                self.performance.record_stage("inference", time.perf_counter() - start)
+            escalated = getattr(self.model, "last_escalated", None)
+            if escalated is not None:
+                self.performance.record_escalation(escalated)
+        self.last_skipped = False
+        self.last_result = DetectionResult(
             confidence=confidence, is_warning=is_warning, is_critical=is_critical
         )
+        detections = getattr(self.model, "last_detections", None)
+        if detections is not None:
+            self.last_result = self._with_boxes(detections, preprocessed)
+        return self.last_result
+
+    def _with_boxes(self, detections, preprocessed: bool) -> DetectionResult:
+        """Attach detector boxes, mapped from model input to frame pixels"""
+        preprocessor = self._preprocessor
+        if not preprocessed:
+            preprocessor = getattr(self.model, "box_preprocessor", None)
+            preprocessor = preprocessor or self.model.preprocessor
+        (sx, sy), (ox, oy) = preprocessor.scale, preprocessor.offset
+        boxes = (detections.boxes - np.array([ox, oy, ox, oy], np.float32)) / (
+            np.array([sx, sy, sx, sy], np.float32)
+        )
+        names = getattr(self.model, "class_names", [])
+        top = int(detections.classes[0]) if len(detections.classes) else None
+        return self.last_result._replace(
+            boxes=boxes,
+            scores=detections.scores,
+            classes=detections.classes,
+            defect_type=(names[top] if top is not None and top < len(names) else None),
+        )
+
+    def close(self):
+        """Release the model, unless it is shared"""
+        if self._owns_model:
+            self.model.close()
@@ -1,60 +1,381 @@
+import os
 import time
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
-from typing import NamedTuple
-from ..config import AppConfig
+from typing import Any, Callable, Dict, NamedTuple, Optional
+from ..config import AppConfig, ModelConfig
 from .camera import CameraHandler  # 新增关键导入
 from .detector import DefectDetector
+from .evidence import FrameRingBuffer
+from .history import (
+    FLAG_ALARM_CRITICAL,
+    FLAG_ALARM_WARNING,
+    FLAG_CRITICAL,
+    FLAG_WARNING,
+    DetectionHistory,
+)
+from .motion import MotionGate
 from .performance import PerformanceMonitor
+from .pipeline import FramePipeline
+from .scheduler import AdaptiveScheduler
+from .slots import PRIORITY_ALARM, PRIORITY_NORMAL
+from .snapshot import SnapshotCache
+from ..services.printer import ACTIVE_PRINT_STATES, PrinterController
+
+
+def alarm_model_config(config: AppConfig) -> ModelConfig:
+    """``config.model`` with the alarm thresholds of ``config.detection``
+
+    Detectors rescale per-class thresholds onto the model's global pair and
+    the scheduler raises alarms on that score with the detection pair, so
+    the model is always built with the latter.
+    """
+    return config.model.model_copy(
+        update={
+            "warning_threshold": config.detection.warning_threshold,
+            "critical_threshold": config.detection.critical_threshold,
+        }
+    )
 
 
 class SentinelOwl:
-    """Main application class for print monitoring"""
+    """Main application class for print monitoring
+
+    With ``DetectionConfig.suspend_when_idle`` the engine follows Moonraker's
+    ``print_stats`` state: outside of a running job the camera and model are
+    released and the monitor loop sleeps until the next job starts. Until
+    Moonraker reports a state the engine stays active.
+
+    In fleet mode (see ``SentinelFleet``) the engine is handed a ``model``
+    shared with other printers and the ``slots`` scheduler that rations it.
 
-    def __init__(self, config):
+    ``on_event`` is called with a message dict whenever the alarm rises to
+    "warning" or "critical" and when an emergency stop is sent, e.g. to push
+    it to websocket clients without waiting for the next status tick.
+    """
+
+    def __init__(self, config, model=None, slots=None, name: str = "default"):
         self.config = config
-        self.camera = CameraHandler(config.camera)
-        self.detector = DefectDetector(config.model)
-        self.printer = PrinterController()
-        self.plugin = AIGuardPlugin(config)
+        self.name = name
+        self.model = model
+        self.slots = slots
+        self.performance = PerformanceMonitor()
+        self.camera = None
+        self.detector = None
+        self._open_pipeline()
+        self.scheduler = AdaptiveScheduler.from_config(config.detection)
+        self.latest_result = None
+        self.printer = PrinterController.from_config(
+            config.printer, performance=self.performance
+        )
+        self.evidence = (
+            FrameRingBuffer.from_config(config.evidence)
+            if config.evidence.enabled
+            else None
+        )
+        self.history = (
+            DetectionHistory.from_config(config.history)
+            if config.history.enabled
+            else None
+        )
+        self.snapshots = SnapshotCache.from_config(
+            config.snapshot, on_demand=self.request_analysis
+        )
+        self.last_clip = None  # Path of the most recent evidence clip
+        self.on_event: Optional[Callable[[Dict[str, Any]], None]] = None
+        self._dumps = set()  # Evidence clips still being written
+        self._alarm_level = 0  # 0 normal, 1 warning, 2 critical
+        self._active = asyncio.Event()
+        self._active.set()
+        self._idle = asyncio.Event()  # Inverse of _active, to wake the supervisor
+        self._wakeup = asyncio.Event()
+
+    def _open_pipeline(self):
+        """Open the camera and load the model"""
+        self.camera = CameraHandler(self.config.camera, performance=self.performance)
+        gate = (
+            MotionGate.from_config(self.config.detection)
+            if self.config.detection.motion_gate
+            else None
+        )
+        self.detector = DefectDetector(
+            alarm_model_config(self.config),
+            gate=gate,
+            performance=self.performance,
+            model=self.model,
+        )
+
+    def _close_pipeline(self):
+        """Release the camera and unload the model"""
+        if self.camera is not None:
+            self.camera.release()
+            self.camera = None
+        if self.detector is not None:
+            self.detector.close()
+            self.detector = None
+
+    @property
+    def is_active(self) -> bool:
+        """Whether frames are currently being analysed"""
+        return self._active.is_set()
+
+    def on_print_state(self, state: str):
+        """Resume on job start, suspend once no job is running"""
+        if not self.config.detection.suspend_when_idle:
+            return
+        if state in ACTIVE_PRINT_STATES:
+            self._idle.clear()
+            self._active.set()
+        else:
+            self._active.clear()
+            self._idle.set()
+        self._wakeup.set()
+
+    def on_layer_change(self, layer: int):
+        """Analyse the new layer right away instead of at the next tick"""
+        if self.config.detection.analyze_on_layer_change and self.is_active:
+            self._wakeup.set()
+
+    def request_analysis(self):
+        """Analyse a frame right away, e.g. for a snapshot viewer"""
+        if self.is_active:
+            self._wakeup.set()
 
     async def run(self):
-        """Start monitoring and plugin services"""
-        await asyncio.gather(self._monitor_loop(), self._serve_plugin())
+        """Connect to Moonraker and start monitoring"""
+        await self.printer.start()
+        self.printer.watch_print_state(self.on_print_state, self.on_layer_change)
+        try:
+            await self._monitor_loop()
+        finally:
+            await self.printer.close()
+            self._close_pipeline()
+            if self._dumps:
+                await asyncio.gather(*self._dumps, return_exceptions=True)
+            if self.evidence is not None:
+                self.evidence.close()
+            if self.history is not None:
+                self.history.close()
 
     def _log_performance(self):
         """Log performance statistics"""
         stats = self.performance.get_stats()
         print(
             f"📊 Performance: {stats.fps:.1f} FPS, "
-            f"Processing Time: {stats.processing_time:.3f}s"
+            f"Processing Time: {stats.processing_time:.3f}s, "
+            f"Skipped: {stats.skip_ratio:.0%}"
         )
 
+    def _capture(self):
+        """Capture a frame as (image, capture time, sequence or None)"""
+        if self.config.camera.threaded:
+            latest = self.camera.latest_frame()
+            if latest is None:
+                return None, None, None
+            return latest.image, latest.timestamp, latest.sequence
+        return self.camera.capture_frame(), time.monotonic(), None
+
     async def _monitor_loop(self):
-        """Continuous monitoring loop"""
+        """Run the staged pipeline while a job is active, idle otherwise"""
+        loop = asyncio.get_running_loop()
         while True:
-            frame = await self.camera.capture_frame()
-            if frame is not None:
-                result = await self.detector.analyze(frame)
-                self._handle_result(result)
-            await asyncio.sleep(1 / self.config.camera.fps)
-
-    async def _serve_plugin(self):
-        """Start Moonraker plugin service"""
-        from moonraker import MoonrakerPlugin
-        plugin = MoonrakerPlugin()
-        await plugin.start()
+            if not self._active.is_set():
+                print("💤 No print job running, monitoring suspended")
+                await loop.run_in_executor(None, self._close_pipeline)
+                await self._active.wait()
+                print("🦉 Print job started, monitoring resumed")
+                await loop.run_in_executor(None, self._open_pipeline)
+                self.scheduler = AdaptiveScheduler.from_config(self.config.detection)
+
+            pipeline = FramePipeline(
+                capture=self._capture,
+                prepare=self.detector.prepare,
+                infer=self._infer,
+                act=self._act,
+                pace=lambda: self._sleep(self.scheduler.interval),
+                performance=self.performance,
+                queue_size=self.config.detection.queue_size,
+                slot=self._slot if self.slots is not None else None,
+            )
+            running = asyncio.ensure_future(pipeline.run())
+            suspended = asyncio.ensure_future(self._idle.wait())
+            try:
+                await asyncio.wait(
+                    {running, suspended}, return_when=asyncio.FIRST_COMPLETED
+                )
+            finally:
+                for task in (running, suspended):
+                    task.cancel()
+                await asyncio.gather(suspended, return_exceptions=True)
+                try:
+                    await running  # Re-raises a stage failure
+                except asyncio.CancelledError:
+                    pass
+
+    def _slot(self):
+        """Inference slot on the shared model; alarmed printers go first"""
+        priority = PRIORITY_ALARM if self._alarm_level else PRIORITY_NORMAL
+        return self.slots.slot(self.name, priority)
+
+    def _infer(self, prepared):
+        """Inference stage: (DetectionResult, whether the model was skipped)"""
+        result = self.detector.infer(prepared)
+        return result, self.detector.last_skipped
+
+    def _act(self, item):
+        """Action stage, on the event loop thread"""
+        if self.evidence is not None:
+            self._record_evidence(
+                item.frame, item.sequence, item.captured_at, item.result
+            )
+        self.snapshots.publish(item.frame, item.result)
+        self._handle_result(item.result)
+
+    def _record_evidence(self, frame, sequence, captured_at, result):
+        """Keep the analysed frame, compressed as received when possible"""
+        encoded = self.camera.latest_encoded()
+        if encoded is not None and encoded[1] == sequence:
+            frame = encoded[0]
+        self.evidence.append(frame, result, time.time())
+
+    def _dump_evidence(self, label: str):
+        """Write the ring buffer to a clip without blocking the event loop"""
+        if self.evidence is None:
+            return
+        name = time.strftime(f"%Y%m%d-%H%M%S-{label}.avi")
+        clip_path = os.path.join(self.config.evidence.clip_dir, name)
+        self.last_clip = clip_path
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.evidence.dump(clip_path, self.config.evidence.clip_fps)
+            return
+        future = loop.run_in_executor(
+            None, self.evidence.dump, clip_path, self.config.evidence.clip_fps
+        )
+        self._dumps.add(future)
+        future.add_done_callback(self._dump_done)
+
+    def _dump_done(self, future):
+        self._dumps.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            print(f"❌ Evidence clip failed: {future.exception()}")
+
+    async def _sleep(self, seconds: float):
+        """Sleep until the next tick or an early wake-up (layer/state change)"""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    def get_fps(self) -> float:
+        """Current analysis rate from the performance monitor"""
+        return self.performance.get_stats().fps
+
+    def get_latest_confidence(self):
+        """Raw confidence of the latest detection, if any"""
+        return self.latest_result.confidence if self.latest_result else None
+
+    def get_latest_defect_type(self):
+        """Defect class of the latest detection (object detectors only)"""
+        return self.latest_result.defect_type if self.latest_result else None
+
+    def get_smoothed_confidence(self) -> float:
+        """EWMA-smoothed confidence that drives alarms and the interval"""
+        return self.scheduler.smoothed_confidence
+
+    def get_detection_interval(self) -> float:
+        """Current adaptive detection interval in seconds"""
+        return self.scheduler.interval
+
+    def get_detection_rate(self) -> float:
+        """Current adaptive detection rate in detections per second"""
+        return self.scheduler.rate
+
+    def get_alarm_state(self) -> str:
+        """ "normal", "warning" or "critical", following the smoothed score"""
+        return ("normal", "warning", "critical")[self._alarm_level]
+
+    def get_history(
+        self, start: Optional[float] = None, end: Optional[float] = None, buckets=200
+    ) -> Dict[str, Any]:
+        """Downsampled confidence timeline; defaults to the last hour
+
+        Buckets are never shorter than the fastest detection interval, so a
+        short window is served with fewer buckets than requested.
+        """
+        if self.history is None:
+            raise ValueError("Detection history is disabled")
+        end = time.time() if end is None else end
+        start = end - 3600 if start is None else start
+        min_interval = self.config.detection.min_interval
+        if buckets > 0 and end > start and min_interval > 0:
+            buckets = max(1, min(buckets, int((end - start) / min_interval)))
+        return self.history.query_dict(start, end, buckets)
+
+    def get_escalation_rate(self) -> float:
+        """Fraction of frames a model cascade escalated to its second stage"""
+        return self.performance.get_escalation_rate()
 
     def _handle_result(self, result):
-        """Handle detection results"""
-        if result.is_critical:
-            self._trigger_emergency_stop()
-        elif result.is_warning:
+        """Handle detection results
+
+        Alarms follow the smoothed score, so one noisy frame cannot stop a print.
+        """
+        detected_at = time.perf_counter()
+        self.latest_result = result
+        decision = self.scheduler.update(result.confidence)
+        level = 2 if decision.is_critical else 1 if decision.is_warning else 0
+        if self.history is not None:
+            self.history.append(
+                result.confidence,
+                decision.smoothed_confidence,
+                (FLAG_WARNING if result.is_warning else 0)
+                | (FLAG_CRITICAL if result.is_critical else 0)
+                | (FLAG_ALARM_WARNING if decision.is_warning else 0)
+                | (FLAG_ALARM_CRITICAL if decision.is_critical else 0),
+            )
+        if level > self._alarm_level:
+            self._dump_evidence("critical" if level == 2 else "warning")
+        if level != self._alarm_level and level > 0:
+            self._emit("critical" if level == 2 else "warning")
+        if level == 2 and not self.printer.estop_accepted:
+            # Once per alarm, but retried every tick until PAUSE is accepted
+            self._trigger_emergency_stop(detected_at, retry=self._alarm_level == 2)
+        elif level == 1:
             self._notify_warning(result)
+        if level < 2:
+            self.printer.clear_emergency_stop()
+        self._alarm_level = level
 
-    def _trigger_emergency_stop(self):
+    def _trigger_emergency_stop(self, detected_at=None, retry: bool = False):
         """Trigger emergency stop procedure"""
-        print("🛑 Emergency stop: Critical defect detected!")
+        if self.printer.estop_in_flight:
+            return
+        if retry:
+            print("🛑 Emergency stop not accepted yet, retrying PAUSE")
+        else:
+            print("🛑 Emergency stop: Critical defect detected!")
+        if self.printer.schedule_emergency_stop(detected_at) is not None and not retry:
+            self._emit("estop")
+
+    def _emit(self, event: str):
+        """Hand an alarm transition to ``on_event``"""
+        if self.on_event is None:
+            return
+        message = {
+            "event": event,
+            "printer": self.name,
+            "confidence": self.get_latest_confidence(),
+            "defect_type": self.get_latest_defect_type(),
+            "smoothed_confidence": self.get_smoothed_confidence(),
+            "timestamp": time.time(),
+        }
+        try:
+            self.on_event(message)
+        except Exception as e:
+            print(f"⚠️ Event callback failed: {e}")
 
     def _notify_warning(self, result):
         """Notify about potential defects"""
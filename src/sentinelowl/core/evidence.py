@@ -0,0 +1,197 @@
+import os
+import json
+import mmap
+import time
+import threading
+from typing import List, Optional, Tuple, Union
+import cv2
+import numpy as np
+
+# Per-slot metadata, stored in the file ahead of the frame slots
+SLOT_DTYPE = np.dtype(
+    [
+        ("sequence", "<i8"),  # 0 for a slot that was never written
+        ("timestamp", "<f8"),
+        ("nbytes", "<i8"),
+        ("height", "<i4"),
+        ("width", "<i4"),
+        ("channels", "<i4"),
+        ("encoded", "u1"),  # 1: compressed bytes as received, 0: raw pixels
+        ("is_warning", "u1"),
+        ("is_critical", "u1"),
+        ("confidence", "<f4"),
+    ]
+)
+
+
+class FrameRingBuffer:
+    """Fixed-size memory-mapped ring of the last ``capacity`` analysed frames
+
+    The file holds a metadata table followed by ``capacity`` slots of
+    ``slot_bytes`` each. ``append()`` copies the frame once, straight into
+    the mapped slot, so memory and disk use stay constant however long the
+    print runs. Frames are stored as received: JPEG bytes from buffered
+    sources, raw pixels otherwise. ``dump()`` writes the ring, oldest first,
+    to a video clip plus a JSON list of the detection results; ``close()``
+    waits for a dump in progress before unmapping the file.
+    """
+
+    def __init__(
+        self, path: str, capacity: int = 64, slot_bytes: int = 1920 * 1080 * 3
+    ):
+        if capacity <= 0 or slot_bytes <= 0:
+            raise ValueError("Ring buffer capacity and slot size must be positive")
+        self.path = path
+        self.capacity = capacity
+        self.slot_bytes = slot_bytes
+        self._data_offset = -(-capacity * SLOT_DTYPE.itemsize // mmap.PAGESIZE) * (
+            mmap.PAGESIZE
+        )
+        size = self._data_offset + capacity * slot_bytes
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        open(path, "ab").close()
+        with open(path, "r+b") as f:
+            f.truncate(size)  # Sparse on most filesystems; fresh slots read as 0
+            self._mmap = mmap.mmap(f.fileno(), size)
+        self.slots = np.ndarray(
+            (capacity,), dtype=SLOT_DTYPE, buffer=self._mmap, offset=0
+        )
+        self.slots[:] = 0  # Frames from a previous run are not evidence of this one
+        self._data = np.ndarray(
+            (capacity, slot_bytes),
+            dtype=np.uint8,
+            buffer=self._mmap,
+            offset=self._data_offset,
+        )
+        self._next_sequence = 1
+        self._lock = threading.Lock()
+        self._dump_lock = threading.Lock()  # Held by dump() and close()
+        self._closed = False
+
+    @classmethod
+    def from_config(cls, config) -> "FrameRingBuffer":
+        """Build a ring buffer from an EvidenceConfig"""
+        return cls(config.path, capacity=config.capacity, slot_bytes=config.slot_bytes)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.slots["sequence"]))
+
+    def append(
+        self,
+        frame: Union[np.ndarray, bytes],
+        result=None,
+        timestamp: Optional[float] = None,
+    ) -> bool:
+        """Store a frame (array or compressed bytes) with its DetectionResult
+
+        Returns False if the frame does not fit in a slot.
+        """
+        encoded = not isinstance(frame, np.ndarray)
+        payload = np.frombuffer(frame, dtype=np.uint8) if encoded else frame
+        if payload.nbytes > self.slot_bytes:
+            return False
+
+        with self._lock:
+            sequence = self._next_sequence
+            self._next_sequence += 1
+            index = sequence % self.capacity
+            slot = self.slots[index : index + 1]
+            slot["sequence"] = 0  # Invalidate while the payload is rewritten
+            view = self._data[index, : payload.nbytes]
+            if encoded:
+                view[:] = payload
+            else:
+                np.copyto(view.reshape(payload.shape), payload, casting="no")
+            height, width = (0, 0) if encoded else payload.shape[:2]
+            channels = 0 if encoded or payload.ndim < 3 else payload.shape[2]
+            slot["timestamp"] = time.time() if timestamp is None else timestamp
+            slot["nbytes"] = payload.nbytes
+            slot["height"], slot["width"], slot["channels"] = height, width, channels
+            slot["encoded"] = encoded
+            slot["confidence"] = result.confidence if result is not None else np.nan
+            slot["is_warning"] = bool(result is not None and result.is_warning)
+            slot["is_critical"] = bool(result is not None and result.is_critical)
+            slot["sequence"] = sequence
+        return True
+
+    def _read(self, index: int) -> Optional[Tuple[np.void, np.ndarray]]:
+        """Copy one slot out; None if it was empty or overwritten meanwhile"""
+        meta = self.slots[index].copy()
+        if meta["sequence"] == 0:
+            return None
+        raw = self._data[index, : meta["nbytes"]]
+        if meta["encoded"]:
+            image = cv2.imdecode(raw, cv2.IMREAD_COLOR)
+        else:
+            shape = (meta["height"], meta["width"])
+            if meta["channels"]:
+                shape += (meta["channels"],)
+            image = raw.reshape(shape).copy()
+        if self.slots[index]["sequence"] != meta["sequence"] or image is None:
+            return None
+        return meta, image
+
+    def frames(self) -> List[Tuple[np.void, np.ndarray]]:
+        """Decoded (metadata, image) pairs, oldest first"""
+        order = np.argsort(self.slots["sequence"])
+        frames = []
+        for index in order:
+            item = self._read(int(index))
+            if item is not None:
+                frames.append(item)
+        return frames
+
+    def dump(self, clip_path: str, fps: float = 5.0) -> Optional[str]:
+        """Write the buffered frames to ``clip_path`` (+ ``.json`` results)"""
+        with self._dump_lock:
+            if self._closed:
+                raise ValueError("Ring buffer is closed")
+            return self._dump(clip_path, fps)
+
+    def _dump(self, clip_path: str, fps: float) -> Optional[str]:
+        frames = self.frames()
+        if not frames:
+            return None
+        os.makedirs(os.path.dirname(os.path.abspath(clip_path)), exist_ok=True)
+        height, width = frames[-1][1].shape[:2]
+        writer = cv2.VideoWriter(
+            clip_path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height)
+        )
+        results = []
+        try:
+            for meta, image in frames:
+                if image.ndim == 2:
+                    image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+                if image.shape[:2] != (height, width):
+                    image = cv2.resize(image, (width, height))
+                writer.write(image)
+                results.append(
+                    {
+                        "sequence": int(meta["sequence"]),
+                        "timestamp": float(meta["timestamp"]),
+                        "confidence": (
+                            None
+                            if np.isnan(meta["confidence"])
+                            else float(meta["confidence"])
+                        ),
+                        "is_warning": bool(meta["is_warning"]),
+                        "is_critical": bool(meta["is_critical"]),
+                    }
+                )
+        finally:
+            writer.release()
+        with open(os.path.splitext(clip_path)[0] + ".json", "w") as f:
+            json.dump(results, f, indent=2)
+        return clip_path
+
+    def close(self):
+        """Flush and unmap the file, once a dump in progress has finished"""
+        with self._dump_lock:
+            if self._closed:
+                return
+            self._closed = True
+            del self.slots, self._data
+            self._mmap.flush()
+            self._mmap.close()
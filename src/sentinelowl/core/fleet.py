@@ -0,0 +1,179 @@
+import os
+import re
+import asyncio
+from typing import Any, Dict, Optional, Tuple
+from ..config import (
+    AppConfig,
+    EvidenceConfig,
+    FleetPrinterConfig,
+    HistoryConfig,
+    ModelConfig,
+)
+from .engine import SentinelOwl, alarm_model_config
+from .models import create_model
+from .slots import InferenceSlots
+
+
+class SharedModels:
+    """One loaded model per distinct ModelConfig, each with its own slots
+
+    In-process models bind a single input buffer and get one slot. An
+    ``InferencePool`` (``ModelConfig.workers``) shards inference over worker
+    processes and gets one slot per worker; a cascade in front of a pool
+    serialises its in-process prefilter itself.
+    """
+
+    def __init__(self):
+        self._models: Dict[str, Tuple[Any, InferenceSlots]] = {}
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def get(self, config: ModelConfig) -> Tuple[Any, InferenceSlots]:
+        """The shared (model, slots) pair for ``config``, loaded on first use"""
+        key = config.model_dump_json()
+        if key not in self._models:
+            slots = InferenceSlots(config.workers if config.workers > 0 else 1)
+            self._models[key] = (create_model(config), slots)
+        return self._models[key]
+
+    def close(self):
+        """Release every model"""
+        for model, _ in self._models.values():
+            model.close()
+        self._models.clear()
+
+
+def _member_evidence(evidence: EvidenceConfig, name: str) -> EvidenceConfig:
+    """Give each printer its own ring buffer file and clip directory"""
+    directory, filename = os.path.split(evidence.path)
+    return evidence.model_copy(
+        update={
+            "path": os.path.join(directory, name, filename),
+            "clip_dir": os.path.join(evidence.clip_dir, name),
+        }
+    )
+
+
+def _member_history(history: HistoryConfig, name: str) -> HistoryConfig:
+    """Give each printer its own history file"""
+    if history.path is None:
+        return history
+    directory, filename = os.path.split(history.path)
+    return history.model_copy(update={"path": os.path.join(directory, name, filename)})
+
+
+def member_config(config: AppConfig, printer: FleetPrinterConfig) -> AppConfig:
+    """Full configuration of one fleet printer
+
+    The model carries the printer's alarm thresholds, so printers share a
+    model only if they also share those.
+    """
+    member = AppConfig(
+        camera=printer.camera,
+        printer=printer.printer,
+        detection=printer.detection or config.detection,
+        model=printer.model or config.model,
+        evidence=_member_evidence(config.evidence, printer.name),
+        history=_member_history(config.history, printer.name),
+        snapshot=config.snapshot,
+    )
+    member.model = alarm_model_config(member)
+    return member
+
+
+class SentinelFleet:
+    """Monitors every printer of ``AppConfig.fleet`` in one process
+
+    Each printer keeps its own camera, pipeline, adaptive schedule and
+    Moonraker connection, but printers with the same model configuration
+    share one loaded model. Inference on a shared model is rationed by
+    ``InferenceSlots``, so memory grows with the number of cameras rather
+    than cameras times models.
+    """
+
+    def __init__(self, config: AppConfig):
+        if not config.fleet:
+            raise ValueError("Fleet mode needs at least one printer in config.fleet")
+        names = [printer.name for printer in config.fleet]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Fleet printer names must be unique: {names}")
+
+        self.config = config
+        self.models = SharedModels()
+        self.members: Dict[str, SentinelOwl] = {}
+        for printer in config.fleet:
+            member = member_config(config, printer)
+            model, slots = self.models.get(member.model)
+            self.members[printer.name] = SentinelOwl(
+                member, model=model, slots=slots, name=printer.name
+            )
+
+    async def run(self):
+        """Monitor all printers until cancelled"""
+        try:
+            await asyncio.gather(*(member.run() for member in self.members.values()))
+        finally:
+            self.models.close()
+
+    def get_printer_status(self, name: Optional[str] = None) -> Dict[str, Any]:
+        """Per-printer status, keyed by printer name"""
+        members = self.members if name is None else {name: self.members[name]}
+        return {key: _member_status(member) for key, member in members.items()}
+
+    def get_fps(self) -> float:
+        """Analysed frames per second across the fleet"""
+        return sum(member.get_fps() for member in self.members.values())
+
+    def get_latest_confidence(self):
+        """Highest latest raw confidence of any printer"""
+        values = [m.get_latest_confidence() for m in self.members.values()]
+        values = [value for value in values if value is not None]
+        return max(values) if values else None
+
+    def get_latest_defect_type(self):
+        """Defect class reported with the highest latest confidence"""
+        results = [m.latest_result for m in self.members.values() if m.latest_result]
+        if not results:
+            return None
+        return max(results, key=lambda result: result.confidence).defect_type
+
+    def get_smoothed_confidence(self) -> float:
+        """Highest smoothed confidence of any printer"""
+        return max(m.get_smoothed_confidence() for m in self.members.values())
+
+    def get_detection_interval(self) -> float:
+        """Shortest adaptive interval of any printer"""
+        return min(m.get_detection_interval() for m in self.members.values())
+
+    def get_detection_rate(self) -> float:
+        """Detections per second across the fleet"""
+        return sum(m.get_detection_rate() for m in self.members.values())
+
+    def get_escalation_rate(self) -> float:
+        """Fraction of cascade frames escalated, across the fleet"""
+        monitors = [m.performance for m in self.members.values()]
+        frames = sum(p.cascade_frames for p in monitors)
+        return sum(p.escalated_frames for p in monitors) / frames if frames else 0.0
+
+    def to_prometheus(self) -> str:
+        """Metrics of every printer, prefixed with the printer name"""
+        return "".join(
+            member.performance.to_prometheus(
+                prefix=f"sentinelowl_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}"
+            )
+            for name, member in self.members.items()
+        )
+
+
+def _member_status(member: SentinelOwl) -> Dict[str, Any]:
+    return {
+        "active": member.is_active,
+        "fps": member.get_fps(),
+        "confidence": member.get_latest_confidence(),
+        "defect_type": member.get_latest_defect_type(),
+        "smoothed_confidence": member.get_smoothed_confidence(),
+        "detection_interval": member.get_detection_interval(),
+        "alarm": member.get_alarm_state(),
+        "inferences": member.slots.grants.get(member.name, 0),
+    }
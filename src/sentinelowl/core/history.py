@@ -0,0 +1,265 @@
+import os
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+import numpy as np
+
+FLAG_WARNING = 1  # Raw confidence in the warning band
+FLAG_CRITICAL = 2  # Raw confidence in the critical band
+FLAG_ALARM_WARNING = 4  # Smoothed score raised a warning
+FLAG_ALARM_CRITICAL = 8  # Smoothed score raised a critical alarm (pause)
+
+MAX_BUCKETS = 5000  # Upper bound of one query, to bound its buffers
+
+# Record layout of the append-only history file
+FILE_DTYPE = np.dtype(
+    [
+        ("timestamp", "<f8"),
+        ("confidence", "<f2"),
+        ("smoothed", "<f2"),
+        ("flags", "u1"),
+    ]
+)
+
+
+class HistoryBuckets(NamedTuple):
+    """Downsampled history: one entry per non-empty time bucket"""
+
+    start: np.ndarray  # Bucket start times (epoch seconds)
+    count: np.ndarray
+    min: np.ndarray  # Raw confidence
+    max: np.ndarray
+    mean: np.ndarray
+    smoothed_max: np.ndarray
+    flags: np.ndarray  # OR of the sample flags
+
+
+class _Chunk:
+    """Preallocated columns of ``size`` samples
+
+    Timestamps are float32 offsets from the chunk's first sample, which
+    keeps millisecond resolution for hours while halving their size.
+    """
+
+    def __init__(self, size: int, base: float):
+        self.base = base
+        self.length = 0
+        self.timestamp = np.empty(size, dtype=np.float32)
+        self.confidence = np.empty(size, dtype=np.float16)
+        self.smoothed = np.empty(size, dtype=np.float16)
+        self.flags = np.empty(size, dtype=np.uint8)
+
+    @property
+    def full(self) -> bool:
+        return self.length == len(self.timestamp)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            column.nbytes
+            for column in (self.timestamp, self.confidence, self.smoothed, self.flags)
+        )
+
+    def first(self) -> float:
+        return self.base + float(self.timestamp[0])
+
+    def last(self) -> float:
+        return self.base + float(self.timestamp[self.length - 1])
+
+
+class DetectionHistory:
+    """Columnar in-process store of every detection result
+
+    Each sample takes 9 bytes (float32 time offset, float16 raw and smoothed
+    confidence, flag byte) in chunks of ``chunk_size`` preallocated samples,
+    so a 48-hour print at 5 samples per second takes about 8 MB. Beyond
+    ``max_samples`` the oldest chunk is dropped. With ``path`` every sample
+    is also appended to a file, which is read back on start-up. The file is
+    cut back to the newest ``max_samples`` records on start-up and whenever
+    it reaches twice that, so neither its size nor the start-up read grows
+    with uptime.
+
+    Samples must be appended in time order; ``append`` and ``query`` are
+    meant to be called from the event loop thread.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 65536,
+        max_samples: int = 1_000_000,
+        path: Optional[str] = None,
+    ):
+        if chunk_size <= 0:
+            raise ValueError("History chunk size must be positive")
+        self.chunk_size = chunk_size
+        self.max_samples = max(max_samples, chunk_size)
+        self.path = path
+        self._chunks: List[_Chunk] = []
+        self._file = None
+        self._file_records = 0
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._compact()
+            self._load(path)
+            self._file = open(path, "ab")
+
+    @classmethod
+    def from_config(cls, config) -> "DetectionHistory":
+        """Build a history store from a HistoryConfig"""
+        return cls(
+            chunk_size=config.chunk_size,
+            max_samples=config.max_samples,
+            path=config.path,
+        )
+
+    def __len__(self) -> int:
+        return sum(chunk.length for chunk in self._chunks)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the sample columns"""
+        return sum(chunk.nbytes for chunk in self._chunks)
+
+    def _compact(self):
+        """Rewrite the file with only its newest ``max_samples`` records"""
+        if not os.path.exists(self.path):
+            return
+        count = os.path.getsize(self.path) // FILE_DTYPE.itemsize
+        if count <= self.max_samples:
+            self._file_records = count
+            return
+        keep = np.fromfile(
+            self.path,
+            dtype=FILE_DTYPE,
+            count=self.max_samples,
+            offset=(count - self.max_samples) * FILE_DTYPE.itemsize,
+        )
+        temporary = f"{self.path}.tmp"
+        keep.tofile(temporary)
+        os.replace(temporary, self.path)
+        self._file_records = len(keep)
+
+    def _load(self, path: str):
+        if not os.path.exists(path):
+            return
+        records = np.fromfile(path, dtype=FILE_DTYPE, count=self._file_records)
+        for start in range(0, len(records), self.chunk_size):
+            part = records[start : start + self.chunk_size]
+            chunk = _Chunk(self.chunk_size, float(part["timestamp"][0]))
+            chunk.length = len(part)
+            chunk.timestamp[: len(part)] = part["timestamp"] - chunk.base
+            chunk.confidence[: len(part)] = part["confidence"]
+            chunk.smoothed[: len(part)] = part["smoothed"]
+            chunk.flags[: len(part)] = part["flags"]
+            self._chunks.append(chunk)
+
+    def append(
+        self,
+        confidence: float,
+        smoothed: float = 0.0,
+        flags: int = 0,
+        timestamp: Optional[float] = None,
+    ):
+        """Record one detection"""
+        timestamp = time.time() if timestamp is None else timestamp
+        if not self._chunks or self._chunks[-1].full:
+            self._chunks.append(_Chunk(self.chunk_size, timestamp))
+            if len(self._chunks) * self.chunk_size > self.max_samples:
+                self._chunks.pop(0)
+        chunk = self._chunks[-1]
+        i = chunk.length
+        chunk.timestamp[i] = timestamp - chunk.base
+        chunk.confidence[i] = confidence
+        chunk.smoothed[i] = smoothed
+        chunk.flags[i] = flags
+        chunk.length += 1
+
+        if self._file is not None:
+            record = np.array([(timestamp, confidence, smoothed, flags)], FILE_DTYPE)
+            self._file.write(record.tobytes())
+            self._file_records += 1
+            if flags & (FLAG_ALARM_WARNING | FLAG_ALARM_CRITICAL):
+                self._file.flush()  # Alarms must survive a crash for auditing
+            if self._file_records >= 2 * self.max_samples:
+                self._file.close()
+                self._compact()
+                self._file = open(self.path, "ab")
+
+    def _columns(self, start: float, end: float):
+        """Samples with ``start <= t < end``, concatenated across chunks"""
+        timestamps, confidence, smoothed, flags = [], [], [], []
+        for chunk in self._chunks:
+            if chunk.length == 0 or chunk.last() < start or chunk.first() >= end:
+                continue
+            offsets = chunk.timestamp[: chunk.length]
+            # Round the bounds like the stored offsets were rounded
+            bounds = (np.array([start, end]) - chunk.base).astype(np.float32)
+            lo, hi = np.searchsorted(offsets, bounds, side="left")
+            timestamps.append(chunk.base + offsets[lo:hi].astype(np.float64))
+            confidence.append(chunk.confidence[lo:hi].astype(np.float32))
+            smoothed.append(chunk.smoothed[lo:hi].astype(np.float32))
+            flags.append(chunk.flags[lo:hi])
+        if not timestamps:
+            empty = np.empty(0, dtype=np.float32)
+            return np.empty(0), empty, empty, np.empty(0, dtype=np.uint8)
+        return (
+            np.concatenate(timestamps),
+            np.concatenate(confidence),
+            np.concatenate(smoothed),
+            np.concatenate(flags),
+        )
+
+    def query(self, start: float, end: float, buckets: int = 200) -> HistoryBuckets:
+        """Min/max/mean confidence in ``buckets`` equal slices of [start, end)"""
+        if end <= start or not 0 < buckets <= MAX_BUCKETS:
+            raise ValueError(
+                f"History query needs end > start and 1 to {MAX_BUCKETS} buckets"
+            )
+        timestamps, confidence, smoothed, flags = self._columns(start, end)
+        width = (end - start) / buckets
+        edges = start + width * np.arange(buckets + 1)
+        bounds = np.searchsorted(timestamps, edges, side="left")
+        counts = np.diff(bounds)
+        filled = counts > 0
+        # Samples are sorted, so each non-empty bucket is one contiguous run
+        offsets = bounds[:-1][filled]
+        if not len(offsets):
+            return HistoryBuckets(*(np.empty(0) for _ in HistoryBuckets._fields))
+        sums = np.add.reduceat(confidence, offsets, dtype=np.float64)
+        return HistoryBuckets(
+            start=edges[:-1][filled],
+            count=counts[filled],
+            min=np.minimum.reduceat(confidence, offsets),
+            max=np.maximum.reduceat(confidence, offsets),
+            mean=(sums / counts[filled]).astype(np.float32),
+            smoothed_max=np.maximum.reduceat(smoothed, offsets),
+            flags=np.bitwise_or.reduceat(flags, offsets),
+        )
+
+    def query_dict(
+        self, start: float, end: float, buckets: int = 200
+    ) -> Dict[str, Any]:
+        """``query()`` as a JSON-friendly dict"""
+        result = self.query(start, end, buckets)
+        return {
+            "start": start,
+            "end": end,
+            "bucket_seconds": (end - start) / buckets,
+            "buckets": [
+                {
+                    "t": float(t),
+                    "count": int(count),
+                    "min": float(low),
+                    "max": float(high),
+                    "mean": float(mean),
+                    "smoothed_max": float(smoothed),
+                    "flags": int(flags),
+                }
+                for t, count, low, high, mean, smoothed, flags in zip(*result)
+            ],
+        }
+
+    def close(self):
+        """Flush and close the history file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
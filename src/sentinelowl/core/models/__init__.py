@@ -1,4 +1,57 @@
 from .base_model import BaseModel
 from .placeholder_model import PlaceholderModel
 
-__all__ = ["BaseModel", "PlaceholderModel"]
+__all__ = [
+    "BaseModel",
+    "CascadeModel",
+    "PlaceholderModel",
+    "OnnxModel",
+    "YoloModel",
+    "create_model",
+]
+
+
+def __getattr__(name):
+    # onnxruntime is only imported when an ONNX model is actually requested
+    if name == "OnnxModel":
+        from .onnx_model import OnnxModel
+
+        return OnnxModel
+    if name == "YoloModel":
+        from .yolo_model import YoloModel
+
+        return YoloModel
+    if name == "CascadeModel":
+        from .cascade_model import CascadeModel
+
+        return CascadeModel
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def create_model(config) -> BaseModel:
+    """Create the detection model selected by ``config.type``"""
+    if getattr(config, "prefilter", None) is not None:
+        from .cascade_model import CascadeModel
+
+        return CascadeModel.from_config(config)
+
+    if getattr(config, "workers", 0) > 0:
+        from ..workers import InferencePool
+
+        return InferencePool.from_config(config)
+
+    model_type = getattr(config, "type", "placeholder")
+    if model_type == "placeholder":
+        return PlaceholderModel(
+            warning_threshold=config.warning_threshold,
+            critical_threshold=config.critical_threshold,
+        )
+    if model_type == "onnx":
+        from .onnx_model import OnnxModel
+
+        return OnnxModel.from_config(config)
+    if model_type == "yolo":
+        from .yolo_model import YoloModel
+
+        return YoloModel.from_config(config)
+    raise ValueError(f"Unsupported model type: {model_type}")
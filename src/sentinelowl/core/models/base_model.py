@@ -8,3 +8,7 @@ class BaseModel(ABC):
     @abstractmethod
     def predict(self, frame: np.ndarray) -> tuple[float, bool, bool]:
         pass
+
+    def close(self):
+        """Release model resources (sessions, worker processes)"""
+        pass
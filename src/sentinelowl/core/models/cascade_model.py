@@ -0,0 +1,100 @@
+import time
+import threading
+from typing import Dict, Optional
+import numpy as np
+from sentinelowl.core.models.base_model import BaseModel
+
+
+class CascadeModel(BaseModel):
+    """Two-stage cascade: a cheap prefilter gates an expensive model
+
+    The prefilter scores every frame. Only frames scoring at least
+    ``threshold`` are escalated to ``model``, whose result then decides
+    warning/critical; other frames return the prefilter score with both
+    flags cleared. ``timings`` holds the prefilter latency as
+    ``"prefilter"`` plus the second stage's own stage timings. An object
+    detector as the second stage has its ``last_detections`` forwarded
+    (None for frames it did not see), mapped back to frame pixels with
+    ``box_preprocessor``.
+
+    Fleet printers may call ``predict()`` concurrently (one per inference
+    slot of the second stage), so the prefilter, which binds a single input
+    buffer, runs under a lock, and ``timings``/``last_escalated`` describe
+    the calling thread's last frame.
+    """
+
+    def __init__(self, prefilter: BaseModel, model: BaseModel, threshold: float = 0.3):
+        self.prefilter = prefilter
+        self.model = model
+        self.threshold = threshold
+        self.warning_threshold = getattr(model, "warning_threshold", 0.7)
+        self.critical_threshold = getattr(model, "critical_threshold", 0.85)
+        self.frames = 0
+        self.escalated = 0
+        self._lock = threading.Lock()  # Serialises the prefilter and counters
+        self._local = threading.local()
+
+    @classmethod
+    def from_config(cls, config) -> "CascadeModel":
+        """Build both stages from a ModelConfig with a ``prefilter``"""
+        from . import create_model
+
+        prefilter = create_model(config.prefilter)
+        model = create_model(config.model_copy(update={"prefilter": None}))
+        return cls(prefilter, model, threshold=config.prefilter_threshold)
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        """Stage latencies (seconds) of the calling thread's last ``predict()``"""
+        return getattr(self._local, "timings", {})
+
+    @property
+    def last_escalated(self) -> Optional[bool]:
+        """Whether the calling thread's last frame reached the second stage"""
+        return getattr(self._local, "escalated", None)
+
+    @property
+    def last_detections(self):
+        """Second-stage detections of the calling thread's last frame"""
+        return getattr(self._local, "detections", None)
+
+    @property
+    def class_names(self):
+        return getattr(self.model, "class_names", [])
+
+    @property
+    def box_preprocessor(self):
+        """Preprocessor whose scale/offset ``last_detections`` boxes are in"""
+        return getattr(self.model, "preprocessor", None)
+
+    @property
+    def escalation_rate(self) -> float:
+        """Fraction of frames that reached the second stage"""
+        return self.escalated / self.frames if self.frames else 0.0
+
+    def predict(self, frame: np.ndarray) -> tuple[float, bool, bool]:
+        with self._lock:
+            start = time.perf_counter()
+            score = self.prefilter.predict(frame)[0]
+            timings = {"prefilter": time.perf_counter() - start}
+            escalated = bool(score >= self.threshold)
+            self.frames += 1
+            self.escalated += escalated
+        self._local.timings = timings
+        self._local.escalated = escalated
+        self._local.detections = None
+        if not escalated:
+            return score, False, False
+
+        start = time.perf_counter()
+        result = self.model.predict(frame)
+        timings.update(
+            getattr(self.model, "timings", None)
+            or {"inference": time.perf_counter() - start}
+        )
+        self._local.detections = getattr(self.model, "last_detections", None)
+        return result
+
+    def close(self):
+        self.prefilter.close()
+        self.model.close()
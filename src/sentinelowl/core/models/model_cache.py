@@ -0,0 +1,88 @@
+import os
+import json
+import hashlib
+import platform
+from typing import Any, Dict, Optional
+
+
+def optimized_model_path(model_path: str) -> str:
+    """Where the ORT-optimized graph of ``model_path`` is cached"""
+    root, _ = os.path.splitext(model_path)
+    return f"{root}.optimized.onnx"
+
+
+def _fingerprint_path(optimized_path: str) -> str:
+    return os.path.splitext(optimized_path)[0] + ".json"
+
+
+def _sha256(model_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _file_stat(model_path: str) -> Dict[str, int]:
+    stat = os.stat(model_path)
+    return {"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns}
+
+
+def _runtime(graph_optimization: str) -> Dict[str, str]:
+    import onnxruntime as ort
+
+    return {
+        "graph_optimization": graph_optimization,
+        "onnxruntime": ort.__version__,
+        "machine": platform.machine(),
+    }
+
+
+def model_fingerprint(model_path: str, graph_optimization: str) -> Dict[str, Any]:
+    """Identify a model file and the runtime it was optimized for
+
+    Optimized graphs may contain kernels specific to the ONNX Runtime
+    version and CPU architecture, so both are part of the fingerprint.
+    """
+    return {
+        "source_sha256": _sha256(model_path),
+        **_file_stat(model_path),
+        **_runtime(graph_optimization),
+    }
+
+
+def save_fingerprint(optimized_path: str, fingerprint: Dict[str, Any]):
+    """Record the fingerprint next to an optimized graph"""
+    with open(_fingerprint_path(optimized_path), "w") as f:
+        json.dump(fingerprint, f, indent=2)
+
+
+def cached_model(model_path: str, graph_optimization: str) -> Optional[str]:
+    """Path of a cached optimized graph matching ``model_path``, if any"""
+    optimized_path = optimized_model_path(model_path)
+    fingerprint_path = _fingerprint_path(optimized_path)
+    if not (os.path.exists(optimized_path) and os.path.exists(fingerprint_path)):
+        return None
+    try:
+        with open(fingerprint_path) as f:
+            recorded = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(recorded, dict) or any(
+        recorded.get(key) != value
+        for key, value in _runtime(graph_optimization).items()
+    ):
+        return None
+    # Hashing a large model at every start-up is slow: trust an unchanged
+    # size and mtime, and only hash when the file was touched
+    stat = _file_stat(model_path)
+    if recorded.get("source_size") != stat["source_size"]:
+        return None
+    if recorded.get("source_mtime_ns") != stat["source_mtime_ns"]:
+        if recorded.get("source_sha256") != _sha256(model_path):
+            return None
+        try:
+            save_fingerprint(optimized_path, {**recorded, **stat})
+        except OSError:
+            pass  # Read-only model directory; hash again next time
+    return optimized_path
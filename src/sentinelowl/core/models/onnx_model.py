@@ -0,0 +1,234 @@
+import os
+import time
+import threading
+from typing import Dict, Optional, Tuple
+import numpy as np
+import onnxruntime as ort
+from sentinelowl.core.models.base_model import BaseModel
+from sentinelowl.core.models.model_cache import cached_model
+from sentinelowl.core.preprocess import ONNX_DTYPES, Preprocessor
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+
+def _static_shape(shape) -> tuple:
+    """Replace symbolic/unknown dimensions with 1 (single-frame batch)"""
+    return tuple(d if isinstance(d, int) and d > 0 else 1 for d in shape)
+
+
+class OnnxModel(BaseModel):
+    """ONNX Runtime backed model with a persistent session and IO binding
+
+    The session, tensor metadata and input/output buffers are created once;
+    ``predict()`` only writes the frame into the bound input buffer and runs
+    the session, so there is no per-frame allocation or metadata lookup.
+
+    If ``sentinelowl optimize-model`` has cached an optimized graph whose
+    fingerprint matches the model file, that graph is loaded instead and
+    ORT's own graph optimizations are skipped at startup.
+
+    A first output with more than one score needs ``class_index`` to pick
+    the defect class; the top score would alarm on "no defect" as well.
+    """
+
+    requires_class_index = True  # Subclasses that decode the output opt out
+
+    def __init__(
+        self,
+        model_path: str,
+        warning_threshold: float = 0.7,
+        critical_threshold: float = 0.85,
+        class_index: Optional[int] = None,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+        graph_optimization: str = "all",
+        providers: Optional[list] = None,
+        roi: Optional[Tuple[int, int, int, int]] = None,
+        letterbox: bool = False,
+        use_cache: bool = True,
+    ):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Model file not found: {model_path}")
+        if graph_optimization not in GRAPH_OPTIMIZATION_LEVELS:
+            raise ValueError(f"Unsupported graph optimization: {graph_optimization}")
+
+        self.model_path = model_path
+        self.warning_threshold = warning_threshold
+        self.critical_threshold = critical_threshold
+        self.class_index = class_index
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        options.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS[graph_optimization]
+        self.session_path = model_path
+        if use_cache:
+            optimized = cached_model(model_path, graph_optimization)
+            if optimized is not None:
+                self.session_path = optimized
+                options.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS["disable"]
+        self.session = ort.InferenceSession(
+            self.session_path,
+            sess_options=options,
+            providers=providers or ["CPUExecutionProvider"],
+        )
+
+        # Cache tensor metadata once instead of querying it per frame
+        input_info = self.session.get_inputs()[0]
+        self.input_name = input_info.name
+        self.input_shape = _static_shape(input_info.shape)
+        self.dynamic_batch = not (
+            isinstance(input_info.shape[0], int) and input_info.shape[0] > 0
+        )
+        self.input_dtype = self._numpy_dtype(input_info.type)
+        self.preprocessor = Preprocessor(
+            self.input_shape, dtype=self.input_dtype, roi=roi, letterbox=letterbox
+        )
+
+        self._input = self.preprocessor.output
+        self._binding = self.session.io_binding()
+        self._binding.bind_input(
+            self.input_name,
+            "cpu",
+            0,
+            self.input_dtype,
+            self.input_shape,
+            self._input.ctypes.data,
+        )
+
+        self._local = threading.local()  # Per-thread results of a shared model
+        self.output_names = []
+        self._outputs = []
+        for output_info in self.session.get_outputs():
+            self.output_names.append(output_info.name)
+            if all(isinstance(d, int) and d > 0 for d in output_info.shape):
+                buffer = np.zeros(
+                    output_info.shape, dtype=self._numpy_dtype(output_info.type)
+                )
+                self._binding.bind_output(
+                    output_info.name,
+                    "cpu",
+                    0,
+                    buffer.dtype,
+                    buffer.shape,
+                    buffer.ctypes.data,
+                )
+            else:
+                # Dynamic output shapes are allocated by ORT on each run
+                buffer = None
+                self._binding.bind_output(output_info.name, "cpu")
+            self._outputs.append(buffer)
+
+        if self.requires_class_index and class_index is None:
+            first = self.session.get_outputs()[0]
+            size = int(np.prod(_static_shape(first.shape)))
+            if size > 1:
+                raise ValueError(
+                    f"Model output {first.name} has {size} scores; set "
+                    "ModelConfig.class_index to the defect class"
+                )
+
+    @classmethod
+    def from_config(cls, config) -> "OnnxModel":
+        """Build a model from a ModelConfig"""
+        if not getattr(config, "path", None):
+            raise ValueError("ModelConfig.path is required for ONNX models")
+        return cls(
+            config.path,
+            warning_threshold=config.warning_threshold,
+            critical_threshold=config.critical_threshold,
+            class_index=config.class_index,
+            intra_op_threads=config.intra_op_threads,
+            inter_op_threads=config.inter_op_threads,
+            graph_optimization=config.graph_optimization,
+            roi=config.roi,
+            letterbox=config.letterbox,
+            use_cache=config.use_optimized_cache,
+        )
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        """Stage latencies (seconds) of the calling thread's last ``predict()``
+
+        Kept per thread, since fleet printers share one model and each
+        reads its own timings right after its ``predict()`` call.
+        """
+        return getattr(self._local, "timings", {})
+
+    @staticmethod
+    def _numpy_dtype(onnx_type: str):
+        if onnx_type not in ONNX_DTYPES:
+            raise ValueError(f"Unsupported dtype: {onnx_type}")
+        return ONNX_DTYPES[onnx_type]
+
+    def run(self, frame: np.ndarray) -> list:
+        """Run inference and return the raw output tensors"""
+        start = time.perf_counter()
+        self.preprocessor(frame)
+        preprocessed = time.perf_counter()
+        self.session.run_with_iobinding(self._binding)
+        self._local.timings = {
+            "preprocess": preprocessed - start,
+            "inference": time.perf_counter() - preprocessed,
+        }
+        if any(buffer is None for buffer in self._outputs):
+            ort_outputs = self._binding.get_outputs()
+            return [
+                buffer if buffer is not None else ort_outputs[i].numpy()
+                for i, buffer in enumerate(self._outputs)
+            ]
+        return self._outputs
+
+    def _score(self, output: np.ndarray) -> float:
+        """Reduce the first output tensor to a defect confidence in [0, 1]"""
+        scores = output.reshape(-1).astype(np.float64)
+        if scores.size == 1:
+            value = scores[0]
+            if not 0.0 <= value <= 1.0:
+                value = 1.0 / (1.0 + np.exp(-value))  # logit
+            return float(value)
+
+        if scores.min() < 0.0 or not np.isclose(scores.sum(), 1.0, atol=1e-3):
+            scores = np.exp(scores - scores.max())  # logits → softmax
+            scores /= scores.sum()
+        if self.class_index is None:
+            raise ValueError(
+                f"Model output has {scores.size} scores; set "
+                "ModelConfig.class_index to the defect class"
+            )
+        return float(scores[self.class_index])
+
+    def score_batch(self, tensors: np.ndarray) -> np.ndarray:
+        """Confidences for a stack of preprocessed NCHW tensors
+
+        Models with a dynamic batch dimension run the whole stack at once;
+        fixed-batch models run it one tensor at a time.
+        """
+        if self.dynamic_batch:
+            outputs = self.session.run(
+                self.output_names[:1], {self.input_name: tensors}
+            )[0]
+        else:
+            outputs = [
+                self.session.run(
+                    self.output_names[:1], {self.input_name: tensors[i : i + 1]}
+                )[0]
+                for i in range(len(tensors))
+            ]
+        return np.array([self._score(output) for output in outputs], dtype=np.float32)
+
+    def predict(self, frame: np.ndarray) -> tuple[float, bool, bool]:
+        outputs = self.run(frame)
+        start = time.perf_counter()
+        confidence = self._score(outputs[0])
+        self.timings["postprocess"] = time.perf_counter() - start
+        return (
+            confidence,
+            confidence > self.warning_threshold,
+            confidence > self.critical_threshold,
+        )
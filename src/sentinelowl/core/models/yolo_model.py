@@ -0,0 +1,246 @@
+import time
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from sentinelowl.core.models.onnx_model import OnnxModel
+
+BOX_FORMATS = ("yolov8", "yolov5")
+
+
+class Detections(NamedTuple):
+    """Boxes kept after NMS, highest score first"""
+
+    boxes: np.ndarray  # (N, 4) float32 x1, y1, x2, y2 in model input pixels
+    scores: np.ndarray  # (N,) float32
+    classes: np.ndarray  # (N,) int64 class indices
+
+
+def decode_predictions(
+    output: np.ndarray,
+    box_format: str = "yolov8",
+    score_threshold: float = 0.25,
+    max_candidates: int = 512,
+) -> Detections:
+    """Raw YOLO head output → candidate boxes above ``score_threshold``
+
+    ``yolov8`` heads emit (1, 4 + C, N) with per-class scores; ``yolov5``
+    heads emit (1, N, 5 + C) with an objectness column that scales the
+    class scores. Only the ``max_candidates`` best boxes are returned.
+    """
+    if box_format == "yolov8":
+        predictions = output.reshape(output.shape[-2:]).T
+        class_scores = predictions[:, 4:]
+    elif box_format == "yolov5":
+        predictions = output.reshape(output.shape[-2:])
+        class_scores = predictions[:, 5:] * predictions[:, 4:5]
+    else:
+        raise ValueError(f"Unsupported box format: {box_format}")
+
+    scores = class_scores.max(axis=1)
+    candidates = np.flatnonzero(scores > score_threshold)
+    if len(candidates) > max_candidates:
+        best = np.argpartition(scores[candidates], -max_candidates)[-max_candidates:]
+        candidates = candidates[best]
+
+    xywh = predictions[candidates, :4].astype(np.float32)
+    boxes = np.empty_like(xywh)
+    boxes[:, :2] = xywh[:, :2] - xywh[:, 2:] / 2
+    boxes[:, 2:] = xywh[:, :2] + xywh[:, 2:] / 2
+    return Detections(
+        boxes,
+        scores[candidates].astype(np.float32),
+        class_scores[candidates].argmax(axis=1),
+    )
+
+
+def box_iou(boxes: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of (N, 4) x1y1x2y2 boxes, reusing one N x N buffer"""
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    iou = np.minimum.outer(x2, x2)
+    iou -= np.maximum.outer(x1, x1)
+    np.clip(iou, 0, None, out=iou)
+    height = np.minimum.outer(y2, y2)
+    height -= np.maximum.outer(y1, y1)
+    np.clip(height, 0, None, out=height)
+    iou *= height  # Intersection areas
+    union = np.add.outer(areas, areas, out=height)
+    union -= iou
+    np.maximum(union, 1e-9, out=union)
+    iou /= union
+    return iou
+
+
+def non_max_suppression(
+    detections: Detections, iou_threshold: float = 0.45, max_detections: int = 100
+) -> Detections:
+    """Per-class greedy NMS, computed with matrix operations
+
+    Boxes are sorted by score and shifted apart by class so that boxes of
+    different classes never overlap. Box ``j`` is suppressed by any kept,
+    higher-scoring box overlapping it by more than ``iou_threshold``;
+    iterating that rule from "all kept" converges to exactly the greedy NMS
+    result (Cluster-NMS), typically in two or three matrix products instead
+    of one Python iteration per box.
+    """
+    if len(detections.scores) == 0:
+        return detections
+    order = np.argsort(-detections.scores, kind="stable")
+    boxes = detections.boxes[order]
+    classes = detections.classes[order]
+    shifted = boxes + (classes * (boxes.max() + 1))[:, None].astype(np.float32)
+    suppresses = np.triu(box_iou(shifted) > iou_threshold, k=1).astype(np.float32)
+
+    keep = np.ones(len(order), dtype=np.float32)
+    for _ in range(len(order)):
+        updated = (keep @ suppresses == 0).astype(np.float32)
+        if np.array_equal(updated, keep):
+            break
+        keep = updated
+    kept = np.flatnonzero(keep)[:max_detections]
+    return Detections(boxes[kept], detections.scores[order][kept], classes[kept])
+
+
+def calibrate_scores(
+    scores: np.ndarray,
+    warning: np.ndarray,
+    critical: np.ndarray,
+    global_warning: float,
+    global_critical: float,
+) -> np.ndarray:
+    """Rescale scores so per-class thresholds land on the global ones
+
+    A piecewise-linear map sends 0 → 0, the class warning threshold to
+    ``global_warning``, its critical threshold to ``global_critical`` and
+    1 → 1, so one smoothed confidence can drive alarms for every class.
+    """
+    low = scores * global_warning / np.maximum(warning, 1e-9)
+    mid = global_warning + (scores - warning) * (global_critical - global_warning) / (
+        np.maximum(critical - warning, 1e-9)
+    )
+    high = global_critical + (scores - critical) * (1.0 - global_critical) / (
+        np.maximum(1.0 - critical, 1e-9)
+    )
+    return np.where(scores < warning, low, np.where(scores < critical, mid, high))
+
+
+class YoloModel(OnnxModel):
+    """YOLO-style object detector on the shared ONNX Runtime session setup
+
+    ``predict()`` decodes the raw head output, drops weak candidates, runs
+    NMS and keeps the result in ``last_detections`` (boxes in model input
+    pixels). All of it is vectorized numpy. ``class_thresholds`` maps class
+    names to their own (warning, critical) thresholds; classes without an
+    entry, or without a name, use the global ones. The returned confidence
+    is the best box score rescaled onto the global thresholds.
+    """
+
+    requires_class_index = False
+
+    def __init__(
+        self,
+        model_path: str,
+        class_names: Sequence[str] = (),
+        class_thresholds: Optional[Dict[str, Tuple[float, float]]] = None,
+        box_format: str = "yolov8",
+        score_threshold: float = 0.25,
+        iou_threshold: float = 0.45,
+        max_detections: int = 100,
+        max_candidates: int = 512,
+        **kwargs,
+    ):
+        if box_format not in BOX_FORMATS:
+            raise ValueError(f"Unsupported box format: {box_format}")
+        super().__init__(model_path, **kwargs)
+        self.class_names = list(class_names)
+        self.box_format = box_format
+        self.score_threshold = score_threshold
+        self.iou_threshold = iou_threshold
+        self.max_detections = max_detections
+        self.max_candidates = max_candidates
+        self.last_detections: Optional[Detections] = None
+
+        # Per-class threshold lookup tables, indexed by class id; the extra
+        # last entry holds the global thresholds for class ids beyond the names
+        count = len(self.class_names) + 1
+        self._warning = np.full(count, self.warning_threshold, dtype=np.float32)
+        self._critical = np.full(count, self.critical_threshold, dtype=np.float32)
+        for name, (warning, critical) in (class_thresholds or {}).items():
+            if name not in self.class_names:
+                raise ValueError(f"Thresholds given for unknown class: {name}")
+            if not warning < critical:
+                raise ValueError(
+                    f"Warning threshold of {name} must be below its critical one"
+                )
+            index = self.class_names.index(name)
+            self._warning[index], self._critical[index] = warning, critical
+
+    @classmethod
+    def from_config(cls, config) -> "YoloModel":
+        """Build a detector from a ModelConfig"""
+        if not getattr(config, "path", None):
+            raise ValueError("ModelConfig.path is required for YOLO models")
+        return cls(
+            config.path,
+            class_names=config.class_names,
+            class_thresholds=config.class_thresholds,
+            box_format=config.box_format,
+            score_threshold=config.score_threshold,
+            iou_threshold=config.iou_threshold,
+            max_detections=config.max_detections,
+            warning_threshold=config.warning_threshold,
+            critical_threshold=config.critical_threshold,
+            intra_op_threads=config.intra_op_threads,
+            inter_op_threads=config.inter_op_threads,
+            graph_optimization=config.graph_optimization,
+            roi=config.roi,
+            letterbox=config.letterbox,
+            use_cache=config.use_optimized_cache,
+        )
+
+    def postprocess(self, output: np.ndarray) -> Detections:
+        """Decode and NMS one raw head output"""
+        candidates = decode_predictions(
+            output, self.box_format, self.score_threshold, self.max_candidates
+        )
+        return non_max_suppression(candidates, self.iou_threshold, self.max_detections)
+
+    def _decide(self, detections: Detections) -> tuple[float, bool, bool]:
+        if len(detections.scores) == 0:
+            return 0.0, False, False
+        classes = np.minimum(detections.classes, len(self.class_names))
+        warning, critical = self._warning[classes], self._critical[classes]
+        scores = detections.scores
+        calibrated = calibrate_scores(
+            scores, warning, critical, self.warning_threshold, self.critical_threshold
+        )
+        return (
+            float(np.clip(calibrated.max(), 0.0, 1.0)),
+            bool(np.any(scores > warning)),
+            bool(np.any(scores > critical)),
+        )
+
+    def predict(self, frame: np.ndarray) -> tuple[float, bool, bool]:
+        outputs = self.run(frame)
+        start = time.perf_counter()
+        self.last_detections = self.postprocess(outputs[0])
+        result = self._decide(self.last_detections)
+        self.timings["postprocess"] = time.perf_counter() - start
+        return result
+
+    def score_batch(self, tensors: np.ndarray) -> np.ndarray:
+        """Calibrated confidences for a stack of preprocessed tensors"""
+        if self.dynamic_batch:
+            outputs = self.session.run(
+                self.output_names[:1], {self.input_name: tensors}
+            )[0]
+        else:
+            outputs = [
+                self.session.run(
+                    self.output_names[:1], {self.input_name: tensors[i : i + 1]}
+                )[0]
+                for i in range(len(tensors))
+            ]
+        return np.array(
+            [self._decide(self.postprocess(output))[0] for output in outputs],
+            dtype=np.float32,
+        )
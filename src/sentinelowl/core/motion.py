@@ -0,0 +1,91 @@
+import cv2
+import numpy as np
+from typing import Optional, Tuple
+
+
+class MotionGate:
+    """Cheap change detector used to skip inference on unchanged frames
+
+    Each frame is reduced to a small grayscale thumbnail and compared with
+    the thumbnail of the last frame that was actually analysed. Inference
+    is only needed when the mean absolute difference exceeds ``threshold``
+    (as a fraction of full scale) or ``refresh_interval`` ticks have passed.
+
+    ``should_analyze(frame, commit=False)`` leaves the reference alone and
+    ``commit()`` adopts a frame's ``thumbnail()`` later, once it was really
+    analysed, so a frame dropped in between is never taken as the baseline.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.02,
+        thumbnail_size: Tuple[int, int] = (32, 24),
+        refresh_interval: int = 12,
+    ):
+        self.threshold = threshold
+        self.thumbnail_size = thumbnail_size
+        self.refresh_interval = refresh_interval
+        self.last_score = 0.0
+        self._reference: Optional[np.ndarray] = None
+        self._reference_buffer = np.empty(thumbnail_size[::-1], dtype=np.uint8)
+        self._thumbnail = np.empty(thumbnail_size[::-1], dtype=np.uint8)
+        self._diff = np.empty(thumbnail_size[::-1], dtype=np.uint8)
+        self._ticks_since_refresh = 0
+
+    @classmethod
+    def from_config(cls, config) -> "MotionGate":
+        """Build a gate from a DetectionConfig"""
+        size = config.motion_thumbnail_width
+        return cls(
+            threshold=config.motion_threshold,
+            thumbnail_size=(size, max(1, size * 3 // 4)),
+            refresh_interval=config.motion_refresh_interval,
+        )
+
+    def _make_thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        # Downscale first so colour conversion only touches a few hundred pixels
+        small = cv2.resize(frame, self.thumbnail_size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self._thumbnail)
+        else:
+            np.copyto(self._thumbnail, small)
+        return self._thumbnail
+
+    def should_analyze(self, frame: Optional[np.ndarray], commit: bool = True) -> bool:
+        """Return True if the frame differs enough to warrant inference"""
+        if frame is None or not isinstance(frame, np.ndarray) or frame.ndim < 2:
+            return True
+
+        thumbnail = self._make_thumbnail(frame)
+        self._ticks_since_refresh += 1
+        if self._reference is None:
+            self.last_score = 1.0
+        else:
+            cv2.absdiff(thumbnail, self._reference, dst=self._diff)
+            self.last_score = float(self._diff.mean()) / 255.0
+
+        if (
+            self._reference is not None
+            and self.last_score <= self.threshold
+            and self._ticks_since_refresh < self.refresh_interval
+        ):
+            return False
+
+        if commit:
+            self.commit(thumbnail)
+        return True
+
+    def thumbnail(self) -> np.ndarray:
+        """Copy of the thumbnail of the last frame passed to ``should_analyze()``"""
+        return self._thumbnail.copy()
+
+    def commit(self, thumbnail: np.ndarray):
+        """Make ``thumbnail`` the reference of an analysed frame"""
+        self._reference = self._reference_buffer
+        np.copyto(self._reference, thumbnail)
+        self._ticks_since_refresh = 0
+
+    def reset(self):
+        """Forget the reference frame so the next frame is always analysed"""
+        self._reference = None
+        self._ticks_since_refresh = 0
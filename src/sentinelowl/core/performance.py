@@ -1,8 +1,23 @@
+import math
 import time
+import functools
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Deque
+from typing import Deque, Dict, List, Optional
 from collections import deque
 
+# Pipeline stages instrumented by the engine
+STAGES = (
+    "capture",
+    "decode",
+    "prefilter",  # First stage of a model cascade
+    "preprocess",
+    "inference",
+    "postprocess",
+    "action",
+    "estop",  # Critical detection → Moonraker accepted PAUSE
+)
+
 
 @dataclass
 class PerformanceStats:
@@ -11,29 +26,191 @@ class PerformanceStats:
     fps: float
     processing_time: float
     frame_queue_size: int
+    skip_ratio: float = 0.0  # Fraction of frames answered by the motion gate
+
+
+class LatencyHistogram:
+    """Fixed log-spaced bucket histogram with O(1) updates
+
+    Bucket ``i`` counts samples up to ``min_value * factor ** i`` seconds;
+    the last bucket is unbounded. Percentiles are interpolated within the
+    bucket that contains them, which bounds their relative error by
+    ``factor``.
+    """
+
+    def __init__(
+        self, min_value: float = 1e-5, max_value: float = 60.0, factor: float = 1.5
+    ):
+        self.min_value = min_value
+        self._log_min = math.log(min_value)
+        self._log_factor = math.log(factor)
+        size = int(math.ceil((math.log(max_value) - self._log_min) / self._log_factor))
+        self.bounds: List[float] = [min_value * factor**i for i in range(size + 1)]
+        self.counts: List[int] = [0] * (len(self.bounds) + 1)  # + overflow bucket
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """Record one sample (seconds)"""
+        if value <= self.min_value:
+            index = 0
+        else:
+            index = int(math.ceil((math.log(value) - self._log_min) / self._log_factor))
+            index = min(index, len(self.counts) - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, q: float) -> float:
+        """Estimate the ``q``-th percentile (0 to 100)"""
+        if self.count == 0:
+            return 0.0
+        rank = q / 100.0 * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                if index >= len(self.bounds):
+                    return self.bounds[-1]  # Overflow bucket has no upper bound
+                upper = self.bounds[index]
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.bounds[-1]
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
 
 
 class PerformanceMonitor:
-    """Performance monitoring handler"""
+    """Performance monitoring handler
+
+    Besides the frame-rate window it keeps a latency histogram per pipeline
+    stage (see ``STAGES``), a histogram of frame age at decision time and
+    skipped/dropped frame counters. Stages are timed with ``stage()`` or the
+    ``timed()`` decorator and exported with ``to_prometheus()``.
+    """
 
     def __init__(self, window_size: int = 10):
         self.window_size = window_size
         self.frame_times: Deque[float] = deque(maxlen=window_size)
         self.processing_times: Deque[float] = deque(maxlen=window_size)
+        self._processing_sum = 0.0
         self.start_time = time.time()
+        self.total_frames = 0
+        self.skipped_frames = 0
+        self.dropped_frames = 0
+        self.cascade_frames = 0  # Frames scored by a cascade prefilter
+        self.escalated_frames = 0  # ... of which reached the second stage
+        self.queue_size = 0
+        self.failures: Dict[str, int] = {}  # Frames lost to errors, per stage
+        self.stages: Dict[str, LatencyHistogram] = {
+            stage: LatencyHistogram() for stage in STAGES
+        }
+        self.frame_age = LatencyHistogram()
 
     def start_frame(self):
         """Record the start of a frame"""
         self.frame_times.append(time.time())
 
-    def end_frame(self):
-        """Record the end of a frame"""
-        self.processing_times.append(time.time() - self.frame_times[-1])
+    def end_frame(self, skipped: bool = False):
+        """Record the end of a frame
+
+        ``skipped`` marks frames whose inference was skipped by the motion gate.
+        """
+        if len(self.processing_times) == self.processing_times.maxlen:
+            self._processing_sum -= self.processing_times[0]
+        elapsed = time.time() - self.frame_times[-1]
+        self.processing_times.append(elapsed)
+        self._processing_sum += elapsed
+        self.total_frames += 1
+        if skipped:
+            self.skipped_frames += 1
+
+    def record_stage(self, stage: str, seconds: float):
+        """Record the latency of one pipeline stage"""
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = LatencyHistogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def stage(self, stage: str):
+        """Time the enclosed block as ``stage``"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(stage, time.perf_counter() - start)
+
+    def timed(self, stage: str):
+        """Decorator timing every call of the wrapped function as ``stage``"""
+
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.record_stage(stage, time.perf_counter() - start)
+
+            return wrapper
+
+        return decorator
+
+    def record_frame_age(self, seconds: float):
+        """Record how old a frame was when its result was acted on"""
+        self.frame_age.observe(seconds)
+
+    def record_dropped(self, count: int = 1):
+        """Record frames that were captured but never analysed"""
+        self.dropped_frames += count
+
+    def record_failure(self, stage: str):
+        """Record a frame lost to an exception in ``stage``"""
+        self.failures[stage] = self.failures.get(stage, 0) + 1
+
+    def record_escalation(self, escalated: bool):
+        """Record whether a cascade escalated a frame to its second stage"""
+        self.cascade_frames += 1
+        if escalated:
+            self.escalated_frames += 1
+
+    def get_escalation_rate(self) -> float:
+        """Fraction of cascade frames that reached the second stage"""
+        if self.cascade_frames == 0:
+            return 0.0
+        return self.escalated_frames / self.cascade_frames
+
+    def set_queue_size(self, size: int):
+        """Record the current number of frames waiting in the pipeline"""
+        self.queue_size = size
+
+    def get_skip_ratio(self) -> float:
+        """Fraction of frames for which inference was skipped"""
+        if self.total_frames == 0:
+            return 0.0
+        return self.skipped_frames / self.total_frames
+
+    def get_percentiles(
+        self, stage: str, quantiles=(50, 95, 99)
+    ) -> Optional[Dict[str, float]]:
+        """Latency percentiles of ``stage`` in seconds, keyed "p50", "p95", ..."""
+        histogram = self.frame_age if stage == "frame_age" else self.stages.get(stage)
+        if histogram is None:
+            return None
+        return {f"p{q}": histogram.percentile(q) for q in quantiles}
 
     def get_stats(self) -> PerformanceStats:
         """Calculate performance statistics"""
         if len(self.frame_times) < 2:
-            return PerformanceStats(fps=0.0, processing_time=0.0, frame_queue_size=0)
+            return PerformanceStats(
+                fps=0.0,
+                processing_time=0.0,
+                frame_queue_size=self.queue_size,
+                skip_ratio=self.get_skip_ratio(),
+            )
 
         # 计算时间窗口内的帧率
         time_window = self.frame_times[-1] - self.frame_times[0]
@@ -42,9 +219,9 @@ class PerformanceMonitor:
         else:
             fps = (len(self.frame_times) - 1) / time_window  # N个时间间隔对应 N-1 个帧
 
-        # 计算平均处理时间
+        # 平均处理时间（滑动窗口累加和）
         avg_processing_time = (
-            sum(self.processing_times) / len(self.processing_times)
+            self._processing_sum / len(self.processing_times)
             if self.processing_times
             else 0.0
         )
@@ -52,5 +229,76 @@ class PerformanceMonitor:
         return PerformanceStats(
             fps=fps,
             processing_time=avg_processing_time,
-            frame_queue_size=len(self.frame_times),
+            frame_queue_size=self.queue_size,
+            skip_ratio=self.get_skip_ratio(),
+        )
+
+    def to_prometheus(self, prefix: str = "sentinelowl") -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        stats = self.get_stats()
+        lines = [
+            f"# HELP {prefix}_fps Analysed frames per second",
+            f"# TYPE {prefix}_fps gauge",
+            f"{prefix}_fps {stats.fps:.6g}",
+            f"# HELP {prefix}_frame_queue_size Frames waiting in the pipeline",
+            f"# TYPE {prefix}_frame_queue_size gauge",
+            f"{prefix}_frame_queue_size {stats.frame_queue_size}",
+        ]
+        for name, value, help_text in (
+            ("frames_total", self.total_frames, "Frames handled"),
+            ("frames_skipped_total", self.skipped_frames, "Frames gated"),
+            ("frames_dropped_total", self.dropped_frames, "Frames never analysed"),
+            ("cascade_frames_total", self.cascade_frames, "Frames prefiltered"),
+            ("cascade_escalated_total", self.escalated_frames, "Frames escalated"),
+        ):
+            lines += [
+                f"# HELP {prefix}_{name} {help_text}",
+                f"# TYPE {prefix}_{name} counter",
+                f"{prefix}_{name} {value}",
+            ]
+
+        lines += [
+            f"# HELP {prefix}_stage_failures_total Frames lost to a stage error",
+            f"# TYPE {prefix}_stage_failures_total counter",
+        ] + [
+            f'{prefix}_stage_failures_total{{stage="{stage}"}} {count}'
+            for stage, count in self.failures.items()
+        ]
+        lines += _render_histogram(
+            f"{prefix}_stage_latency_seconds",
+            "Latency of each pipeline stage",
+            {f'stage="{stage}"': h for stage, h in self.stages.items()},
         )
+        lines += _render_histogram(
+            f"{prefix}_frame_age_seconds",
+            "Age of the frame when its result was acted on",
+            {"": self.frame_age},
+        )
+        return "\n".join(lines) + "\n"
+
+
+def _render_histogram(
+    name: str, help_text: str, histograms: Dict[str, LatencyHistogram]
+) -> List[str]:
+    """Prometheus histogram lines plus p50/p95/p99 quantile gauges"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, histogram in histograms.items():
+        sep = "," if labels else ""
+        cumulative = 0
+        for bound, bucket_count in zip(histogram.bounds, histogram.counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{labels}{sep}le="{bound:.6g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {histogram.count}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {histogram.sum:.6g}")
+        lines.append(f"{name}_count{suffix} {histogram.count}")
+
+    lines += [f"# TYPE {name}_quantile gauge"]
+    for labels, histogram in histograms.items():
+        sep = "," if labels else ""
+        for q in (50, 95, 99):
+            value = histogram.percentile(q)
+            lines.append(
+                f'{name}_quantile{{{labels}{sep}quantile="0.{q}"}} {value:.6g}'
+            )
+    return lines
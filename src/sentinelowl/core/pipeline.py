@@ -0,0 +1,223 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncContextManager,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    NamedTuple,
+    Optional,
+)
+from .performance import PerformanceMonitor
+
+
+class DropOldestQueue:
+    """Bounded asyncio queue that evicts the oldest item when full
+
+    A slow consumer therefore always receives the freshest items instead of
+    stalling its producer.
+    """
+
+    def __init__(self, maxsize: int = 1):
+        self.maxsize = max(1, maxsize)
+        self.dropped = 0
+        self._items: Deque[Any] = deque()
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put_nowait(self, item) -> int:
+        """Enqueue ``item``; return how many old items were evicted (0 or 1)"""
+        evicted = 0
+        if len(self._items) >= self.maxsize:
+            self._items.popleft()
+            evicted = 1
+            self.dropped += 1
+        self._items.append(item)
+        self._ready.set()
+        return evicted
+
+    def clear(self):
+        self._items.clear()
+
+    async def get(self):
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._items.popleft()
+
+
+class PipelineItem(NamedTuple):
+    """A frame travelling through the pipeline stages"""
+
+    frame: Any
+    captured_at: float  # time.monotonic() at capture
+    sequence: Optional[int]
+    prepared: Any = None  # Output of the preprocess stage
+    result: Any = None  # DetectionResult from the inference stage
+    skipped: bool = False  # Inference answered without running the model
+
+
+class FramePipeline:
+    """Capture → preprocess → inference → action as concurrent stages
+
+    Each stage runs as its own task, and the blocking ones on a dedicated
+    single-thread executor, so a frame can be captured while the previous
+    one is preprocessed and the one before that is inferred. Stages are
+    linked by ``DropOldestQueue``s of ``queue_size``: when a later stage
+    falls behind, the stale frames are dropped (and counted) and the next
+    decision uses the freshest one. Throughput is bounded by the slowest
+    stage instead of the sum of all of them. The summed queue depth is
+    reported as ``PerformanceStats.frame_queue_size``.
+
+    ``slot``, if given, returns an async context manager entered around each
+    inference, so pipelines sharing one model can take turns on it.
+
+    An exception from a stage callback only loses that frame: it is logged,
+    counted with ``PerformanceMonitor.record_failure()`` and the stage moves
+    on to the next frame, so one bad frame or a flaky camera cannot stop
+    monitoring.
+    """
+
+    STAGES = ("capture", "preprocess", "inference")
+
+    def __init__(
+        self,
+        capture: Callable[[], tuple],
+        prepare: Callable[[Any], Any],
+        infer: Callable[[Any], tuple],
+        act: Callable[[PipelineItem], None],
+        pace: Callable[[], Awaitable[None]],
+        performance: Optional[PerformanceMonitor] = None,
+        queue_size: int = 1,
+        slot: Optional[Callable[[], AsyncContextManager]] = None,
+    ):
+        self.capture = capture  # () -> (frame, captured_at, sequence)
+        self.prepare = prepare  # frame -> prepared input
+        self.infer = infer  # prepared -> (DetectionResult, skipped)
+        self.act = act  # Runs on the event loop thread
+        self.pace = pace  # Awaited between captures
+        self.slot = slot
+        self.performance = performance or PerformanceMonitor()
+        self.queues = {
+            "preprocess": DropOldestQueue(queue_size),
+            "inference": DropOldestQueue(queue_size),
+            "action": DropOldestQueue(queue_size),
+        }
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+
+    def _put(self, stage: str, item: PipelineItem):
+        self.performance.record_dropped(self.queues[stage].put_nowait(item))
+        self.performance.set_queue_size(sum(len(q) for q in self.queues.values()))
+
+    async def _get(self, stage: str) -> PipelineItem:
+        item = await self.queues[stage].get()
+        self.performance.set_queue_size(sum(len(q) for q in self.queues.values()))
+        return item
+
+    async def _run_in(self, stage: str, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executors[stage], fn, *args)
+
+    async def _run_holding_slot(self, prepared):
+        """Run inference; if cancelled, keep the slot until the call returns"""
+        future = asyncio.ensure_future(self._run_in("inference", self.infer, prepared))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            await asyncio.wait([future])
+            raise
+
+    def _failed(self, stage: str, error: Exception):
+        """Count and log a frame lost to a stage error"""
+        self.performance.record_failure(stage)
+        print(f"⚠️ Pipeline {stage} failed: {error!r}")
+
+    async def _capture_stage(self):
+        last_sequence = None
+        while True:
+            try:
+                with self.performance.stage("capture"):
+                    frame, captured_at, sequence = await self._run_in(
+                        "capture", self.capture
+                    )
+            except Exception as e:
+                self._failed("capture", e)
+                frame, sequence = None, None
+            if sequence is not None:
+                if last_sequence is not None and sequence > last_sequence + 1:
+                    self.performance.record_dropped(sequence - last_sequence - 1)
+                last_sequence = sequence
+            if frame is not None:
+                self._put("preprocess", PipelineItem(frame, captured_at, sequence))
+            await self.pace()
+
+    async def _preprocess_stage(self):
+        while True:
+            item = await self._get("preprocess")
+            try:
+                prepared = await self._run_in("preprocess", self.prepare, item.frame)
+            except Exception as e:
+                self._failed("preprocess", e)
+                continue
+            self._put("inference", item._replace(prepared=prepared))
+
+    async def _inference_stage(self):
+        while True:
+            item = await self._get("inference")
+            try:
+                async with self.slot() if self.slot is not None else nullcontext():
+                    self.performance.start_frame()
+                    result, skipped = await self._run_holding_slot(item.prepared)
+                    self.performance.end_frame(skipped=skipped)
+            except Exception as e:
+                self._failed("inference", e)
+                continue
+            self._put("action", item._replace(result=result, skipped=skipped))
+
+    async def _action_stage(self):
+        while True:
+            item = await self._get("action")
+            try:
+                with self.performance.stage("action"):
+                    self.act(item)
+            except Exception as e:
+                self._failed("action", e)
+                continue
+            self.performance.record_frame_age(time.monotonic() - item.captured_at)
+
+    async def run(self):
+        """Run all stages until cancelled; in-flight work finishes first"""
+        self._executors = {
+            stage: ThreadPoolExecutor(1, thread_name_prefix=f"sentinelowl-{stage}")
+            for stage in self.STAGES
+        }
+        tasks = [
+            asyncio.ensure_future(stage())
+            for stage in (
+                self._capture_stage,
+                self._preprocess_stage,
+                self._inference_stage,
+                self._action_stage,
+            )
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Let running capture/inference calls return before resources close
+            loop = asyncio.get_running_loop()
+            for executor in self._executors.values():
+                await loop.run_in_executor(None, executor.shutdown)
+            self._executors = {}
+            for queue in self.queues.values():
+                queue.clear()
+            self.performance.set_queue_size(0)
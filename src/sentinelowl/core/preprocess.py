@@ -0,0 +1,158 @@
+import cv2
+import numpy as np
+from typing import Any, Dict, Optional, Tuple
+
+# ONNX tensor type strings to numpy dtypes
+ONNX_DTYPES = {
+    "tensor(float)": np.float32,
+    "tensor(float16)": np.float16,
+    "tensor(double)": np.float64,
+    "tensor(uint8)": np.uint8,
+    "tensor(int8)": np.int8,
+    "tensor(int32)": np.int32,
+    "tensor(int64)": np.int64,
+}
+
+# Output depths cv2.LUT can write directly
+_CV_LUT_DTYPES = {np.uint8, np.int8, np.int32, np.float32, np.float64}
+
+
+class Preprocessor:
+    """Reusable BGR frame → NCHW tensor converter
+
+    All buffers are allocated once from the model input shape. Each call
+    crops the optional ROI (a view), resizes the small region first, maps it
+    through a 256-entry lookup table that fuses the dtype cast and the
+    normalization, then copies it into the contiguous NCHW output while
+    swapping BGR→RGB. Single-channel frames are expanded to BGR first. The
+    returned array is the internal buffer and is overwritten by the next call.
+    """
+
+    def __init__(
+        self,
+        shape: Tuple[int, int, int, int],
+        dtype=np.float32,
+        roi: Optional[Tuple[int, int, int, int]] = None,
+        letterbox: bool = False,
+        pad_value: int = 114,
+        scale: float = 1.0 / 255.0,
+        interpolation: int = cv2.INTER_LINEAR,
+    ):
+        if len(shape) != 4:
+            raise ValueError(f"Expected NCHW input, got shape {shape}")
+        _, c, h, w = shape
+        if c not in (1, 3):
+            raise ValueError(f"Unsupported channel number: {c}")
+
+        self.channels, self.height, self.width = c, h, w
+        self.roi = roi  # (x, y, width, height) in source pixels
+        self.letterbox = letterbox
+        self.pad_value = pad_value
+        self.interpolation = interpolation
+        self.output = np.zeros(shape, dtype=dtype)
+
+        # uint8 → model dtype (and value range) in a single table lookup
+        if np.issubdtype(np.dtype(dtype), np.floating):
+            self._lut = (np.arange(256, dtype=np.float64) * scale).astype(dtype)
+        else:
+            self._lut = np.arange(256).astype(dtype)
+
+        self._resized = np.full((h, w, 3), pad_value, dtype=np.uint8)
+        self._gray = np.empty((h, w), dtype=np.uint8)
+        self._use_cv_lut = np.dtype(dtype).type in _CV_LUT_DTYPES
+        self._normalized = np.empty((h, w, 3), dtype=dtype)
+        self._source_shape = None
+        self._content = self._resized  # Region of _resized that holds the image
+        self._scratch = None
+        self._bgr = None  # Source-sized buffer for expanding grayscale frames
+        self.scale = (1.0, 1.0)  # Model pixels per source pixel (x, y)
+        self.offset = (0.0, 0.0)  # Model-space position of the source origin
+
+    @classmethod
+    def from_metadata(cls, metadata: Dict[str, Any], **kwargs) -> "Preprocessor":
+        """Build a preprocessor from ``get_model_metadata()`` output"""
+        dtype = metadata["dtype"]
+        if dtype not in ONNX_DTYPES:
+            raise ValueError(f"Unsupported dtype: {dtype}")
+        shape = tuple(
+            d if isinstance(d, int) and d > 0 else 1 for d in metadata["shape"]
+        )
+        return cls(shape, dtype=ONNX_DTYPES[dtype], **kwargs)
+
+    def _update_geometry(self, source_h: int, source_w: int):
+        """Recompute resize targets when the source resolution changes"""
+        self._source_shape = (source_h, source_w)
+        roi_x, roi_y = (self.roi[0], self.roi[1]) if self.roi else (0, 0)
+
+        if not self.letterbox:
+            self._content = self._resized
+            self._scratch = None
+            sx, sy = self.width / source_w, self.height / source_h
+            self.scale = (sx, sy)
+            self.offset = (-roi_x * sx, -roi_y * sy)
+            return
+
+        ratio = min(self.width / source_w, self.height / source_h)
+        new_w = max(1, int(round(source_w * ratio)))
+        new_h = max(1, int(round(source_h * ratio)))
+        dx, dy = (self.width - new_w) // 2, (self.height - new_h) // 2
+        self._resized[...] = self.pad_value
+        self._content = self._resized[dy : dy + new_h, dx : dx + new_w]
+        # cv2.resize needs a contiguous destination
+        self._scratch = np.empty((new_h, new_w, 3), dtype=np.uint8)
+        self.scale = (ratio, ratio)
+        self.offset = (dx - roi_x * ratio, dy - roi_y * ratio)
+
+    def __call__(self, frame: np.ndarray) -> np.ndarray:
+        """Convert a BGR frame into the model input tensor"""
+        if frame.shape == self.output.shape:
+            np.copyto(self.output, frame, casting="unsafe")
+            return self.output
+
+        if self.roi is not None:
+            x, y, w, h = self.roi
+            frame = frame[y : y + h, x : x + w]
+        if frame.shape[:2] != self._source_shape:
+            self._update_geometry(*frame.shape[:2])
+        if frame.ndim == 2:
+            # cv2.resize would silently allocate instead of using the 3-channel dst
+            if self._bgr is None or self._bgr.shape[:2] != frame.shape:
+                self._bgr = np.empty(frame.shape + (3,), dtype=np.uint8)
+            cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR, dst=self._bgr)
+            frame = self._bgr
+
+        if self._scratch is None:
+            cv2.resize(
+                frame,
+                (self.width, self.height),
+                dst=self._resized,
+                interpolation=self.interpolation,
+            )
+        else:
+            cv2.resize(
+                frame,
+                self._scratch.shape[1::-1],
+                dst=self._scratch,
+                interpolation=self.interpolation,
+            )
+            self._content[...] = self._scratch
+
+        if self.channels == 1:
+            cv2.cvtColor(self._resized, cv2.COLOR_BGR2GRAY, dst=self._gray)
+            if self._use_cv_lut:
+                cv2.LUT(self._gray, self._lut, dst=self.output[0, 0])
+            else:
+                np.take(self._lut, self._gray, out=self.output[0, 0], mode="clip")
+        elif self._use_cv_lut:
+            cv2.LUT(self._resized, self._lut, dst=self._normalized)
+            # HWC → CHW and BGR → RGB in one strided copy
+            np.copyto(self.output[0], self._normalized.transpose(2, 0, 1)[::-1])
+        else:
+            for i in range(3):
+                np.take(
+                    self._lut,
+                    self._resized[:, :, 2 - i],
+                    out=self.output[0, i],
+                    mode="clip",
+                )
+        return self.output
@@ -1,43 +1,62 @@
+import time
 import asyncio
 from typing import Optional
-import cv2
 from .camera import CameraHandler
-from .detector import DefectDetector
+from .detector import DefectDetector, DetectionResult
+from .motion import MotionGate
+from .performance import PerformanceMonitor
+from .pipeline import FramePipeline
 
 
 class FrameProcessor:
     """Continuous frame processing engine"""
 
-    def __init__(self, config):
+    def __init__(self, config, performance: Optional[PerformanceMonitor] = None):
+        self.config = config
         self.camera = CameraHandler(config.camera)
-        self.detector = DefectDetector(config.model)
-        self._running = False
+        gate = (
+            MotionGate.from_config(config.detection)
+            if config.detection.motion_gate
+            else None
+        )
+        self.detector = DefectDetector(config.model, gate=gate)
+        self.performance = performance or PerformanceMonitor()
+        self._task: Optional[asyncio.Future] = None
 
     async def start(self):
-        """Start continuous processing"""
-        self._running = True
-        while self._running:
-            frame = await self._capture_frame()
-            if frame is not None:
-                result = await self._analyze_frame(frame)
-                self._handle_result(result)
-            await asyncio.sleep(1 / config.camera.fps)
-
-    async def _capture_frame(self) -> Optional[np.ndarray]:
-        """Asynchronous frame capture"""
-        return await asyncio.get_event_loop().run_in_executor(
-            None, self.camera.capture_frame
+        """Start continuous processing as a staged pipeline"""
+        pipeline = FramePipeline(
+            capture=self._capture,
+            prepare=self.detector.prepare,
+            infer=self._infer,
+            act=lambda item: self._handle_result(item.result),
+            pace=lambda: asyncio.sleep(self.config.detection.interval),
+            performance=self.performance,
+            queue_size=self.config.detection.queue_size,
         )
+        self._task = asyncio.ensure_future(pipeline.run())
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._task = None
 
-    async def _analyze_frame(self, frame: np.ndarray) -> dict:
-        """Asynchronous frame analysis"""
-        return await asyncio.get_event_loop().run_in_executor(
-            None, self.detector.analyze, frame
-        )
+    def stop(self):
+        """Stop processing; in-flight frames finish first"""
+        if self._task is not None:
+            self._task.cancel()
+
+    def _capture(self):
+        return self.camera.capture_frame(), time.monotonic(), None
+
+    def _infer(self, prepared):
+        result = self.detector.infer(prepared)
+        return result, self.detector.last_skipped
 
-    def _handle_result(self, result: dict):
+    def _handle_result(self, result: DetectionResult):
         """Handle detection results"""
-        if result["critical"]:
-            print(f"🛑 CRITICAL DEFECT! Confidence: {result['confidence']:.2f}")
-        elif result["warning"]:
-            print(f"⚠️ Warning: Confidence {result['confidence']:.2f}")
+        if result.is_critical:
+            print(f"🛑 CRITICAL DEFECT! Confidence: {result.confidence:.2f}")
+        elif result.is_warning:
+            print(f"⚠️ Warning: Confidence {result.confidence:.2f}")
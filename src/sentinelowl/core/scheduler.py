@@ -0,0 +1,99 @@
+from typing import NamedTuple
+
+
+class ScheduleDecision(NamedTuple):
+    """Smoothed view of a detection result"""
+
+    smoothed_confidence: float  # EWMA of the raw confidence
+    is_warning: bool  # Smoothed score is in the warning band
+    is_critical: bool  # Smoothed score is in the critical band
+    interval: float  # Seconds until the next detection
+
+
+class AdaptiveScheduler:
+    """Confidence-driven detection interval with EWMA and hysteresis
+
+    The raw confidence is smoothed with an exponentially weighted moving
+    average. As the smoothed score rises toward ``warning_threshold`` the
+    interval shrinks linearly from ``max_interval`` to ``min_interval``
+    immediately; while the score stays low and stable it grows back by
+    ``growth`` per tick. Warning/critical states are entered on the smoothed
+    score and only left once it falls ``hysteresis`` below the threshold, so
+    a single noisy frame neither raises nor clears an alarm.
+    """
+
+    def __init__(
+        self,
+        interval: float = 5.0,
+        min_interval: float = 1.0,
+        max_interval: float = 30.0,
+        warning_threshold: float = 0.7,
+        critical_threshold: float = 0.85,
+        smoothing: float = 0.5,
+        hysteresis: float = 0.05,
+        growth: float = 1.25,
+        stability: float = 0.05,
+    ):
+        if not 0.0 < smoothing <= 1.0:
+            raise ValueError(f"Smoothing factor must be in (0, 1]: {smoothing}")
+        self.min_interval = min(min_interval, max_interval)
+        self.max_interval = max_interval
+        self.warning_threshold = warning_threshold
+        self.critical_threshold = critical_threshold
+        self.smoothing = smoothing
+        self.hysteresis = hysteresis
+        self.growth = growth
+        self.stability = stability
+
+        self.interval = min(max(interval, self.min_interval), self.max_interval)
+        self.smoothed_confidence = 0.0
+        self.is_warning = False
+        self.is_critical = False
+
+    @classmethod
+    def from_config(cls, config) -> "AdaptiveScheduler":
+        """Build a scheduler from a DetectionConfig"""
+        return cls(
+            interval=config.interval,
+            min_interval=config.min_interval,
+            max_interval=config.max_interval,
+            warning_threshold=config.warning_threshold,
+            critical_threshold=config.critical_threshold,
+            smoothing=config.smoothing,
+            hysteresis=config.hysteresis,
+        )
+
+    @property
+    def rate(self) -> float:
+        """Current detection rate in detections per second"""
+        return 1.0 / self.interval if self.interval > 0 else 0.0
+
+    def _target_interval(self) -> float:
+        ratio = min(max(self.smoothed_confidence / self.warning_threshold, 0.0), 1.0)
+        return self.max_interval - ratio * (self.max_interval - self.min_interval)
+
+    def update(self, confidence: float) -> ScheduleDecision:
+        """Feed a raw confidence and return the smoothed decision"""
+        # The average starts from 0.0, so a noisy first frame is damped too
+        previous = self.smoothed_confidence
+        self.smoothed_confidence += self.smoothing * (confidence - previous)
+        score = self.smoothed_confidence
+
+        # Enter on the threshold, leave only below threshold - hysteresis
+        if self.is_critical:
+            self.is_critical = score >= self.critical_threshold - self.hysteresis
+        else:
+            self.is_critical = score >= self.critical_threshold
+        if self.is_warning:
+            self.is_warning = score >= self.warning_threshold - self.hysteresis
+        else:
+            self.is_warning = score >= self.warning_threshold
+
+        # Fast attack, slow release
+        target = self._target_interval()
+        if target < self.interval:
+            self.interval = target
+        elif abs(score - previous) <= self.stability:
+            self.interval = min(self.interval * self.growth, target)
+
+        return ScheduleDecision(score, self.is_warning, self.is_critical, self.interval)
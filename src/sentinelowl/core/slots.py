@@ -0,0 +1,72 @@
+import heapq
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from typing import Dict, List
+
+PRIORITY_ALARM = 0  # Printers in a warning or critical state
+PRIORITY_NORMAL = 10
+
+
+class InferenceSlots:
+    """Fair allocation of a fixed number of inference slots on a shared model
+
+    Waiters are served by priority, then by who was served least recently,
+    so every printer gets its turn and a busy printer cannot starve the
+    rest, while printers in an alarm state jump the queue.
+    """
+
+    def __init__(self, slots: int = 1):
+        self.slots = max(1, slots)
+        self.in_use = 0
+        self.grants: Dict[str, int] = {}  # Inferences run per printer
+        self._last_served: Dict[str, int] = {}
+        self._tick = 0
+        self._order = itertools.count()
+        # Heap of (priority, last served, arrival, name, future)
+        self._waiters: List[tuple] = []
+
+    @property
+    def waiting(self) -> int:
+        """Number of printers queued for a slot"""
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    def _grant(self, name: str):
+        self.in_use += 1
+        self._tick += 1
+        self._last_served[name] = self._tick
+        self.grants[name] = self.grants.get(name, 0) + 1
+
+    async def acquire(self, name: str, priority: int = PRIORITY_NORMAL):
+        """Wait for a slot; ``release()`` it when the inference is done"""
+        if self.in_use < self.slots and not self.waiting:
+            self._grant(name)
+            return
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, self._last_served.get(name, 0), next(self._order))
+        heapq.heappush(self._waiters, entry + (name, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()  # Granted just as the waiter was cancelled
+            raise
+
+    def release(self):
+        """Return a slot and hand it to the next waiter, if any"""
+        self.in_use -= 1
+        while self._waiters and self.in_use < self.slots:
+            *_, name, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue  # Cancelled while waiting
+            self._grant(name)
+            future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, name: str, priority: int = PRIORITY_NORMAL):
+        """Hold a slot for the enclosed block"""
+        await self.acquire(name, priority)
+        try:
+            yield
+        finally:
+            self.release()
@@ -0,0 +1,206 @@
+import time
+import asyncio
+from typing import AsyncIterator, Callable, NamedTuple, Optional
+import cv2
+import numpy as np
+
+# Overlay colours (BGR) for normal, warning and critical results
+COLORS = ((80, 200, 80), (0, 165, 255), (0, 0, 255))
+
+
+class Snapshot(NamedTuple):
+    """One annotated, JPEG-encoded analysed frame"""
+
+    jpeg: bytes
+    sequence: int  # Increases with every encoded frame
+    timestamp: float  # time.time() when the frame was analysed
+    confidence: float
+
+
+def draw_overlay(image: np.ndarray, result) -> np.ndarray:
+    """Draw the score and detection boxes of ``result`` onto ``image``"""
+    level = 2 if result.is_critical else 1 if result.is_warning else 0
+    color = COLORS[level]
+    if result.boxes is not None:
+        for i, (x1, y1, x2, y2) in enumerate(result.boxes.astype(int)):
+            cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
+            if result.scores is not None:
+                label = f"{result.scores[i]:.2f}"
+                cv2.putText(
+                    image,
+                    label,
+                    (x1, max(y1 - 4, 12)),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.5,
+                    color,
+                    1,
+                    cv2.LINE_AA,
+                )
+    text = f"{result.confidence:.0%}"
+    if result.defect_type:
+        text += f" {result.defect_type}"
+    if level:
+        text += " CRITICAL" if level == 2 else " WARNING"
+    cv2.putText(
+        image, text, (8, 24), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2, cv2.LINE_AA
+    )
+    return image
+
+
+class SnapshotCache:
+    """Latest analysed frame, annotated and JPEG-encoded once for all viewers
+
+    The engine offers every analysed frame to ``publish()``. Only while
+    someone is watching (a stream subscriber, or a snapshot request within
+    the last ``linger`` seconds) is the frame copied, annotated and encoded,
+    on the default executor; every HTTP client then shares the same bytes.
+    With nobody watching, frames are skipped without any work, and the
+    first request calls ``on_demand`` (the engine analyses a frame right
+    away) and waits up to ``timeout`` for it.
+
+    Everything but the encoding runs on the event loop thread.
+    """
+
+    def __init__(
+        self,
+        quality: int = 80,
+        linger: float = 10.0,
+        timeout: float = 5.0,
+        on_demand: Optional[Callable[[], None]] = None,
+    ):
+        self.quality = quality
+        self.linger = linger
+        self.timeout = timeout
+        self.on_demand = on_demand
+        self.subscribers = 0
+        self.encoded_frames = 0
+        self.skipped_frames = 0
+        self._latest: Optional[Snapshot] = None
+        self._stale = True  # Frames were skipped since _latest was encoded
+        self._requested_at = float("-inf")
+        self._pending = None  # Newest frame waiting for the encoder
+        self._encoding = False
+        self._updated: Optional[asyncio.Event] = None
+
+    @classmethod
+    def from_config(cls, config, on_demand=None) -> "SnapshotCache":
+        """Build a cache from a SnapshotConfig"""
+        return cls(
+            quality=config.jpeg_quality,
+            linger=config.linger,
+            timeout=config.timeout,
+            on_demand=on_demand,
+        )
+
+    @property
+    def wanted(self) -> bool:
+        """Whether anyone is watching, so new frames should be encoded"""
+        return (
+            self.subscribers > 0 or time.monotonic() - self._requested_at < self.linger
+        )
+
+    def publish(self, frame, result, timestamp: Optional[float] = None) -> bool:
+        """Offer a newly analysed frame; True if it will be encoded"""
+        if not self.wanted or not isinstance(frame, np.ndarray):
+            self._stale = True
+            self.skipped_frames += 1
+            return False
+        # Copy now: the overlay must not touch the caller's (maybe reused) buffer
+        timestamp = time.time() if timestamp is None else timestamp
+        self._pending = (frame.copy(), result, timestamp)
+        if not self._encoding:
+            self._encode_next()
+        return True
+
+    def _render(self, canvas: np.ndarray, result, timestamp: float):
+        draw_overlay(canvas, result)
+        ok, jpeg = cv2.imencode(
+            ".jpg", canvas, [int(cv2.IMWRITE_JPEG_QUALITY), self.quality]
+        )
+        if not ok:
+            raise RuntimeError("JPEG encoding failed")
+        return jpeg.tobytes(), timestamp, float(result.confidence)
+
+    def _encode_next(self):
+        """Encode the pending frame; newer frames replace one still waiting"""
+        pending, self._pending = self._pending, None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._store(self._render(*pending))
+            return
+        self._encoding = True
+        future = loop.run_in_executor(None, self._render, *pending)
+        future.add_done_callback(self._encoded)
+
+    def _encoded(self, future):
+        self._encoding = False
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            print(f"⚠️ Snapshot encoding failed: {future.exception()}")
+        else:
+            self._store(future.result())
+        if self._pending is not None:
+            self._encode_next()
+
+    def _store(self, rendered):
+        jpeg, timestamp, confidence = rendered
+        sequence = self._latest.sequence + 1 if self._latest else 1
+        self._latest = Snapshot(jpeg, sequence, timestamp, confidence)
+        self._stale = False
+        self.encoded_frames += 1
+        if self._updated is not None:
+            self._updated.set()
+            self._updated = None
+
+    def latest(self) -> Optional[Snapshot]:
+        """The newest encoded snapshot, however old, without waiting"""
+        return self._latest
+
+    async def wait(
+        self, after_sequence: int = 0, timeout: Optional[float] = None
+    ) -> Optional[Snapshot]:
+        """Wait for a snapshot newer than ``after_sequence``; None on timeout"""
+        while self._latest is None or self._latest.sequence <= after_sequence:
+            if self._updated is None:
+                self._updated = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._updated.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._latest
+
+    def _demand(self):
+        if self.on_demand is not None:
+            self.on_demand()
+
+    async def snapshot(self) -> Optional[Snapshot]:
+        """The latest analysed frame, waiting for a fresh one if it is stale
+
+        Falls back to the stale snapshot (or None) after ``timeout``.
+        """
+        self._requested_at = time.monotonic()
+        latest = self._latest
+        if latest is not None and not self._stale:
+            return latest
+        self._demand()
+        sequence = latest.sequence if latest is not None else 0
+        return await self.wait(sequence, self.timeout) or latest
+
+    async def stream(self) -> AsyncIterator[Snapshot]:
+        """Yield every new snapshot while subscribed"""
+        self.subscribers += 1
+        try:
+            latest = self._latest
+            if latest is not None and not self._stale:
+                yield latest
+            else:
+                self._demand()
+            sequence = latest.sequence if latest is not None else 0
+            while True:
+                latest = await self.wait(sequence)
+                sequence = latest.sequence
+                yield latest
+        finally:
+            self.subscribers -= 1
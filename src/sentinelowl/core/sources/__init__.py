@@ -0,0 +1,74 @@
+import shutil
+from .base import BufferedSource, CapturedFrame
+from .ffmpeg import FfmpegSource
+from .file import FileSource
+from .mjpeg import MjpegSource
+from .snapshot import SnapshotSource
+from .synthetic import SyntheticSource
+
+__all__ = [
+    "BufferedSource",
+    "CapturedFrame",
+    "FfmpegSource",
+    "FileSource",
+    "MjpegSource",
+    "SnapshotSource",
+    "SyntheticSource",
+    "is_buffered_source",
+    "open_source",
+]
+
+
+def _is_http(url: str) -> bool:
+    return url.startswith(("http://", "https://"))
+
+
+def _use_mjpeg(config) -> bool:
+    # Threaded cameras get the receiver thread; unthreaded ones read in read()
+    return config.type == "mjpeg" and _is_http(config.url)
+
+
+def _use_ffmpeg(config) -> bool:
+    # ffmpeg keeps only the newest frame and restarts forever, so only
+    # threaded cameras, which poll latest() instead of blocking in read(),
+    # use it
+    return (
+        config.type == "rtsp"
+        and config.threaded
+        and shutil.which(config.ffmpeg_path) is not None
+    )
+
+
+def is_buffered_source(config) -> bool:
+    """Whether ``open_source(config)`` returns a ``BufferedSource``
+
+    Buffered sources receive in the background by themselves and expose
+    ``latest()`` and ``wait()`` in addition to the ``cv2.VideoCapture``-style
+    ``isOpened()``/``read()``/``release()``.
+    """
+    if config.type == "snapshot" or _use_ffmpeg(config):
+        return True
+    return _use_mjpeg(config)
+
+
+def open_source(config):
+    """Open the capture source selected by ``config.type``"""
+    if config.type == "snapshot":
+        return SnapshotSource.from_config(config)
+    if config.type == "synthetic":
+        return SyntheticSource.from_url(config.url)
+    if config.type == "file":
+        return FileSource(config.url)
+    if _use_mjpeg(config):
+        return MjpegSource.from_config(config)
+    if _use_ffmpeg(config):
+        return FfmpegSource.from_config(config)
+
+    import cv2
+
+    if config.type == "rtsp" and not config.threaded:
+        print("⚠️ Unthreaded RTSP camera, decoding every frame with OpenCV")
+    elif config.type == "rtsp":
+        print("⚠️ ffmpeg not found, decoding every RTSP frame with OpenCV")
+
+    return cv2.VideoCapture(config.url)
@@ -0,0 +1,136 @@
+import cv2
+import time
+import threading
+import numpy as np
+from typing import NamedTuple, Optional, Tuple
+
+# JPEG decode flags for each supported downscale factor
+DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+class CapturedFrame(NamedTuple):
+    """Latest frame published by a capture source"""
+
+    image: any  # Decoded BGR frame
+    sequence: int  # Monotonic frame counter, starting at 1
+    timestamp: float  # time.monotonic() when the frame was read
+    pts: Optional[float] = None  # Stream presentation time (s), if known
+
+
+class BufferedSource:
+    """Base class for sources that receive compressed frames in the background
+
+    Subclasses implement ``_run()``, which runs on a worker thread and calls
+    ``_store()`` with each JPEG payload. Only the newest payload is kept and
+    it is decoded lazily, at most once, when a consumer asks for a frame.
+    The ``isOpened()``/``read()``/``release()`` methods mirror
+    ``cv2.VideoCapture`` so ``CameraHandler`` can use either interchangeably.
+    """
+
+    def __init__(self, timeout: float = 10.0, decode_scale: int = 1):
+        if decode_scale not in DECODE_FLAGS:
+            raise ValueError(f"Unsupported decode scale: {decode_scale}")
+
+        self.timeout = timeout
+        self.decode_flag = DECODE_FLAGS[decode_scale]
+        self.frames_received = 0
+        self.frames_decoded = 0
+        self.performance = None  # Optional PerformanceMonitor for decode times
+
+        self._jpeg: Optional[bytes] = None
+        self._sequence = 0
+        self._timestamp = 0.0
+        self._decoded: Optional[CapturedFrame] = None
+        self._last_read = 0
+        self._frame_ready = threading.Condition()
+        self._decode_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _start(self, name: str):
+        """Start the worker thread running ``_run()``"""
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        raise NotImplementedError
+
+    def _interrupt(self):
+        """Unblock the worker thread during ``release()``"""
+        pass
+
+    def _store(self, payload: bytes):
+        """Replace the latest compressed frame and wake up waiters"""
+        with self._frame_ready:
+            self._jpeg = payload
+            self._sequence += 1
+            self._timestamp = time.monotonic()
+            self.frames_received += 1
+            self._frame_ready.notify_all()
+
+    def latest_encoded(self) -> Optional[Tuple[bytes, int, float]]:
+        """Return (jpeg bytes, sequence, timestamp) of the newest frame"""
+        with self._frame_ready:
+            if self._jpeg is None:
+                return None
+            return self._jpeg, self._sequence, self._timestamp
+
+    def latest(self) -> Optional[CapturedFrame]:
+        """Decode (once) and return the newest frame"""
+        encoded = self.latest_encoded()
+        if encoded is None:
+            return None
+        jpeg, sequence, timestamp = encoded
+
+        with self._decode_lock:
+            if self._decoded is not None and self._decoded.sequence == sequence:
+                return self._decoded
+            start = time.perf_counter()
+            image = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), self.decode_flag)
+            if image is None:
+                return None
+            if self.performance is not None:
+                self.performance.record_stage("decode", time.perf_counter() - start)
+            self.frames_decoded += 1
+            self._decoded = CapturedFrame(image, sequence, timestamp)
+            return self._decoded
+
+    def wait(
+        self, after_sequence: int = 0, timeout: Optional[float] = None
+    ) -> Optional[CapturedFrame]:
+        """Block until a frame newer than ``after_sequence`` arrives"""
+        with self._frame_ready:
+            self._frame_ready.wait_for(
+                lambda: self._stop_event.is_set() or self._sequence > after_sequence,
+                timeout=timeout,
+            )
+            if self._sequence <= after_sequence:
+                return None
+        return self.latest()
+
+    # cv2.VideoCapture-compatible interface
+
+    def isOpened(self) -> bool:
+        return not self._stop_event.is_set()
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Return the next frame newer than the previous ``read()``"""
+        frame = self.wait(self._last_read, timeout=self.timeout)
+        if frame is None:
+            return False, None
+        self._last_read = frame.sequence
+        return True, frame.image
+
+    def release(self):
+        """Stop the worker thread"""
+        self._stop_event.set()
+        self._interrupt()
+        with self._frame_ready:
+            self._frame_ready.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout)
@@ -0,0 +1,301 @@
+import re
+import time
+import queue
+import functools
+import threading
+import subprocess
+from typing import List, NamedTuple, Optional, Tuple
+import numpy as np
+from ...utils.backoff import backoff_delay
+from .base import CapturedFrame
+
+DECODE_MODES = ("all", "keyframes")
+
+# One line per output frame from the showinfo filter
+_SHOWINFO = re.compile(
+    r"\bn:\s*(\d+)\s+pts:\s*(-?\d+)\s+pts_time:\s*(-?[\d.e+-]+).*?\bs:(\d+)x(\d+)"
+)
+
+
+# First line of ``ffmpeg -version``, e.g. "ffmpeg version 4.3.6-0+deb11u1"
+_VERSION = re.compile(rb"ffmpeg version n?(\d+)\.(\d+)")
+
+
+class FrameInfo(NamedTuple):
+    """Metadata ffmpeg reports for one output frame"""
+
+    index: int
+    pts: float  # Presentation time in seconds, from the stream
+    width: int
+    height: int
+
+
+def parse_showinfo(line: str) -> Optional[FrameInfo]:
+    """Parse a ``showinfo`` log line; None for any other line"""
+    match = _SHOWINFO.search(line)
+    if match is None:
+        return None
+    index, _, pts, width, height = match.groups()
+    return FrameInfo(int(index), float(pts), int(width), int(height))
+
+
+@functools.lru_cache(maxsize=None)
+def ffmpeg_version(ffmpeg_path: str = "ffmpeg") -> Optional[Tuple[int, int]]:
+    """(major, minor) of an ffmpeg binary; None if unknown (e.g. git builds)"""
+    try:
+        result = subprocess.run(
+            [ffmpeg_path, "-version"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = _VERSION.match(result.stdout)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def build_command(
+    url: str,
+    decode_mode: str = "all",
+    frame_step: int = 1,
+    decode_scale: int = 1,
+    ffmpeg_path: str = "ffmpeg",
+    legacy_vsync: bool = False,
+) -> List[str]:
+    """ffmpeg arguments that write raw BGR frames to stdout
+
+    Frames are passed through with their own timestamps: rawvideo output
+    would otherwise be constant frame rate, and ffmpeg would duplicate
+    frames into the gaps left by keyframe decoding or ``select``, writing
+    more frames to stdout than ``showinfo`` reports. ffmpeg before 5.1
+    (``legacy_vsync``) only knows ``-vsync`` for this.
+    """
+    if decode_mode not in DECODE_MODES:
+        raise ValueError(f"Unsupported decode mode: {decode_mode}")
+    command = [ffmpeg_path, "-nostdin", "-hide_banner", "-nostats"]
+    command += ["-loglevel", "info"]  # showinfo logs at info level
+    if url.startswith("rtsp://"):
+        command += ["-rtsp_transport", "tcp"]
+    if decode_mode == "keyframes":
+        command += ["-skip_frame", "nokey"]  # The decoder drops all other frames
+    command += ["-i", url, "-an", "-sn", "-dn"]
+
+    filters = []
+    if frame_step > 1:
+        filters.append(f"select=not(mod(n\\,{frame_step}))")
+    if decode_scale > 1:
+        filters.append(f"scale=iw/{decode_scale}:ih/{decode_scale}")
+    filters += ["format=bgr24", "showinfo=checksum=0"]
+    command += ["-vf", ",".join(filters)]
+    command += ["-vsync" if legacy_vsync else "-fps_mode", "passthrough"]
+    command += ["-f", "rawvideo", "-pix_fmt", "bgr24", "-"]
+    return command
+
+
+class FfmpegSource:
+    """H.264/H.265 (RTSP or file) capture through an ffmpeg subprocess
+
+    ffmpeg decodes in its own process and writes raw BGR frames to a pipe,
+    which a reader thread copies straight into a small ring of preallocated
+    buffers. With ``decode_mode="keyframes"`` the decoder skips every
+    non-key frame, so decode CPU falls with the GOP length; ``frame_step``
+    keeps every Nth decoded frame, saving the colour conversion and copy
+    (inter-coded frames still have to be decoded). Frame size and stream
+    timestamps come from ffmpeg's ``showinfo`` filter.
+
+    Consumers get a private copy of the newest ring slot, taken under the
+    frame lock: the pipeline holds a frame through preprocessing, inference
+    and evidence for far longer than the ``buffers - 1`` frames the slot
+    survives, while the copy takes about a millisecond, well before the
+    reader comes back around to that slot. The interface mirrors the
+    buffered sources (see ``sources.is_buffered_source``).
+    """
+
+    def __init__(
+        self,
+        url: str,
+        decode_mode: str = "all",
+        frame_step: int = 1,
+        decode_scale: int = 1,
+        timeout: float = 10.0,
+        reconnect_interval: float = 5.0,
+        reconnect_max_interval: float = 60.0,
+        reconnect_jitter: float = 0.2,
+        buffers: int = 3,
+        ffmpeg_path: str = "ffmpeg",
+    ):
+        self.url = url
+        version = ffmpeg_version(ffmpeg_path)
+        self.command = build_command(
+            url,
+            decode_mode,
+            frame_step,
+            decode_scale,
+            ffmpeg_path,
+            legacy_vsync=version is not None and version < (5, 1),
+        )
+        self.timeout = timeout
+        self.reconnect_interval = reconnect_interval
+        self.reconnect_max_interval = reconnect_max_interval
+        self.reconnect_jitter = reconnect_jitter
+        self.frames_decoded = 0
+
+        self._ring: List[np.ndarray] = []
+        self._ring_size = max(2, buffers)
+        self._latest: Optional[CapturedFrame] = None
+        self._last_read = 0
+        self._process: Optional[subprocess.Popen] = None
+        self._frame_ready = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="sentinelowl-ffmpeg", daemon=True
+        )
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, config) -> "FfmpegSource":
+        """Build a source from a CameraConfig"""
+        return cls(
+            config.url,
+            decode_mode=config.decode_mode,
+            frame_step=config.frame_step,
+            decode_scale=config.decode_scale,
+            timeout=config.timeout,
+            reconnect_interval=config.reconnect_interval,
+            reconnect_max_interval=config.reconnect_max_interval,
+            reconnect_jitter=config.reconnect_jitter,
+            ffmpeg_path=config.ffmpeg_path,
+        )
+
+    def _buffer(self, sequence: int, height: int, width: int) -> np.ndarray:
+        """Ring slot for frame ``sequence``, reallocated on a size change"""
+        if not self._ring or self._ring[0].shape[:2] != (height, width):
+            self._ring = [
+                np.empty((height, width, 3), dtype=np.uint8)
+                for _ in range(self._ring_size)
+            ]
+        return self._ring[sequence % self._ring_size]
+
+    def _read_stderr(self, stream, infos: queue.Queue):
+        for line in iter(stream.readline, b""):
+            info = parse_showinfo(line.decode("utf-8", "replace"))
+            if info is not None:
+                infos.put(info)
+        infos.put(None)
+
+    def _stream(self):
+        """Run one ffmpeg process until it exits or the source is released"""
+        self._process = process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+        )
+        infos: queue.Queue = queue.Queue()
+        threading.Thread(
+            target=self._read_stderr, args=(process.stderr, infos), daemon=True
+        ).start()
+        try:
+            while not self._stop_event.is_set():
+                info = infos.get(timeout=self.timeout)
+                if info is None:
+                    return
+                sequence = (self._latest.sequence if self._latest else 0) + 1
+                frame = self._buffer(sequence, info.height, info.width)
+                view = memoryview(frame).cast("B")
+                filled = 0
+                while filled < len(view):
+                    count = process.stdout.readinto(view[filled:])
+                    if not count:
+                        return
+                    filled += count
+                with self._frame_ready:
+                    self.frames_decoded += 1
+                    self._latest = CapturedFrame(
+                        frame, sequence, time.monotonic(), info.pts
+                    )
+                    self._frame_ready.notify_all()
+        finally:
+            process.kill()
+            process.wait()
+            process.stdout.close()
+
+    def _run(self):
+        """Keep an ffmpeg process running until released, backing off on errors"""
+        attempt = 0
+        while not self._stop_event.is_set():
+            received = self.frames_decoded
+            try:
+                self._stream()
+            except (OSError, queue.Empty) as e:
+                print(f"⚠️ ffmpeg stream failed: {e or 'no frames'}")
+            if self._stop_event.is_set():
+                break
+            attempt = 0 if self.frames_decoded > received else attempt + 1
+            self._stop_event.wait(
+                backoff_delay(
+                    attempt,
+                    self.reconnect_interval,
+                    self.reconnect_max_interval,
+                    self.reconnect_jitter,
+                )
+            )
+
+    @staticmethod
+    def _detach(frame: Optional[CapturedFrame]) -> Optional[CapturedFrame]:
+        """Copy a frame out of the ring before the reader reuses its slot"""
+        if frame is None:
+            return None
+        return frame._replace(image=frame.image.copy())
+
+    def latest(self) -> Optional[CapturedFrame]:
+        """A copy of the newest frame, without waiting"""
+        with self._frame_ready:
+            return self._detach(self._latest)
+
+    def latest_encoded(self) -> Optional[Tuple[bytes, int, float]]:
+        """Compressed frames are not kept; always None"""
+        return None
+
+    def wait(
+        self, after_sequence: int = 0, timeout: Optional[float] = None
+    ) -> Optional[CapturedFrame]:
+        """Block until a frame newer than ``after_sequence`` arrives; a copy"""
+        with self._frame_ready:
+            self._frame_ready.wait_for(
+                lambda: self._stop_event.is_set()
+                or (
+                    self._latest is not None and self._latest.sequence > after_sequence
+                ),
+                timeout=timeout,
+            )
+            latest = self._latest
+            if latest is None or latest.sequence <= after_sequence:
+                return None
+            return self._detach(latest)
+
+    # cv2.VideoCapture-compatible interface
+
+    def isOpened(self) -> bool:
+        return not self._stop_event.is_set()
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Return the next frame newer than the previous ``read()``"""
+        frame = self.wait(self._last_read, timeout=self.timeout)
+        if frame is None:
+            return False, None
+        self._last_read = frame.sequence
+        return True, frame.image
+
+    def release(self):
+        """Stop ffmpeg and the reader thread"""
+        self._stop_event.set()
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+        with self._frame_ready:
+            self._frame_ready.notify_all()
+        self._thread.join(timeout=self.timeout)
@@ -0,0 +1,32 @@
+import cv2
+import numpy as np
+from typing import Optional, Tuple
+
+
+class FileSource:
+    """Video file replayed in a loop, with a ``cv2.VideoCapture`` interface
+
+    Selected with ``CameraConfig.type = "file"``, as used by ``bench`` and
+    ``soak``: at the end of the file ``read()`` rewinds to the first frame
+    instead of failing, so a clip shorter than the run is simply repeated
+    rather than treated as a lost camera.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rewinds = 0
+        self._capture = cv2.VideoCapture(path)
+
+    def isOpened(self) -> bool:
+        return self._capture.isOpened()
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        ok, frame = self._capture.read()
+        if not ok and self._capture.isOpened():
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self.rewinds += 1
+            ok, frame = self._capture.read()
+        return ok, frame if ok else None
+
+    def release(self):
+        self._capture.release()
@@ -0,0 +1,214 @@
+import socket
+import http.client
+import numpy as np
+from typing import Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+from ...utils.backoff import backoff_delay
+from .base import BufferedSource
+
+
+class MjpegSource(BufferedSource):
+    """Native reader for multipart MJPEG HTTP streams (e.g. mjpg-streamer)
+
+    A receiver thread parses the ``multipart/x-mixed-replace`` response and
+    only keeps the most recent compressed JPEG. Decoding happens lazily, at
+    most once per received frame, when a consumer asks for it; with
+    ``decode_scale`` > 1 libjpeg decodes straight to a reduced resolution.
+    Disconnects are retried in the background with exponential backoff.
+
+    With ``background=False`` no receiver thread is started; ``isOpened()``
+    connects and each ``read()`` parses the next part off the stream, so a
+    lost stream is reported to the caller instead of retried forever.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 10.0,
+        decode_scale: int = 1,
+        reconnect_interval: float = 5.0,
+        reconnect_max_interval: float = 60.0,
+        reconnect_jitter: float = 0.2,
+        background: bool = True,
+    ):
+        super().__init__(timeout=timeout, decode_scale=decode_scale)
+        self.url = url
+        self.reconnect_interval = reconnect_interval
+        self.reconnect_max_interval = reconnect_max_interval
+        self.reconnect_jitter = reconnect_jitter
+
+        self.connected = False
+        self._connection: Optional[http.client.HTTPConnection] = None
+        self._parts: Optional[Iterator[bytes]] = None  # Synchronous reads only
+        if background:
+            self._start("sentinelowl-mjpeg")
+
+    @classmethod
+    def from_config(cls, config) -> "MjpegSource":
+        """Build a source from a CameraConfig"""
+        return cls(
+            config.url,
+            timeout=config.timeout,
+            decode_scale=config.decode_scale,
+            reconnect_interval=config.reconnect_interval,
+            reconnect_max_interval=config.reconnect_max_interval,
+            reconnect_jitter=config.reconnect_jitter,
+            background=config.threaded,
+        )
+
+    def _connect(self) -> Tuple[http.client.HTTPResponse, bytes]:
+        """Open the stream and return the response and multipart boundary"""
+        parts = urlsplit(self.url)
+        connection_class = (
+            http.client.HTTPSConnection
+            if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self._connection = connection_class(
+            parts.hostname, parts.port, timeout=self.timeout
+        )
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self._connection.request("GET", path)
+        response = self._connection.getresponse()
+        if response.status != 200:
+            raise ConnectionError(f"HTTP {response.status} from {self.url}")
+
+        content_type = response.getheader("Content-Type", "")
+        if "multipart" not in content_type or "boundary=" not in content_type:
+            raise ConnectionError(f"Not an MJPEG stream: {content_type!r}")
+        boundary = content_type.split("boundary=", 1)[1].split(";")[0]
+        return response, boundary.strip().strip('"').lstrip("-").encode()
+
+    @staticmethod
+    def _iter_parts(response, boundary: bytes) -> Iterator[bytes]:
+        """Yield the payload of each multipart part"""
+        delimiter = b"--" + boundary
+        at_part = False  # True when the delimiter line was already consumed
+        while True:
+            if not at_part:
+                line = response.readline()
+                if not line:
+                    raise ConnectionError("MJPEG stream closed")
+                if not line.strip().startswith(delimiter):
+                    continue
+                if line.strip() == delimiter + b"--":
+                    raise ConnectionError("MJPEG stream ended")
+
+            length = None
+            while True:
+                header = response.readline()
+                if not header:
+                    raise ConnectionError("MJPEG stream closed")
+                header = header.strip()
+                if not header:
+                    break
+                name, _, value = header.partition(b":")
+                if name.strip().lower() == b"content-length":
+                    length = int(value.strip())
+
+            if length is not None:
+                payload = response.read(length)
+                if len(payload) < length:
+                    raise ConnectionError("MJPEG stream closed")
+                at_part = False
+                yield payload
+                continue
+
+            # No Content-Length: the payload runs until the next delimiter
+            chunks = []
+            while True:
+                line = response.readline()
+                if not line:
+                    raise ConnectionError("MJPEG stream closed")
+                if line.startswith(delimiter):
+                    break
+                chunks.append(line)
+            at_part = True
+            yield b"".join(chunks).rstrip(b"\r\n")
+
+    def _run(self):
+        """Keep the newest JPEG from the stream, reconnecting on failure"""
+        attempt = 0
+        while not self._stop_event.is_set():
+            try:
+                response, boundary = self._connect()
+                self.connected = True
+                print(f"🟢 MJPEG stream connected: {self.url}")
+                for payload in self._iter_parts(response, boundary):
+                    attempt = 0
+                    self._store(payload)
+                    if self._stop_event.is_set():
+                        break
+            except (OSError, ValueError, http.client.HTTPException) as e:
+                if not self._stop_event.is_set():
+                    print(f"⚠️ MJPEG stream error: {e}")
+            finally:
+                self._disconnect()
+
+            if self._stop_event.is_set():
+                break
+            delay = backoff_delay(
+                attempt,
+                self.reconnect_interval,
+                self.reconnect_max_interval,
+                self.reconnect_jitter,
+            )
+            attempt += 1
+            self._stop_event.wait(delay)
+
+    def _disconnect(self):
+        self.connected = False
+        self._parts = None
+        if self._connection is not None:
+            self._connection.close()
+
+    def _open(self) -> bool:
+        """Connect for synchronous reads; False if the stream is unavailable"""
+        try:
+            response, boundary = self._connect()
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            print(f"⚠️ MJPEG stream error: {e}")
+            self._disconnect()
+            return False
+        self.connected = True
+        self._parts = self._iter_parts(response, boundary)
+        return True
+
+    def _interrupt(self):
+        """Unblock a pending socket read so the receiver can exit"""
+        connection = self._connection
+        if connection is not None and connection.sock is not None:
+            try:
+                connection.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    # Synchronous (background=False) variants of the VideoCapture interface
+
+    def isOpened(self) -> bool:
+        if self._thread is not None or self._stop_event.is_set():
+            return super().isOpened()
+        return self._parts is not None or self._open()
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Return the next frame of the stream"""
+        if self._thread is not None:
+            return super().read()
+        if self._stop_event.is_set() or (self._parts is None and not self._open()):
+            return False, None
+        try:
+            self._store(next(self._parts))
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            print(f"⚠️ MJPEG stream error: {e}")
+            self._disconnect()
+            return False, None
+        frame = self.latest()
+        if frame is None:
+            return False, None
+        self._last_read = frame.sequence
+        return True, frame.image
+
+    def release(self):
+        super().release()
+        if self._thread is None:
+            self._disconnect()
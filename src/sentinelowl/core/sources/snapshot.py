@@ -0,0 +1,124 @@
+import http.client
+import numpy as np
+from typing import Dict, Optional, Tuple
+from ...utils.backoff import backoff_delay
+from ...utils.http_pool import HTTPConnectionPool, shared_pool
+from .base import BufferedSource
+
+
+class SnapshotSource(BufferedSource):
+    """Polls a single-image snapshot URL (e.g. mjpg-streamer ``?action=snapshot``)
+
+    Requests go through a keep-alive connection pool that is shared by every
+    source in the process, each with its own timeout. The ``ETag`` and
+    ``Last-Modified`` validators of the previous response are sent back, so
+    an unchanged image costs a ``304`` without a body. Payloads are decoded
+    lazily like any other ``BufferedSource``.
+
+    With ``background=False`` no polling thread is started; each ``read()``
+    polls once instead and returns the previous image again on a ``304``, so
+    an unchanged scene is not mistaken for a lost camera.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        poll_interval: float = 1.0,
+        timeout: float = 10.0,
+        decode_scale: int = 1,
+        reconnect_interval: float = 5.0,
+        reconnect_max_interval: float = 60.0,
+        reconnect_jitter: float = 0.2,
+        pool: Optional[HTTPConnectionPool] = None,
+        background: bool = True,
+    ):
+        super().__init__(timeout=timeout, decode_scale=decode_scale)
+        self.url = url
+        self.poll_interval = poll_interval
+        self.reconnect_interval = reconnect_interval
+        self.reconnect_max_interval = reconnect_max_interval
+        self.reconnect_jitter = reconnect_jitter
+        self.pool = pool or shared_pool()
+        self.not_modified = 0  # Polls answered with 304
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        if background:
+            self._start("sentinelowl-snapshot")
+
+    @classmethod
+    def from_config(cls, config) -> "SnapshotSource":
+        """Build a source from a CameraConfig"""
+        return cls(
+            config.url,
+            poll_interval=config.poll_interval,
+            timeout=config.timeout,
+            decode_scale=config.decode_scale,
+            reconnect_interval=config.reconnect_interval,
+            reconnect_max_interval=config.reconnect_max_interval,
+            reconnect_jitter=config.reconnect_jitter,
+            background=config.threaded,
+        )
+
+    def poll(self) -> bool:
+        """Fetch the snapshot once; return True if a new image was stored"""
+        headers: Dict[str, str] = {}
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+
+        result = self.pool.request(self.url, headers=headers, timeout=self.timeout)
+        if result.status == 304:
+            self.not_modified += 1
+            return False
+        if result.status != 200:
+            raise ConnectionError(f"HTTP {result.status} from {self.url}")
+
+        self._etag = result.headers.get("etag")
+        self._last_modified = result.headers.get("last-modified")
+        self._store(result.body)
+        return True
+
+    def _fetch(self) -> bool:
+        """``poll()`` once; False if the request failed"""
+        try:
+            self.poll()
+            return True
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            print(f"⚠️ Snapshot request failed: {e}")
+            return False
+
+    def _run(self):
+        """Poll the snapshot URL until released, backing off on errors"""
+        attempt = 0
+        while not self._stop_event.is_set():
+            if self._fetch():
+                attempt = 0
+                delay = self.poll_interval
+            else:
+                delay = backoff_delay(
+                    attempt,
+                    self.reconnect_interval,
+                    self.reconnect_max_interval,
+                    self.reconnect_jitter,
+                )
+                attempt += 1
+            self._stop_event.wait(delay)
+
+    # Synchronous (background=False) variants of the VideoCapture interface
+
+    def isOpened(self) -> bool:
+        if self._thread is not None or self._stop_event.is_set():
+            return super().isOpened()
+        return self._jpeg is not None or self._fetch()
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Poll once and return the current image, new or not"""
+        if self._thread is not None:
+            return super().read()
+        if self._stop_event.is_set() or not self._fetch():
+            return False, None
+        frame = self.latest()
+        if frame is None:
+            return False, None
+        return True, frame.image
@@ -0,0 +1,56 @@
+import time
+import numpy as np
+from typing import Optional, Tuple
+
+
+class SyntheticSource:
+    """Generated test pattern with a ``cv2.VideoCapture``-style interface
+
+    Selected with ``CameraConfig.type = "synthetic"`` and a URL such as
+    ``synthetic://1280x720@30``; the ``@fps`` part is optional and throttles
+    ``read()`` to that rate. Frames are a moving gradient; like
+    ``VideoCapture`` every ``read()`` returns a new array, so frames can be
+    held by consumers (e.g. the threaded reader) safely.
+    """
+
+    def __init__(self, width: int = 1280, height: int = 720, fps: float = 0.0):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frames_generated = 0
+        self._opened = True
+        self._next_time = time.monotonic()
+        # One wide gradient; each frame is a shifted window of it
+        ramp = (np.arange(width + 256) % 256).astype(np.uint8)
+        self._pattern = np.empty((height, width + 256, 3), dtype=np.uint8)
+        self._pattern[...] = ramp[None, :, None]
+        self._pattern[:, :, 1] = (np.arange(height) % 256).astype(np.uint8)[:, None]
+
+    @classmethod
+    def from_url(cls, url: str) -> "SyntheticSource":
+        """Parse ``synthetic://WIDTHxHEIGHT[@FPS]``"""
+        spec = url.split("://", 1)[-1].strip("/")
+        size, _, fps = spec.partition("@")
+        if size:
+            width, _, height = size.lower().partition("x")
+            return cls(int(width), int(height), float(fps or 0.0))
+        return cls(fps=float(fps or 0.0))
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self._opened:
+            return False, None
+        if self.fps > 0:
+            delay = self._next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_time = max(self._next_time, time.monotonic()) + 1.0 / self.fps
+
+        shift = self.frames_generated % 256
+        self.frames_generated += 1
+        return True, self._pattern[:, shift : shift + self.width].copy()
+
+    def release(self):
+        self._opened = False
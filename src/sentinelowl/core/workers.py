@@ -0,0 +1,263 @@
+import time
+import queue
+import threading
+import multiprocessing as mp
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from multiprocessing import shared_memory
+from typing import Dict, Optional
+import numpy as np
+from .models.base_model import BaseModel
+
+_STOP = None  # Sentinel telling workers and the collector to exit
+_READY = "ready"  # Task id of a worker's start-up report: (_READY, error or None)
+
+
+def _worker_main(model_config: dict, shm_name: str, slot_bytes: int, tasks, results):
+    """Worker process: own model session, frames read from shared memory"""
+    from ..config import ModelConfig
+    from .models import create_model
+
+    try:
+        config = ModelConfig(**{**model_config, "workers": 0})
+        model = create_model(config)
+        shm = shared_memory.SharedMemory(name=shm_name)
+    except Exception as e:
+        results.put((_READY, f"{type(e).__name__}: {e}"))
+        return
+    results.put((_READY, None))
+    try:
+        while True:
+            task = tasks.get()
+            if task is _STOP:
+                break
+            task_id, slot, shape, dtype = task
+            frame = np.ndarray(
+                shape, dtype=dtype, buffer=shm.buf, offset=slot * slot_bytes
+            )
+            try:
+                confidence, is_warning, is_critical = model.predict(frame)
+                results.put(
+                    (task_id, (float(confidence), bool(is_warning), bool(is_critical)))
+                )
+            except Exception as e:
+                results.put((task_id, RuntimeError(f"Inference failed: {e}")))
+            finally:
+                del frame  # Release the buffer export before the next task
+    finally:
+        model.close()
+        shm.close()
+
+
+class InferencePool(BaseModel):
+    """Runs a model in worker processes fed through shared-memory frame slots
+
+    Each worker builds its own model session, so pre/post-processing and
+    inference run outside the parent's GIL. Frames are copied once into one
+    of ``slots`` fixed-size slots of a ``SharedMemory`` block and only the
+    slot index, shape and dtype are sent to the worker; results come back as
+    a small ``(confidence, is_warning, is_critical)`` tuple. When all slots
+    are busy ``submit()`` blocks, which bounds the work in flight.
+
+    The constructor waits until every worker has loaded its model and
+    raises if one cannot. Should a worker die later, pending predictions
+    fail and so does every further ``submit()``. A prediction that times
+    out keeps its slot until the worker reports on it, since the task may
+    still be queued or running and reads the frame from that slot.
+    """
+
+    def __init__(
+        self,
+        model_config,
+        workers: int = 2,
+        slots: int = 0,
+        slot_bytes: int = 1920 * 1080 * 3,
+        timeout: float = 30.0,
+    ):
+        self.workers = workers
+        self.slots = slots or workers * 2
+        self.slot_bytes = slot_bytes
+        self.timeout = timeout
+        self.warning_threshold = model_config.warning_threshold
+        self.critical_threshold = model_config.critical_threshold
+
+        context = mp.get_context("spawn")  # fork is unsafe with ORT/camera threads
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=self.slots * self.slot_bytes
+        )
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._free_slots: "queue.Queue[int]" = queue.Queue()
+        for slot in range(self.slots):
+            self._free_slots.put(slot)
+        self._pending: Dict[int, tuple] = {}
+        self._abandoned: Dict[int, int] = {}  # Timed-out task id -> its slot
+        self._pending_lock = threading.Lock()
+        self._next_task_id = 0
+        self._closed = False
+        self._failure: Optional[str] = None  # Why the pool stopped working
+
+        self._processes = [
+            context.Process(
+                target=_worker_main,
+                args=(
+                    model_config.model_dump(),
+                    self._shm.name,
+                    self.slot_bytes,
+                    self._tasks,
+                    self._results,
+                ),
+                name=f"sentinelowl-inference-{i}",
+                daemon=True,
+            )
+            for i in range(workers)
+        ]
+        for process in self._processes:
+            process.start()
+        try:
+            self._wait_ready()
+        except RuntimeError:
+            self._closed = True
+            self._shutdown()
+            raise
+        self._collector = threading.Thread(
+            target=self._collect, name="sentinelowl-inference-results", daemon=True
+        )
+        self._collector.start()
+
+    @classmethod
+    def from_config(cls, config) -> "InferencePool":
+        """Build a pool from a ModelConfig"""
+        return cls(
+            config,
+            workers=config.workers,
+            slots=config.frame_slots,
+            slot_bytes=config.max_frame_bytes,
+        )
+
+    def _wait_ready(self):
+        """Wait for every worker's start-up report"""
+        deadline = time.monotonic() + self.timeout
+        ready = 0
+        while ready < len(self._processes):
+            try:
+                _, error = self._results.get(timeout=0.5)
+            except queue.Empty:
+                if any(not process.is_alive() for process in self._processes):
+                    raise RuntimeError("Inference worker exited during start-up")
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Inference workers did not start in time")
+                continue
+            if error is not None:
+                raise RuntimeError(f"Inference worker failed to load model: {error}")
+            ready += 1
+
+    def _fail_pending(self, error: str):
+        """Fail every prediction in flight and give all slots back"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+            abandoned, self._abandoned = self._abandoned, {}
+        for slot in abandoned.values():
+            self._free_slots.put(slot)
+        for future, slot in pending.values():
+            self._free_slots.put(slot)
+            future.set_exception(RuntimeError(error))
+
+    def _collect(self):
+        """Resolve futures as results arrive and recycle their slots"""
+        while True:
+            try:
+                item = self._results.get(timeout=1.0)
+            except queue.Empty:
+                dead = [p.name for p in self._processes if not p.is_alive()]
+                if dead and not self._closed:
+                    self._failure = f"Inference worker exited: {', '.join(dead)}"
+                    print(f"❌ {self._failure}")
+                    self._fail_pending(self._failure)
+                    break
+                continue
+            if item is _STOP:
+                break
+            task_id, outcome = item
+            with self._pending_lock:
+                entry = self._pending.pop(task_id, None)
+                abandoned = self._abandoned.pop(task_id, None)
+            if entry is None:
+                if abandoned is not None:
+                    self._free_slots.put(abandoned)  # Timed out; result dropped
+                continue
+            future, slot = entry
+            self._free_slots.put(slot)
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    def submit(self, frame: np.ndarray) -> Future:
+        """Queue a frame for inference; resolves to (confidence, warning, critical)"""
+        if self._closed:
+            raise RuntimeError("Inference pool is closed")
+        if self._failure is not None:
+            raise RuntimeError(self._failure)
+        frame = np.ascontiguousarray(frame)
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(
+                f"Frame of {frame.nbytes} bytes exceeds slot size {self.slot_bytes}"
+            )
+
+        slot = self._free_slots.get(timeout=self.timeout)
+        offset = slot * self.slot_bytes
+        view = np.ndarray(
+            frame.shape, dtype=frame.dtype, buffer=self._shm.buf, offset=offset
+        )
+        np.copyto(view, frame)
+        del view
+
+        future: Future = Future()
+        with self._pending_lock:
+            task_id = self._next_task_id
+            self._next_task_id += 1
+            self._pending[task_id] = (future, slot)
+        self._tasks.put((task_id, slot, frame.shape, frame.dtype.str))
+        return future
+
+    def predict(self, frame: np.ndarray) -> tuple[float, bool, bool]:
+        future = self.submit(frame)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            self._abandon(future)
+            raise
+
+    def _abandon(self, future: Future):
+        """Drop a prediction nobody waits for any more
+
+        Its slot is freed by the collector once the worker's result arrives.
+        """
+        with self._pending_lock:
+            for task_id, (pending, slot) in self._pending.items():
+                if pending is future:
+                    del self._pending[task_id]
+                    self._abandoned[task_id] = slot
+                    break
+
+    def close(self):
+        """Stop the workers and free the shared memory"""
+        if self._closed:
+            return
+        self._closed = True
+        self._shutdown()
+        self._results.put(_STOP)
+        self._collector.join(timeout=self.timeout)
+        self._fail_pending("Inference pool closed")
+
+    def _shutdown(self):
+        """Stop the worker processes and free the shared memory"""
+        for _ in self._processes:
+            self._tasks.put(_STOP)
+        for process in self._processes:
+            process.join(timeout=self.timeout)
+            if process.is_alive():
+                process.terminate()
+        self._shm.close()
+        self._shm.unlink()
@@ -1,51 +1,196 @@
-from fastapi import APIRouter, WebSocket
-from typing import Dict, Any
-import asyncio
-from ..core.engine import SentinelOwl
+from typing import Any, AsyncIterator, Dict, Optional
+
+# fastapi, the engine and its OpenCV/numpy stack are imported when the plugin
+# is instantiated, so entry-point discovery only costs this module.
+
+MJPEG_BOUNDARY = "frame"
+
+
+async def mjpeg_parts(snapshots) -> AsyncIterator[bytes]:
+    """multipart/x-mixed-replace body; every client sends the cached bytes"""
+    stream = snapshots.stream()
+    try:
+        async for snapshot in stream:
+            yield (
+                f"--{MJPEG_BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                f"Content-Length: {len(snapshot.jpeg)}\r\n\r\n"
+            ).encode()
+            yield snapshot.jpeg
+            yield b"\r\n"
+    finally:
+        await stream.aclose()  # Unsubscribe as soon as the client leaves
 
 
 class AIGuardPlugin:
     """Moonraker plugin for SentinelOwl"""
 
-    def __init__(self, config):
+    def __init__(self, config, engine=None):
+        from fastapi import APIRouter
+        from .utils.broadcast import StatusBroadcaster
+
         print("🦉 SentinelOwl plugin initialized!")  # 调试日志
         self.config = config
         self.router = APIRouter()
+        if engine is None and getattr(config, "fleet", None):
+            from .core.fleet import SentinelFleet
+
+            engine = SentinelFleet(config)
+        elif engine is None:
+            from .core.engine import SentinelOwl
+
+            engine = SentinelOwl(config)
+        self.engine = engine
         self._setup_routes()
-        self._clients = set()
-        self.engine = SentinelOwl(config)
+        self.broadcaster = StatusBroadcaster(self.get_status)
+        # Alarm transitions reach clients at once instead of at the next tick
+        members = getattr(engine, "members", None) or {None: engine}
+        for member in members.values():
+            member.on_event = self.broadcaster.publish_event
 
     def _setup_routes(self):
         """Register API and WebSocket routes"""
+        from fastapi.responses import PlainTextResponse
+
         self.router.add_api_route("/ai-guard/status", self.get_status, methods=["GET"])
+        self.router.add_api_route(
+            "/ai-guard/metrics",
+            self.get_metrics,
+            methods=["GET"],
+            response_class=PlainTextResponse,
+        )
+        self.router.add_api_route(
+            "/ai-guard/history", self.get_history, methods=["GET"]
+        )
+        self.router.add_api_route(
+            "/ai-guard/snapshot", self.get_snapshot, methods=["GET"]
+        )
+        self.router.add_api_route("/ai-guard/stream", self.get_stream, methods=["GET"])
         self.router.add_websocket_route("/ai-guard/ws", self.websocket_endpoint)
+        if hasattr(self.engine, "get_printer_status"):
+            self.router.add_api_route(
+                "/ai-guard/printers", self.get_printers, methods=["GET"]
+            )
+            self.router.add_api_route(
+                "/ai-guard/printers/{name}", self.get_printer, methods=["GET"]
+            )
 
     async def get_status(self) -> Dict[str, Any]:
         """Get current monitoring status"""
-        return {
+        status = {
             "status": "active",
             "fps": self.engine.get_fps(),
             "confidence": self.engine.get_latest_confidence(),
             "defect_type": self.engine.get_latest_defect_type(),
+            "smoothed_confidence": self.engine.get_smoothed_confidence(),
+            "detection_interval": self.engine.get_detection_interval(),
+            "detection_rate": self.engine.get_detection_rate(),
+            "escalation_rate": self.engine.get_escalation_rate(),
         }
+        if hasattr(self.engine, "get_printer_status"):
+            status["printers"] = self.engine.get_printer_status()
+        return status
+
+    async def get_printers(self) -> Dict[str, Any]:
+        """Status of every printer of the fleet"""
+        return self.engine.get_printer_status()
+
+    async def get_printer(self, name: str) -> Dict[str, Any]:
+        """Status of one printer of the fleet"""
+        from fastapi import HTTPException
+
+        if name not in self.engine.members:
+            raise HTTPException(status_code=404, detail=f"Unknown printer: {name}")
+        return self.engine.get_printer_status(name)[name]
+
+    def _member(self, printer: Optional[str]):
+        """The engine of one fleet printer, or the single engine"""
+        from fastapi import HTTPException
+
+        if printer is None:
+            return self.engine
+        engine = getattr(self.engine, "members", {}).get(printer)
+        if engine is None:
+            raise HTTPException(status_code=404, detail=f"Unknown printer: {printer}")
+        return engine
+
+    def _snapshots(self, printer: Optional[str]):
+        from fastapi import HTTPException
 
-    async def websocket_endpoint(self, websocket: WebSocket):
+        engine = self._member(printer)
+        if not hasattr(engine, "snapshots"):
+            raise HTTPException(
+                status_code=400, detail="Fleet snapshots need ?printer="
+            )
+        return engine.snapshots
+
+    async def get_history(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        buckets: int = 200,
+        printer: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Min/max/mean confidence timeline, by default over the last hour
+
+        ``start`` and ``end`` are epoch seconds; fleets need ``printer``.
+        """
+        from fastapi import HTTPException
+
+        engine = self._member(printer)
+        if not hasattr(engine, "get_history"):
+            raise HTTPException(status_code=400, detail="Fleet history needs ?printer=")
+        try:
+            return engine.get_history(start, end, buckets)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    async def get_snapshot(self, printer: Optional[str] = None):
+        """Latest analysed frame with its overlay, as a JPEG"""
+        from fastapi import HTTPException
+        from fastapi.responses import Response
+
+        snapshot = await self._snapshots(printer).snapshot()
+        if snapshot is None:
+            raise HTTPException(status_code=503, detail="No frame analysed yet")
+        return Response(
+            snapshot.jpeg,
+            media_type="image/jpeg",
+            headers={"Cache-Control": "no-store", "X-Sequence": str(snapshot.sequence)},
+        )
+
+    async def get_stream(self, printer: Optional[str] = None):
+        """MJPEG stream of the analysed frames with their overlay"""
+        from fastapi.responses import StreamingResponse
+
+        return StreamingResponse(
+            mjpeg_parts(self._snapshots(printer)),
+            media_type=f"multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}",
+            headers={"Cache-Control": "no-store"},
+        )
+
+    async def get_metrics(self):
+        """Performance metrics in the Prometheus text format"""
+        from fastapi.responses import PlainTextResponse
+
+        if hasattr(self.engine, "to_prometheus"):
+            metrics = self.engine.to_prometheus()
+        else:
+            metrics = self.engine.performance.to_prometheus()
+        return PlainTextResponse(
+            metrics,
+            media_type="text/plain; version=0.0.4",
+        )
+
+    async def websocket_endpoint(self, websocket):
         """WebSocket endpoint for real-time updates"""
         await websocket.accept()
-        self._clients.add(websocket)
-        try:
-            while True:
-                await asyncio.sleep(1)
-                status = await self.get_status()
-                await websocket.send_json(status)
-        finally:
-            self._clients.remove(websocket)
+        await self.broadcaster.serve(websocket.send_text)
 
     async def notify_clients(self, message: Dict[str, Any]):
-        """Notify all connected WebSocket clients"""
-        for client in self._clients:
-            await client.send_json(message)
+        """Push an event to all connected WebSocket clients immediately"""
+        self.broadcaster.publish_event(message)
+
 
-    def load_plugin(config: Dict[str, Any]) -> AIGuardPlugin:
-        """Entry point for Moonraker to load the plugin"""
-        return AIGuardPlugin(config)
+def load_plugin(config: Dict[str, Any]) -> AIGuardPlugin:
+    """Entry point for Moonraker to load the plugin"""
+    return AIGuardPlugin(config)
@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import resource
+from typing import Any, Dict, Optional
+from sentinelowl.config import CameraConfig, ModelConfig
+from sentinelowl.core.camera import CameraHandler
+from sentinelowl.core.detector import DefectDetector
+from sentinelowl.core.performance import PerformanceMonitor
+from sentinelowl.core.preprocess import Preprocessor
+
+# Input shape used to time preprocessing for the placeholder model, which has none
+PLACEHOLDER_INPUT_SHAPE = (1, 3, 224, 224)
+
+
+def _camera_config(source: str) -> CameraConfig:
+    """Map a bench ``--source`` to a camera configuration"""
+    if source.startswith("synthetic://"):
+        return CameraConfig(url=source, type="synthetic")
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"Video file not found: {source}")
+    return CameraConfig(url=source, type="file")
+
+
+def _model_config(model: str) -> ModelConfig:
+    """Map a bench ``--model`` to a model configuration"""
+    if model == "placeholder":
+        return ModelConfig(type="placeholder")
+    # Only latency is measured, so any class of a multi-class output will do
+    return ModelConfig(type="onnx", path=model, class_index=0)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if os.uname().sysname == "Darwin" else peak / 1024
+
+
+def run_benchmark(
+    source: str = "synthetic://1280x720",
+    model: str = "placeholder",
+    frames: int = 200,
+    warmup: int = 10,
+) -> Dict[str, Any]:
+    """Drive capture → preprocess → inference → action and return a report"""
+    monitor = PerformanceMonitor(window_size=max(frames, 2))
+    camera = CameraHandler(_camera_config(source), performance=monitor)
+    detector = DefectDetector(_model_config(model), performance=monitor)
+    # The placeholder model ignores its input; time a real preprocessing pass
+    preprocessor = (
+        Preprocessor(PLACEHOLDER_INPUT_SHAPE) if model == "placeholder" else None
+    )
+
+    def step(record: bool) -> bool:
+        start = time.perf_counter()
+        frame = camera.capture_frame()
+        if frame is None:
+            return False
+        captured = time.perf_counter()
+        if record:
+            monitor.record_stage("capture", captured - start)
+            monitor.start_frame()
+        if preprocessor is not None:
+            preprocessed = preprocessor(frame)
+            if record:
+                monitor.record_stage("preprocess", time.perf_counter() - captured)
+            frame_for_model = preprocessed
+        else:
+            frame_for_model = frame
+        result = detector.analyze(frame_for_model)
+        if record:
+            with monitor.stage("action"):
+                _ = result.is_critical or result.is_warning
+            monitor.end_frame(skipped=detector.last_skipped)
+            monitor.record_frame_age(time.perf_counter() - start)
+        return True
+
+    try:
+        detector.performance = None  # Keep warm-up out of the histograms
+        for _ in range(warmup):
+            step(record=False)
+        detector.performance = monitor
+
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        completed = 0
+        for _ in range(frames):
+            if step(record=True):
+                completed += 1
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+    finally:
+        camera.release()
+        detector.close()
+
+    stages = {
+        stage: {
+            key: value * 1000 for key, value in monitor.get_percentiles(stage).items()
+        }
+        for stage, histogram in monitor.stages.items()
+        if histogram.count
+    }
+    return {
+        "source": source,
+        "model": model,
+        "frames": completed,
+        "fps": completed / wall if wall > 0 else 0.0,
+        "cpu_ms_per_frame": cpu / completed * 1000 if completed else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+        "stages_ms": stages,
+    }
+
+
+def check_thresholds(
+    report: Dict[str, Any],
+    min_fps: Optional[float] = None,
+    max_p95_ms: Optional[float] = None,
+    max_rss_mb: Optional[float] = None,
+) -> list:
+    """Return a list of human-readable regression failures"""
+    failures = []
+    if min_fps is not None and report["fps"] < min_fps:
+        failures.append(f"fps {report['fps']:.1f} < {min_fps}")
+    if max_p95_ms is not None:
+        for stage, percentiles in report["stages_ms"].items():
+            if percentiles["p95"] > max_p95_ms:
+                failures.append(
+                    f"{stage} p95 {percentiles['p95']:.2f} ms > {max_p95_ms} ms"
+                )
+    if max_rss_mb is not None and report["peak_rss_mb"] > max_rss_mb:
+        failures.append(f"peak RSS {report['peak_rss_mb']:.1f} MB > {max_rss_mb} MB")
+    return failures
+
+
+def print_report(report: Dict[str, Any]):
+    """Print a benchmark report as a table"""
+    print(f"🦉 Benchmark: {report['source']} → {report['model']}")
+    print(
+        f"   {report['frames']} frames, {report['fps']:.1f} FPS, "
+        f"{report['cpu_ms_per_frame']:.2f} ms CPU/frame, "
+        f"peak RSS {report['peak_rss_mb']:.1f} MB"
+    )
+    print(f"   {'stage':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage, percentiles in report["stages_ms"].items():
+        print(
+            f"   {stage:<12}{percentiles['p50']:>10.3f}"
+            f"{percentiles['p95']:>10.3f}{percentiles['p99']:>10.3f}"
+        )
+
+
+def main(
+    source: str = "synthetic://1280x720",
+    model: str = "placeholder",
+    frames: int = 200,
+    json_path: Optional[str] = None,
+    min_fps: Optional[float] = None,
+    max_p95_ms: Optional[float] = None,
+    max_rss_mb: Optional[float] = None,
+) -> bool:
+    """Run the benchmark, print/write the report and check thresholds"""
+    report = run_benchmark(source=source, model=model, frames=frames)
+    failures = check_thresholds(report, min_fps, max_p95_ms, max_rss_mb)
+    report["failures"] = failures
+    print_report(report)
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(report, f, indent=2)
+    for failure in failures:
+        print(f"❌ Regression: {failure}")
+    return not failures
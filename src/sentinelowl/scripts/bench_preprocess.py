@@ -0,0 +1,67 @@
+import time
+import tracemalloc
+import numpy as np
+from typing import Any, Callable, Dict
+from sentinelowl.core.preprocess import Preprocessor
+from sentinelowl.scripts.validate import preprocess_frame
+
+
+def measure(fn: Callable[[np.ndarray], Any], frame: np.ndarray, iterations: int):
+    """Return (ms per frame, peak transient MB per frame, new blocks per frame)
+
+    numpy and OpenCV's numpy allocator report every buffer to tracemalloc, so
+    the traced peak during a call covers all of its temporaries.
+    """
+    fn(frame)  # Warm up buffers and OpenCV dispatch
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(frame)
+    elapsed = (time.perf_counter() - start) / iterations
+
+    tracemalloc.start()
+    peak = 0
+    blocks = 0
+    for _ in range(iterations):
+        before = tracemalloc.take_snapshot()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = fn(frame)
+        _, call_peak = tracemalloc.get_traced_memory()
+        peak = max(peak, call_peak - baseline)
+        after = tracemalloc.take_snapshot()
+        blocks += sum(
+            max(stat.count_diff, 0) for stat in after.compare_to(before, "lineno")
+        )
+        del result
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 1e6, blocks / iterations
+
+
+def main(
+    shape=(1, 3, 224, 224),
+    dtype: str = "tensor(float)",
+    width: int = 1920,
+    height: int = 1080,
+    iterations: int = 50,
+):
+    """Compare ``preprocess_frame`` against ``Preprocessor`` on one frame size"""
+    metadata: Dict[str, Any] = {"name": "input", "shape": list(shape), "dtype": dtype}
+    frame = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+    preprocessor = Preprocessor.from_metadata(metadata)
+
+    candidates = {
+        "preprocess_frame": lambda f: preprocess_frame(f, metadata),
+        "Preprocessor": preprocessor,
+    }
+    print(f"Input {width}x{height} BGR → {tuple(shape)} {dtype}, {iterations} runs")
+    for name, fn in candidates.items():
+        ms, peak_mb, blocks = measure(fn, frame, iterations)
+        print(
+            f"{name:>18}: {ms:7.3f} ms/frame, "
+            f"peak {peak_mb:7.3f} MB/frame, {blocks:5.1f} new blocks/frame"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,490 @@
+import os
+import csv
+import json
+import multiprocessing as mp
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+import cv2
+import numpy as np
+from sentinelowl.config import AppConfig, ModelConfig
+from sentinelowl.core.models import create_model
+from sentinelowl.core.preprocess import Preprocessor
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov", ".webm")
+
+
+class Source(NamedTuple):
+    """One recording: a video file or a directory of timelapse images"""
+
+    name: str  # Path relative to the evaluation root, as used in the labels file
+    kind: str  # "video" or "images"
+    path: str
+    fps: float
+    frame_count: int
+
+
+class Chunk(NamedTuple):
+    """Decoded and preprocessed frames of one source"""
+
+    source: str
+    frames: np.ndarray  # Frame indices within the source
+    tensors: Any  # Stacked NCHW model inputs, or a list of raw BGR frames
+
+
+def find_sources(root: str, image_fps: float = 1.0) -> List[Source]:
+    """Video files and image directories under ``root``, in a stable order"""
+    sources = []
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        images = sorted(f for f in filenames if f.lower().endswith(IMAGE_EXTENSIONS))
+        if images:
+            name = os.path.relpath(directory, root)
+            sources.append(Source(name, "images", directory, image_fps, len(images)))
+        for filename in sorted(filenames):
+            if filename.lower().endswith(VIDEO_EXTENSIONS):
+                path = os.path.join(directory, filename)
+                cap = cv2.VideoCapture(path)
+                fps = cap.get(cv2.CAP_PROP_FPS) or 1.0
+                count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+                cap.release()
+                sources.append(
+                    Source(os.path.relpath(path, root), "video", path, fps, count)
+                )
+    return sources
+
+
+def load_labels(path: Optional[str]) -> Dict[str, int]:
+    """Read ``source,onset_frame`` rows; a defect is present from the onset on
+
+    Sources that are missing, or have an empty or negative onset, are
+    labelled defect-free throughout.
+    """
+    labels: Dict[str, int] = {}
+    if path is None:
+        return labels
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            onset = (row.get("onset_frame") or "").strip()
+            if onset and int(onset) >= 0:
+                labels[row["source"]] = int(onset)
+    return labels
+
+
+# Per-worker preprocessor, built on first use
+_preprocessor: Optional[Preprocessor] = None
+
+
+def _new_batch(count: int, shape, dtype):
+    """Room for ``count`` model inputs; raw frames (no ``shape``) go in a list"""
+    if shape is None:
+        return []
+    return np.empty((count,) + tuple(shape[1:]), dtype=dtype)
+
+
+def _store(tensors, n: int, image: np.ndarray, preprocessor):
+    """Put one decoded frame into a batch, preprocessed in place if possible"""
+    if preprocessor is None:
+        tensors.append(image)
+    else:
+        tensors[n] = preprocessor(image)[0]
+
+
+def _decode_chunk(task: tuple) -> Chunk:
+    """Worker: decode ``count`` frames of a source and preprocess them
+
+    With no ``shape`` the frames are kept raw, for models that preprocess
+    inside ``predict()``.
+    """
+    global _preprocessor
+    source, kind, path, start, count, stride, shape, dtype, roi, letterbox = task
+    preprocessor = None
+    if shape is not None:
+        if _preprocessor is None or _preprocessor.output.shape != shape:
+            _preprocessor = Preprocessor(
+                shape, dtype=dtype, roi=roi, letterbox=letterbox
+            )
+        preprocessor = _preprocessor
+
+    tensors = _new_batch(count, shape, dtype)
+    frames = np.empty(count, dtype=np.int64)
+    n = 0
+    if kind == "images":
+        # ``path`` holds the image files of this chunk, already strided
+        for offset, filename in enumerate(path):
+            image = cv2.imread(filename)
+            if image is not None:
+                _store(tensors, n, image, preprocessor)
+                frames[n] = start + offset * stride
+                n += 1
+    else:
+        cap = cv2.VideoCapture(path)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        index = start
+        while n < count:
+            ok = cap.grab()
+            if not ok:
+                break
+            if (index - start) % stride == 0:
+                ok, image = cap.retrieve()
+                if ok:
+                    _store(tensors, n, image, preprocessor)
+                    frames[n] = index
+                    n += 1
+            index += 1
+        cap.release()
+    return Chunk(source, frames[:n], tensors[:n])
+
+
+def _decode_stream(task: tuple) -> Iterator[Chunk]:
+    """Decode a video of unknown length front to back, batch by batch
+
+    Containers such as mkv or webm often report no frame count, so the
+    video cannot be split into seekable chunks; it is read to the end in
+    the calling process instead.
+    """
+    source, _, path, _, count, stride, shape, dtype, roi, letterbox = task
+    preprocessor = None
+    if shape is not None:
+        preprocessor = Preprocessor(shape, dtype=dtype, roi=roi, letterbox=letterbox)
+    cap = cv2.VideoCapture(path)
+    index = 0
+    try:
+        while True:
+            tensors = _new_batch(count, shape, dtype)
+            frames = np.empty(count, dtype=np.int64)
+            n = 0
+            while n < count and cap.grab():
+                if index % stride == 0:
+                    ok, image = cap.retrieve()
+                    if ok:
+                        _store(tensors, n, image, preprocessor)
+                        frames[n] = index
+                        n += 1
+                index += 1
+            if n:
+                yield Chunk(source, frames[:n], tensors[:n])
+            if n < count:
+                return  # End of the video
+    finally:
+        cap.release()
+
+
+def _chunk_tasks(sources, shape, dtype, batch_size, stride, roi, letterbox):
+    """Decode tasks of at most ``batch_size`` frames, in source order"""
+    span = batch_size * stride
+    common = (shape, dtype, roi, letterbox)
+    for source in sources:
+        if source.kind == "images":
+            names = sorted(
+                os.path.join(source.path, f)
+                for f in os.listdir(source.path)
+                if f.lower().endswith(IMAGE_EXTENSIONS)
+            )
+            for start in range(0, len(names), span):
+                paths = tuple(names[start : start + span : stride])
+                yield (source.name, "images", paths, start, len(paths), stride) + common
+        elif source.frame_count <= 0:
+            yield (source.name, "stream", source.path, 0, batch_size, stride) + common
+        else:
+            for start in range(0, source.frame_count, span):
+                task = (source.name, "video", source.path, start, batch_size, stride)
+                yield task + common
+
+
+def iter_chunks(
+    sources: List[Source],
+    shape: Tuple[int, ...],
+    dtype,
+    batch_size: int = 32,
+    stride: int = 1,
+    workers: int = 0,
+    prefetch: int = 4,
+    roi=None,
+    letterbox: bool = False,
+) -> Iterator[Chunk]:
+    """Stream preprocessed batches, decoding on ``workers`` processes
+
+    At most ``prefetch`` batches per worker are in flight, so memory use is
+    bounded however much footage there is. Batches come out in source order.
+    """
+    tasks = _chunk_tasks(sources, shape, dtype, batch_size, stride, roi, letterbox)
+    if workers <= 0:
+        for task in tasks:
+            if task[1] == "stream":
+                yield from _decode_stream(task)
+            else:
+                yield _decode_chunk(task)
+        return
+
+    context = mp.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context) as pool:
+        pending = deque()
+        for task in tasks:
+            if task[1] == "stream":
+                while pending:  # Keep batches in source order
+                    yield pending.popleft().result()
+                yield from _decode_stream(task)
+                continue
+            pending.append(pool.submit(_decode_chunk, task))
+            if len(pending) >= workers * prefetch:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _score_chunk(model, chunk: Chunk) -> np.ndarray:
+    if hasattr(model, "score_batch"):
+        return model.score_batch(chunk.tensors)
+    return np.array(
+        [model.predict(frame)[0] for frame in chunk.tensors], dtype=np.float32
+    )
+
+
+def model_config(
+    config: Optional[ModelConfig] = None, model: Optional[str] = None
+) -> ModelConfig:
+    """The configured model, with ``model`` overriding its path
+
+    ``model`` may also be "placeholder". Everything else the configuration
+    sets (type, class index, ROI, letterbox, class thresholds, cascade
+    prefilter) is kept, so footage is scored the way the engine scores it.
+    """
+    config = config or ModelConfig()
+    if model is None:
+        return config
+    if model == "placeholder":
+        return config.model_copy(update={"type": "placeholder", "prefilter": None})
+    model_type = "onnx" if config.type == "placeholder" else config.type
+    return config.model_copy(update={"type": model_type, "path": model})
+
+
+class SweepCounts:
+    """Running threshold-sweep counts, updated one chunk at a time
+
+    For every threshold it keeps the frame TP/FP/FN totals and, per
+    source, whether any frame before the labelled onset was flagged and
+    the first flagged frame from the onset on. Memory depends only on the
+    number of sources and thresholds, not on the length of the footage.
+    Chunks of a source must arrive in frame order.
+    """
+
+    def __init__(
+        self,
+        thresholds: np.ndarray,
+        labels: Dict[str, int],
+        fps: Dict[str, float],
+    ):
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        self.labels = labels
+        self.fps = fps
+        self.frames = 0
+        size = len(self.thresholds)
+        self.tp = np.zeros(size, dtype=np.int64)
+        self.fp = np.zeros(size, dtype=np.int64)
+        self.fn = np.zeros(size, dtype=np.int64)
+        # Keyed by every source, so labelled sources without frames count
+        # as missed
+        self.early = {name: np.zeros(size, dtype=bool) for name in fps}
+        self.first_hit = {name: np.full(size, -1, dtype=np.int64) for name in fps}
+
+    def update(self, source: str, frames: np.ndarray, scores: np.ndarray):
+        """Add the scores of one chunk of ``source``"""
+        if not len(frames):
+            return
+        self.frames += len(frames)
+        truth = frames >= self.labels.get(source, np.iinfo(np.int64).max)
+        flagged = scores[None, :] > self.thresholds[:, None]
+        hits = flagged & truth
+        false_hits = flagged & ~truth
+        self.tp += np.count_nonzero(hits, axis=1)
+        self.fp += np.count_nonzero(false_hits, axis=1)
+        self.fn += np.count_nonzero(~flagged & truth, axis=1)
+        self.early[source] |= false_hits.any(axis=1)
+
+        first = self.first_hit[source]
+        new = (first < 0) & hits.any(axis=1)
+        first[new] = frames[hits.argmax(axis=1)][new]
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Frame precision/recall and detection delay for each threshold"""
+        rows = []
+        for i, threshold in enumerate(self.thresholds):
+            tp, fp, fn = int(self.tp[i]), int(self.fp[i]), int(self.fn[i])
+            precision = tp / (tp + fp) if tp + fp else 1.0
+            recall = tp / (tp + fn) if tp + fn else 0.0
+
+            delays, missed, false_alarms = [], 0, 0
+            for name in self.fps:
+                false_alarms += int(self.early[name][i])
+                onset = self.labels.get(name)
+                if onset is None:
+                    continue
+                hit = self.first_hit[name][i]
+                if hit >= 0:
+                    delays.append((hit - onset) / self.fps[name])
+                else:
+                    missed += 1
+            rows.append(
+                {
+                    "threshold": round(float(threshold), 4),
+                    "precision": precision,
+                    "recall": recall,
+                    "f1": (
+                        2 * precision * recall / (precision + recall)
+                        if precision + recall
+                        else 0.0
+                    ),
+                    "mean_delay_s": float(np.mean(delays)) if delays else None,
+                    "missed_sources": missed,
+                    "false_alarm_sources": false_alarms,
+                }
+            )
+        return rows
+
+
+def sweep_thresholds(
+    scores: Dict[str, np.ndarray],
+    frames: Dict[str, np.ndarray],
+    labels: Dict[str, int],
+    fps: Dict[str, float],
+    thresholds: np.ndarray,
+) -> List[Dict[str, Any]]:
+    """Frame precision/recall and detection delay for each threshold"""
+    counts = SweepCounts(thresholds, labels, {name: fps[name] for name in scores})
+    for name in scores:
+        counts.update(name, frames[name], scores[name])
+    return counts.rows()
+
+
+def suggest_thresholds(
+    sweep: List[Dict[str, Any]], critical_precision: float = 0.95
+) -> Dict[str, Optional[float]]:
+    """Warning at the best F1; critical at the lowest threshold this precise"""
+    warning = max(sweep, key=lambda row: row["f1"])["threshold"] if sweep else None
+    precise = [row for row in sweep if row["precision"] >= critical_precision]
+    critical = min(row["threshold"] for row in precise) if precise else None
+    if warning is not None and critical is not None:
+        critical = max(critical, warning)
+    return {"warning_threshold": warning, "critical_threshold": critical}
+
+
+def evaluate(
+    root: str,
+    labels_path: Optional[str] = None,
+    model: Optional[str] = None,
+    batch_size: int = 32,
+    stride: int = 1,
+    workers: Optional[int] = None,
+    prefetch: int = 4,
+    image_fps: float = 1.0,
+    critical_precision: float = 0.95,
+    config: Optional[ModelConfig] = None,
+) -> Dict[str, Any]:
+    """Score every source under ``root`` and sweep alarm thresholds
+
+    The model is built from ``config`` (the ``model`` section of the app
+    configuration); ``model`` overrides its path.
+    """
+    sources = find_sources(root, image_fps)
+    if not sources:
+        raise ValueError(f"No videos or images found under {root}")
+    labels = load_labels(labels_path)
+    config = model_config(config, model)
+    detector = create_model(config)
+    if hasattr(detector, "score_batch"):
+        shape = detector.input_shape
+        dtype = detector.input_dtype
+    else:
+        shape, dtype = None, None  # Raw frames, preprocessed by predict()
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    counts = SweepCounts(
+        np.round(np.arange(0.05, 1.0, 0.05), 2),
+        labels,
+        {s.name: s.fps for s in sources},
+    )
+    try:
+        for chunk in iter_chunks(
+            sources,
+            shape,
+            dtype,
+            batch_size=batch_size,
+            stride=stride,
+            workers=workers,
+            prefetch=prefetch,
+            roi=config.roi,
+            letterbox=config.letterbox,
+        ):
+            if len(chunk.frames):
+                counts.update(chunk.source, chunk.frames, _score_chunk(detector, chunk))
+    finally:
+        detector.close()
+
+    sweep = counts.rows()
+    return {
+        "root": root,
+        "model": config.path or config.type,
+        "sources": len(sources),
+        "frames": counts.frames,
+        "sweep": sweep,
+        "suggested": suggest_thresholds(sweep, critical_precision),
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    """Print the threshold sweep as a table"""
+    print(
+        f"🦉 Evaluated {report['frames']} frames from {report['sources']} "
+        f"sources with {report['model']}"
+    )
+    print(
+        f"   {'threshold':>9}{'precision':>11}{'recall':>8}{'f1':>7}"
+        f"{'delay s':>9}{'missed':>8}{'false alarms':>14}"
+    )
+    for row in report["sweep"]:
+        delay = row["mean_delay_s"]
+        print(
+            f"   {row['threshold']:>9.2f}{row['precision']:>11.3f}"
+            f"{row['recall']:>8.3f}{row['f1']:>7.3f}"
+            f"{(f'{delay:.1f}' if delay is not None else '-'):>9}"
+            f"{row['missed_sources']:>8}{row['false_alarm_sources']:>14}"
+        )
+    suggested = report["suggested"]
+    print(
+        f"💡 Suggested warning_threshold={suggested['warning_threshold']}, "
+        f"critical_threshold={suggested['critical_threshold']}"
+    )
+
+
+def main(
+    root: str,
+    labels_path: Optional[str] = None,
+    model: Optional[str] = None,
+    batch_size: int = 32,
+    stride: int = 1,
+    workers: Optional[int] = None,
+    json_path: Optional[str] = None,
+    config_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Run the evaluation, print the sweep and optionally write it as JSON"""
+    config = None
+    if config_path:
+        with open(config_path) as f:
+            config = AppConfig.model_validate_json(f.read()).model
+    report = evaluate(
+        root,
+        labels_path,
+        model=model,
+        batch_size=batch_size,
+        stride=stride,
+        workers=workers,
+        config=config,
+    )
+    print_report(report)
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
@@ -0,0 +1,217 @@
+import os
+import time
+import cv2
+import numpy as np
+import onnxruntime as ort
+from typing import Any, Dict, List, Optional
+from sentinelowl.core.models.model_cache import (
+    model_fingerprint,
+    optimized_model_path,
+    save_fingerprint,
+)
+from sentinelowl.core.models.onnx_model import GRAPH_OPTIMIZATION_LEVELS, OnnxModel
+from sentinelowl.core.sources import SyntheticSource
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def load_frames(path: Optional[str] = None, limit: int = 100) -> List[np.ndarray]:
+    """Read up to ``limit`` BGR frames from an image directory or a video file
+
+    Without ``path`` synthetic frames are used, which is enough for timing
+    but says little about accuracy.
+    """
+    frames = []
+    if path is None:
+        print("⚠️ No frame set given, using synthetic frames")
+        source = SyntheticSource(640, 480)
+        while len(frames) < min(limit, 16):
+            frames.append(source.read()[1])
+        return frames
+
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                frame = cv2.imread(os.path.join(path, name))
+                if frame is not None:
+                    frames.append(frame)
+            if len(frames) >= limit:
+                break
+    else:
+        cap = cv2.VideoCapture(path)
+        while len(frames) < limit:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+
+    if not frames:
+        raise ValueError(f"No frames found in {path}")
+    return frames
+
+
+def optimize_graph(model_path: str, graph_optimization: str = "all") -> str:
+    """Serialize the ORT-optimized graph and record its fingerprint"""
+    output_path = optimized_model_path(model_path)
+    options = ort.SessionOptions()
+    options.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS[graph_optimization]
+    options.optimized_model_filepath = output_path
+    ort.InferenceSession(
+        model_path, sess_options=options, providers=["CPUExecutionProvider"]
+    )
+    save_fingerprint(output_path, model_fingerprint(model_path, graph_optimization))
+    return output_path
+
+
+def quantize_model(
+    model_path: str, mode: str = "dynamic", frames: Optional[List[np.ndarray]] = None
+) -> str:
+    """Write an int8 variant of ``model_path`` next to it
+
+    ``dynamic`` quantizes weights only; ``static`` also quantizes activations
+    using ``frames`` as the calibration set.
+    """
+    try:
+        from onnxruntime.quantization import (
+            CalibrationDataReader,
+            QuantFormat,
+            QuantType,
+            quantize_dynamic,
+            quantize_static,
+        )
+    except ImportError as e:
+        raise RuntimeError(
+            "Quantization needs the onnx package, "
+            f"install it with: pip install 'sentinelowl[optimize]' ({e})"
+        ) from e
+
+    output_path = f"{os.path.splitext(model_path)[0]}.int8.onnx"
+    if mode == "dynamic":
+        quantize_dynamic(model_path, output_path, weight_type=QuantType.QUInt8)
+        return output_path
+    if mode != "static":
+        raise ValueError(f"Unsupported quantization mode: {mode}")
+    if not frames:
+        raise ValueError("Static quantization needs a calibration frame set")
+
+    model = OnnxModel(model_path, class_index=0, use_cache=False)
+
+    class FrameReader(CalibrationDataReader):
+        """Feeds preprocessed calibration frames to the calibrator"""
+
+        def __init__(self):
+            self._frames = iter(frames)
+
+        def get_next(self):
+            frame = next(self._frames, None)
+            if frame is None:
+                return None
+            return {model.input_name: model.preprocessor(frame).copy()}
+
+    quantize_static(
+        model_path,
+        output_path,
+        FrameReader(),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+    )
+    model.close()
+    return output_path
+
+
+def _timed_model(path: str, use_cache: bool):
+    start = time.perf_counter()
+    # Class 0's score plus the argmax compare every class of the output
+    model = OnnxModel(path, class_index=0, use_cache=use_cache)
+    return model, time.perf_counter() - start
+
+
+def compare_models(
+    original_path: str, candidate_path: str, frames: List[np.ndarray]
+) -> Dict[str, Any]:
+    """Accuracy delta, startup time and speedup of a candidate vs the original
+
+    The candidate is loaded the way the runtime would, i.e. through the
+    optimized-graph cache.
+    """
+    original, original_load = _timed_model(original_path, use_cache=False)
+    candidate, candidate_load = _timed_model(candidate_path, use_cache=True)
+
+    deltas, agree = [], 0
+    timings = {"original": 0.0, "candidate": 0.0}
+    for frame in frames:
+        scores = {}
+        for name, model in (("original", original), ("candidate", candidate)):
+            start = time.perf_counter()
+            outputs = model.run(frame)
+            timings[name] += time.perf_counter() - start
+            scores[name] = (model._score(outputs[0]), int(np.argmax(outputs[0])))
+        deltas.append(abs(scores["original"][0] - scores["candidate"][0]))
+        agree += scores["original"][1] == scores["candidate"][1]
+
+    report = {
+        "original": original_path,
+        "candidate": candidate.session_path,
+        "frames": len(frames),
+        "mean_confidence_delta": float(np.mean(deltas)),
+        "max_confidence_delta": float(np.max(deltas)),
+        "top1_agreement": agree / len(frames),
+        "original_load_ms": original_load * 1000,
+        "candidate_load_ms": candidate_load * 1000,
+        "original_ms_per_frame": timings["original"] / len(frames) * 1000,
+        "candidate_ms_per_frame": timings["candidate"] / len(frames) * 1000,
+    }
+    report["speedup"] = (
+        timings["original"] / timings["candidate"] if timings["candidate"] else 0.0
+    )
+    original.close()
+    candidate.close()
+    return report
+
+
+def main(
+    model_path: str,
+    quantize: str = "none",
+    calibration: Optional[str] = None,
+    frames: Optional[str] = None,
+    graph_optimization: str = "all",
+    limit: int = 100,
+) -> Dict[str, Any]:
+    """Quantize (optionally), cache the optimized graph and report the result"""
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Model file not found: {model_path}")
+
+    target = model_path
+    if quantize != "none":
+        calibration_frames = (
+            load_frames(calibration, limit) if quantize == "static" else None
+        )
+        target = quantize_model(model_path, quantize, calibration_frames)
+        print(f"🗜️ Quantized ({quantize}) model: {target}")
+
+    optimized = optimize_graph(target, graph_optimization)
+    print(f"⚡ Cached optimized graph: {optimized}")
+
+    report = compare_models(model_path, target, load_frames(frames, limit))
+    report["model_path"] = os.path.abspath(target)
+    print(
+        f"📊 {report['frames']} frames: top-1 agreement "
+        f"{report['top1_agreement']:.1%}, confidence delta mean "
+        f"{report['mean_confidence_delta']:.4f} / max "
+        f"{report['max_confidence_delta']:.4f}"
+    )
+    print(
+        f"   Startup {report['original_load_ms']:.1f} → "
+        f"{report['candidate_load_ms']:.1f} ms, inference "
+        f"{report['original_ms_per_frame']:.2f} → "
+        f"{report['candidate_ms_per_frame']:.2f} ms/frame "
+        f"({report['speedup']:.2f}x)"
+    )
+    if target != model_path:
+        # The runtime loads model.path as configured, never the int8 sibling
+        print(
+            f"👉 To run the quantized model, set model.path to: {report['model_path']}"
+        )
+    return report
@@ -0,0 +1,295 @@
+import gc
+import os
+import json
+import time
+import asyncio
+import threading
+import tracemalloc
+from typing import Any, Dict, List, Optional
+import numpy as np
+from sentinelowl.config import AppConfig, DetectionConfig, HistoryConfig
+from sentinelowl.scripts.bench import _camera_config, _model_config, _peak_rss_mb
+
+# Growth budgets per hour of soak; a short run needs looser ones, since a
+# one-off allocation after the warm-up weighs more. RSS moves in steps as the
+# allocator grows its arenas, so its budget is coarse; traced Python memory
+# is smooth enough to catch leaks of a few hundred bytes per detection.
+DEFAULT_MAX_SLOPES = {
+    "rss_mb": 64.0,
+    "traced_mb": 8.0,
+    "fds": 10.0,
+    "threads": 10.0,
+    "tasks": 60.0,  # Sampled mid-flight, so it jitters by a task or two
+}
+
+
+def _rss_mb() -> float:
+    """Current resident set size; the peak where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        return _peak_rss_mb()
+
+
+def _open_fds() -> int:
+    for path in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            continue
+    return -1
+
+
+def soak_config(source: str, model: str, rate: float, threaded: bool) -> AppConfig:
+    """Engine configuration for a soak run
+
+    The detection interval is pinned to ``1 / rate`` and the alarm
+    thresholds are out of reach, so the loop runs at a steady pace without
+    pausing anything. History is capped small so that it reaches its
+    steady-state size within the warm-up.
+    """
+    period = 1.0 / rate
+    camera = _camera_config(source)
+    camera.threaded = threaded
+    model_config = _model_config(model)
+    model_config.warning_threshold = model_config.critical_threshold = 2.0
+    return AppConfig(
+        camera=camera,
+        model=model_config,
+        detection=DetectionConfig(
+            interval=1,  # Clamped to the pinned bounds below
+            min_interval=period,
+            max_interval=period,
+            warning_threshold=2.0,
+            critical_threshold=2.0,
+            suspend_when_idle=False,
+            analyze_on_layer_change=False,
+        ),
+        history=HistoryConfig(chunk_size=256, max_samples=1024),
+    )
+
+
+def growth_slopes(
+    samples: List[Dict[str, float]], warmup: float = 0.0
+) -> Dict[str, float]:
+    """Least-squares growth per hour of each sampled metric after ``warmup``"""
+    steady = [sample for sample in samples if sample["t"] >= warmup]
+    if len(steady) < 2:
+        return {}
+    hours = np.array([sample["t"] for sample in steady]) / 3600
+    if np.ptp(hours) == 0:
+        return {}
+    return {
+        metric: float(np.polyfit(hours, [sample[metric] for sample in steady], 1)[0])
+        for metric in DEFAULT_MAX_SLOPES
+    }
+
+
+def check_slopes(
+    slopes: Dict[str, float], max_slopes: Optional[Dict[str, float]] = None
+) -> list:
+    """Return a list of human-readable growth failures"""
+    limits = {**DEFAULT_MAX_SLOPES, **(max_slopes or {})}
+    return [
+        f"{metric} grows {slopes[metric]:+.2f}/h > {limit}/h"
+        for metric, limit in limits.items()
+        if limit is not None and metric in slopes and slopes[metric] > limit
+    ]
+
+
+async def _client(plugin, received: list):
+    """A websocket client that swallows every message"""
+
+    async def send_text(text: str):
+        received[0] += 1
+
+    await plugin.broadcaster.serve(send_text)
+
+
+async def _soak(
+    config: AppConfig,
+    duration: float,
+    sample_interval: float,
+    clients: int,
+    trace: bool,
+    top: int,
+    warmup: float,
+) -> Dict[str, Any]:
+    from sentinelowl.core.engine import SentinelOwl
+    from sentinelowl.moonraker_plugin import AIGuardPlugin
+
+    engine = SentinelOwl(config)
+    plugin = AIGuardPlugin(config, engine=engine)
+    monitor = asyncio.ensure_future(engine._monitor_loop())
+    received = [0]
+    samples: List[Dict[str, float]] = []
+    baseline = None
+    start = time.monotonic()
+    try:
+        while True:
+            # Reconnect the websocket clients every interval to churn the
+            # subscriber set, like browser tabs coming and going
+            connected = [
+                asyncio.ensure_future(_client(plugin, received)) for _ in range(clients)
+            ]
+            await asyncio.sleep(sample_interval)
+            for task in connected:
+                task.cancel()
+            await asyncio.gather(*connected, return_exceptions=True)
+            if monitor.done():
+                monitor.result()  # Re-raises a pipeline failure
+
+            gc.collect()  # Count only live objects, not pending garbage
+            elapsed = time.monotonic() - start
+            samples.append(
+                {
+                    "t": elapsed,
+                    "frames": engine.performance.total_frames,
+                    "rss_mb": _rss_mb(),
+                    "traced_mb": (
+                        tracemalloc.get_traced_memory()[0] / 1024 / 1024
+                        if trace
+                        else 0.0
+                    ),
+                    "fds": _open_fds(),
+                    "threads": threading.active_count(),
+                    "tasks": len(asyncio.all_tasks()),
+                    "clients": len(plugin.broadcaster.subscribers),
+                }
+            )
+            if trace and baseline is None and elapsed >= warmup:
+                baseline = tracemalloc.take_snapshot()
+            if elapsed >= duration:
+                break
+    finally:
+        monitor.cancel()
+        await asyncio.gather(monitor, return_exceptions=True)
+        engine._close_pipeline()
+        engine.history.close()
+
+    allocations = []
+    if baseline is not None:
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        growth = (
+            tracemalloc.take_snapshot()
+            .filter_traces(ignore)
+            .compare_to(baseline.filter_traces(ignore), "lineno")
+        )
+        allocations = [
+            {
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_diff_kb": stat.size_diff / 1024,
+                "count_diff": stat.count_diff,
+            }
+            for stat in growth[:top]
+            if stat.size_diff > 0
+        ]
+    return {"samples": samples, "top_allocations": allocations, "messages": received[0]}
+
+
+def run_soak(
+    source: str = "synthetic://640x480",
+    model: str = "placeholder",
+    duration: float = 1800.0,
+    rate: float = 20.0,
+    sample_interval: float = 10.0,
+    warmup: Optional[float] = None,
+    clients: int = 2,
+    threaded: bool = False,
+    trace: bool = True,
+    top: int = 10,
+    max_slopes: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """Drive the engine for ``duration`` seconds and report resource growth
+
+    Detections run at ``rate`` per second, far faster than a real print, so
+    hours of service are compressed into minutes. Every ``sample_interval``
+    the RSS, traced Python memory, open file descriptors, threads and
+    asyncio tasks are sampled; growth slopes are fitted on the samples
+    after ``warmup`` (default: the first fifth of the run).
+    """
+    if rate <= 0 or duration <= 0 or sample_interval <= 0:
+        raise ValueError("Soak rate, duration and sample interval must be positive")
+    warmup = duration / 5 if warmup is None else warmup
+    config = soak_config(source, model, rate, threaded)
+    tracing = trace and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    try:
+        result = asyncio.run(
+            _soak(config, duration, sample_interval, clients, trace, top, warmup)
+        )
+    finally:
+        if tracing:
+            tracemalloc.stop()
+
+    samples = result["samples"]
+    slopes = growth_slopes(samples, warmup)
+    elapsed = samples[-1]["t"] if samples else 0.0
+    frames = samples[-1]["frames"] if samples else 0
+    return {
+        "source": source,
+        "model": model,
+        "duration_s": elapsed,
+        "rate": rate,
+        "frames": frames,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "websocket_messages": result["messages"],
+        "peak_rss_mb": _peak_rss_mb(),
+        "samples": samples,
+        "slopes_per_hour": slopes,
+        "top_allocations": result["top_allocations"],
+        "failures": check_slopes(slopes, max_slopes),
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    """Print a soak report summary"""
+    print(f"🦉 Soak: {report['source']} → {report['model']}")
+    print(
+        f"   {report['frames']} frames in {report['duration_s']:.0f}s "
+        f"({report['fps']:.1f} FPS), {len(report['samples'])} samples, "
+        f"peak RSS {report['peak_rss_mb']:.1f} MB"
+    )
+    for metric, slope in report["slopes_per_hour"].items():
+        print(f"   {metric:<12}{slope:>+12.3f}/h")
+    if report["top_allocations"]:
+        print("   Top allocation growth:")
+    for allocation in report["top_allocations"]:
+        print(
+            f"   {allocation['size_diff_kb']:>10.1f} KB  "
+            f"{allocation['count_diff']:>+7}  {allocation['location']}"
+        )
+
+
+def main(
+    source: str = "synthetic://640x480",
+    model: str = "placeholder",
+    duration: float = 1800.0,
+    rate: float = 20.0,
+    sample_interval: float = 10.0,
+    clients: int = 2,
+    threaded: bool = False,
+    json_path: Optional[str] = None,
+    max_slopes: Optional[Dict[str, float]] = None,
+) -> bool:
+    """Run the soak, print/write the report and check growth budgets"""
+    report = run_soak(
+        source=source,
+        model=model,
+        duration=duration,
+        rate=rate,
+        sample_interval=sample_interval,
+        clients=clients,
+        threaded=threaded,
+        max_slopes=max_slopes,
+    )
+    print_report(report)
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(report, f, indent=2)
+    for failure in report["failures"]:
+        print(f"❌ Leak: {failure}")
+    return not report["failures"]
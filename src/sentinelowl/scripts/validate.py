@@ -3,6 +3,7 @@ import cv2
 import numpy as np
 import onnxruntime as ort
 from typing import Tuple, Dict, Any
+from sentinelowl.core.preprocess import Preprocessor
 
 
 def load_model(model_path: str) -> ort.InferenceSession:
@@ -23,7 +24,11 @@ def get_model_metadata(model: ort.InferenceSession) -> Dict[str, Any]:
 
 
 def preprocess_frame(frame: np.ndarray, model_metadata: Dict[str, Any]) -> np.ndarray:
-    """Dynamic preprocessing based on model input"""
+    """Dynamic preprocessing based on model input
+
+    Allocates several full-frame temporaries per call; kept as the reference
+    implementation for ``Preprocessor``, which the validation flow uses.
+    """
     input_shape = model_metadata["shape"]
     _, c, h, w = input_shape  # 假设输入形状为 [batch, channel, height, width]
 
@@ -89,7 +94,8 @@ def main(camera_url: str, model_path: str):
             return
 
         # 动态预处理
-        processed_frame = preprocess_frame(frame, model_metadata)
+        preprocessor = Preprocessor.from_metadata(model_metadata)
+        processed_frame = preprocessor(frame)
         print(f"Processed frame shape: {processed_frame.shape}")
 
         # 推理
@@ -0,0 +1,257 @@
+import json
+import asyncio
+import itertools
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+from tornado.websocket import WebSocketClientConnection, websocket_connect
+from ..utils.backoff import backoff_delay
+
+PRIORITY_EMERGENCY = 0  # Jumps ahead of everything already queued
+PRIORITY_NORMAL = 10
+
+
+class MoonrakerError(Exception):
+    """Moonraker rejected a request or could not be reached"""
+
+
+class MoonrakerClient:
+    """Asyncio JSON-RPC client for Moonraker over one persistent websocket
+
+    ``start()`` launches a background task that keeps the websocket open,
+    reconnecting with exponential backoff. Requests are written by a single
+    writer from a priority queue and matched to responses by id, so several
+    can be in flight at once and an emergency ``PAUSE`` overtakes anything
+    still queued. When the socket is down, or drops a request before it was
+    written, the call falls back to Moonraker's HTTP API. A request that was
+    written is never sent again, since it may already have run and G-code
+    such as ``PAUSE`` is not idempotent; it fails with ``MoonrakerError``.
+
+    Server notifications (e.g. ``notify_status_update``) are passed to the
+    callbacks registered with ``add_listener()``; ``add_connect_callback()``
+    coroutines run after every (re)connect, which is where subscriptions
+    are (re)issued.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 7125,
+        api_key: Optional[str] = None,
+        timeout: float = 5.0,
+        reconnect_interval: float = 1.0,
+        reconnect_max_interval: float = 30.0,
+        reconnect_jitter: float = 0.2,
+    ):
+        self.base_url = f"http://{host}:{port}"
+        self.ws_url = f"ws://{host}:{port}/websocket"
+        self.headers = {"X-Api-Key": api_key} if api_key else {}
+        self.timeout = timeout
+        self.reconnect_interval = reconnect_interval
+        self.reconnect_max_interval = reconnect_max_interval
+        self.reconnect_jitter = reconnect_jitter
+        self.http_fallbacks = 0  # Requests that went over HTTP
+
+        self._ids = itertools.count(1)
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._sent: Set[int] = set()  # Pending requests handed to the socket
+        self._connection: Optional[WebSocketClientConnection] = None
+        self._connected: Optional[asyncio.Event] = None
+        self._tasks = []
+        self._listeners: Dict[str, List[Callable[[list], None]]] = {}
+        self._connect_callbacks: List[Callable[[], Awaitable[None]]] = []
+
+    @classmethod
+    def from_config(cls, config) -> "MoonrakerClient":
+        """Build a client from a PrinterConfig"""
+        return cls(
+            host=config.host,
+            port=config.port,
+            api_key=config.api_key,
+            timeout=config.timeout,
+            reconnect_interval=config.reconnect_interval,
+            reconnect_max_interval=config.reconnect_max_interval,
+        )
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None
+
+    async def start(self):
+        """Start the connection manager and writer tasks"""
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._connected = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._tasks = [
+            loop.create_task(self._maintain_connection()),
+            loop.create_task(self._write_loop()),
+        ]
+
+    def add_listener(self, method: str, callback: Callable[[list], None]):
+        """Call ``callback(params)`` for every ``method`` notification"""
+        self._listeners.setdefault(method, []).append(callback)
+
+    def add_connect_callback(self, callback: Callable[[], Awaitable[None]]):
+        """Run ``await callback()`` after each websocket (re)connect"""
+        self._connect_callbacks.append(callback)
+
+    async def wait_connected(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the websocket is open; return False on timeout"""
+        if self._connected is None:
+            return False
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def close(self):
+        """Stop background tasks and close the websocket"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._drop_connection(MoonrakerError("Client closed"))
+
+    async def call(
+        self,
+        method: str,
+        params: Optional[Dict[str, Any]] = None,
+        priority: int = PRIORITY_NORMAL,
+    ) -> Any:
+        """Send a JSON-RPC request and return its result"""
+        if self.connected:
+            request_id = next(self._ids)
+            future = asyncio.get_running_loop().create_future()
+            self._pending[request_id] = future
+            message = {"jsonrpc": "2.0", "method": method, "id": request_id}
+            if params:
+                message["params"] = params
+            await self._queue.put((priority, request_id, json.dumps(message)))
+            try:
+                return await asyncio.wait_for(future, self.timeout)
+            except (ConnectionError, asyncio.TimeoutError) as e:
+                if request_id in self._sent:
+                    raise MoonrakerError(
+                        f"Moonraker request {method} failed after it was sent: {e!r}"
+                    ) from e
+                print(f"⚠️ Moonraker websocket request failed ({e!r}), using HTTP")
+            finally:
+                self._pending.pop(request_id, None)
+                self._sent.discard(request_id)
+        return await self._call_http(method, params)
+
+    async def send_gcode(self, script: str, priority: int = PRIORITY_NORMAL) -> Any:
+        """Run a G-code script on the printer"""
+        return await self.call(
+            "printer.gcode.script", {"script": script}, priority=priority
+        )
+
+    async def emergency_pause(self) -> Any:
+        """Send ``PAUSE`` ahead of every other queued request"""
+        return await self.send_gcode("PAUSE", priority=PRIORITY_EMERGENCY)
+
+    async def _call_http(self, method: str, params: Optional[Dict[str, Any]]) -> Any:
+        """Same request through the HTTP API (``printer.gcode.script`` → POST)"""
+        self.http_fallbacks += 1
+        request = HTTPRequest(
+            f"{self.base_url}/{method.replace('.', '/')}",
+            method="POST",
+            headers={"Content-Type": "application/json", **self.headers},
+            body=json.dumps(params or {}),
+            connect_timeout=self.timeout,
+            request_timeout=self.timeout,
+        )
+        try:
+            response = await AsyncHTTPClient().fetch(request)
+        except Exception as e:
+            raise MoonrakerError(f"Moonraker request {method} failed: {e}") from e
+        return json.loads(response.body).get("result")
+
+    async def _maintain_connection(self):
+        """Keep the websocket open and dispatch responses until cancelled"""
+        attempt = 0
+        while True:
+            try:
+                request = HTTPRequest(
+                    self.ws_url, headers=self.headers, connect_timeout=self.timeout
+                )
+                self._connection = await websocket_connect(request)
+                self._connected.set()
+                attempt = 0
+                print(f"🟢 Moonraker connected: {self.ws_url}")
+                for callback in self._connect_callbacks:
+                    asyncio.get_running_loop().create_task(
+                        self._run_connect_callback(callback)
+                    )
+                await self._read_loop(self._connection)
+                error: Exception = ConnectionError("Moonraker websocket closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = ConnectionError(f"Moonraker websocket failed: {e}")
+            self._drop_connection(error)
+            await asyncio.sleep(
+                backoff_delay(
+                    attempt,
+                    self.reconnect_interval,
+                    self.reconnect_max_interval,
+                    self.reconnect_jitter,
+                )
+            )
+            attempt += 1
+
+    @staticmethod
+    async def _run_connect_callback(callback: Callable[[], Awaitable[None]]):
+        try:
+            await callback()
+        except Exception as e:
+            print(f"⚠️ Moonraker connect callback failed: {e}")
+
+    async def _read_loop(self, connection: WebSocketClientConnection):
+        while True:
+            text = await connection.read_message()
+            if text is None:
+                return
+            message = json.loads(text)
+            if "id" not in message:
+                for callback in self._listeners.get(message.get("method"), ()):
+                    callback(message.get("params", []))
+                continue
+            future = self._pending.get(message["id"])
+            if future is None or future.done():
+                continue  # Notification or a request that already gave up
+            if "error" in message:
+                error = message["error"]
+                future.set_exception(MoonrakerError(error.get("message", str(error))))
+            else:
+                future.set_result(message.get("result"))
+
+    async def _write_loop(self):
+        while True:
+            _, request_id, text = await self._queue.get()
+            future = self._pending.get(request_id)
+            if future is None or future.done():
+                continue
+            connection = self._connection
+            if connection is None:
+                future.set_exception(ConnectionError("Moonraker websocket closed"))
+                continue
+            self._sent.add(request_id)  # A failed write may still have gone out
+            try:
+                await connection.write_message(text)
+            except Exception as e:
+                future.set_exception(ConnectionError(str(e)))
+
+    def _drop_connection(self, error: Exception):
+        """Close the socket and fail in-flight requests so they fall back"""
+        if self._connected is not None:
+            self._connected.clear()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
@@ -1,20 +1,152 @@
-from moonraker import MoonrakerAPI
+import time
+import asyncio
+from typing import Any, Callable, Dict, Optional
+from .moonraker_client import MoonrakerClient
+
+# print_stats.state values during which a job is running
+ACTIVE_PRINT_STATES = ("printing",)
 
 
 class PrinterController:
-    """Wrapper for printer control commands"""
+    """Wrapper for printer control commands
+
+    Commands go through a persistent ``MoonrakerClient``. Emergency stops
+    are timed from the critical detection to Moonraker accepting ``PAUSE``
+    and recorded as the ``estop`` stage of the performance monitor;
+    ``estop_accepted`` stays set until ``clear_emergency_stop()``.
+
+    ``watch_print_state()`` subscribes to ``print_stats`` and reports job
+    state and layer changes as they arrive. It also follows
+    ``virtual_sdcard.is_active``, so a job starting or ending is picked up
+    even from updates that carry no ``print_stats`` state; such a change is
+    reported as "printing" or "standby".
+    """
+
+    def __init__(self, client: Optional[MoonrakerClient] = None, performance=None):
+        self.client = client or MoonrakerClient()
+        self.performance = performance
+        self.last_estop_latency: Optional[float] = None
+        self.estop_accepted = False  # Moonraker accepted PAUSE for this alarm
+        self._estop_task: Optional[asyncio.Task] = None
+        self.print_state: Optional[str] = None  # None until Moonraker reports one
+        self.current_layer: Optional[int] = None
+        self.sdcard_active: Optional[bool] = None  # virtual_sdcard.is_active
+        self._on_state: Optional[Callable[[str], None]] = None
+        self._on_layer: Optional[Callable[[int], None]] = None
 
-    def __init__(self, host="localhost", port=7125):
-        self.api = MoonrakerAPI(f"http://{host}:{port}")
+    @classmethod
+    def from_config(cls, config, performance=None) -> "PrinterController":
+        """Build a controller from a PrinterConfig"""
+        return cls(MoonrakerClient.from_config(config), performance=performance)
 
-    def pause_print(self):
+    async def start(self):
+        """Open the persistent Moonraker connection"""
+        await self.client.start()
+
+    async def close(self):
+        await self.client.close()
+
+    async def pause_print(self):
         """Pause current print job"""
-        return self.api.send_gcode("PAUSE")
+        return await self.client.send_gcode("PAUSE")
 
-    def resume_print(self):
+    async def resume_print(self):
         """Resume paused print job"""
-        return self.api.send_gcode("RESUME")
+        return await self.client.send_gcode("RESUME")
 
-    def get_print_status(self) -> Dict[str, Any]:
+    async def get_print_status(self) -> Dict[str, Any]:
         """Get current print status"""
-        return self.api.get("printer/objects/query?print_stats")
+        result = await self.client.call(
+            "printer.objects.query", {"objects": {"print_stats": None}}
+        )
+        return result["status"]["print_stats"]
+
+    def watch_print_state(
+        self,
+        on_state: Callable[[str], None],
+        on_layer: Optional[Callable[[int], None]] = None,
+    ):
+        """Subscribe to print_stats and call back on state and layer changes"""
+        self._on_state = on_state
+        self._on_layer = on_layer
+        self.client.add_listener("notify_status_update", self._on_status_update)
+        self.client.add_connect_callback(self._subscribe)
+        if self.client.connected:
+            asyncio.get_running_loop().create_task(self._subscribe())
+
+    async def _subscribe(self):
+        result = await self.client.call(
+            "printer.objects.subscribe",
+            {
+                "objects": {
+                    "print_stats": ["state", "info"],
+                    "virtual_sdcard": ["is_active"],
+                }
+            },
+        )
+        self._update_status(result.get("status", {}))
+
+    def _on_status_update(self, params: list):
+        if params:
+            self._update_status(params[0])
+
+    def _update_status(self, status: Dict[str, Any]):
+        """Merge a (partial) status update and fire the callbacks"""
+        print_stats = status.get("print_stats") or {}
+        state = print_stats.get("state")
+        active = (status.get("virtual_sdcard") or {}).get("is_active")
+        if active is not None and active != self.sdcard_active:
+            self.sdcard_active = active
+            running = self.print_state in ACTIVE_PRINT_STATES
+            if state is None and active != running:
+                state = "printing" if active else "standby"
+        if state is not None and state != self.print_state:
+            self.print_state = state
+            print(f"🖨️ Print state: {state}")
+            if self._on_state is not None:
+                self._on_state(state)
+        layer = (print_stats.get("info") or {}).get("current_layer")
+        if layer is not None and layer != self.current_layer:
+            self.current_layer = layer
+            if self._on_layer is not None:
+                self._on_layer(layer)
+
+    async def emergency_stop(self, detected_at: Optional[float] = None):
+        """Send a priority ``PAUSE`` and record the latency since detection"""
+        detected_at = time.perf_counter() if detected_at is None else detected_at
+        result = await self.client.emergency_pause()
+        self.estop_accepted = True
+        self.last_estop_latency = time.perf_counter() - detected_at
+        if self.performance is not None:
+            self.performance.record_stage("estop", self.last_estop_latency)
+        print(f"🛑 Print paused in {self.last_estop_latency * 1000:.1f} ms")
+        return result
+
+    @property
+    def estop_in_flight(self) -> bool:
+        """Whether an emergency stop is waiting for Moonraker"""
+        return self._estop_task is not None and not self._estop_task.done()
+
+    def clear_emergency_stop(self):
+        """Forget an accepted ``PAUSE`` once the alarm is over"""
+        self.estop_accepted = False
+
+    def schedule_emergency_stop(
+        self, detected_at: Optional[float] = None
+    ) -> Optional[asyncio.Task]:
+        """Start ``emergency_stop()`` on the running loop unless one is in flight"""
+        if self._estop_task is not None and not self._estop_task.done():
+            return self._estop_task
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            print("⚠️ No event loop running, cannot pause the printer")
+            return None
+        self._estop_task = loop.create_task(self.emergency_stop(detected_at))
+        self._estop_task.add_done_callback(self._report_failure)
+        return self._estop_task
+
+    @staticmethod
+    def _report_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ Emergency stop failed: {task.exception()}")
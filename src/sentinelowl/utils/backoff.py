@@ -0,0 +1,14 @@
+import random
+
+
+def backoff_delay(
+    attempt: int, base: float, maximum: float, jitter: float = 0.0
+) -> float:
+    """Exponential backoff delay for retry ``attempt`` (0-based)
+
+    The delay doubles from ``base`` up to ``maximum`` and is scaled by a
+    random factor in ``[1 - jitter, 1 + jitter]`` so that many clients
+    reconnecting to the same host do not retry in lockstep.
+    """
+    delay = min(base * (2**attempt), maximum)
+    return max(0.0, delay * (1.0 + random.uniform(-jitter, jitter)))
@@ -0,0 +1,109 @@
+import json
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set
+
+
+class Subscriber:
+    """Per-client mailbox: the latest status plus a bounded event queue
+
+    Status snapshots coalesce, so a slow client only ever sees the newest
+    one. Events (e.g. critical alerts) are queued up to ``max_events``,
+    dropping the oldest on overflow, and are delivered before any status.
+    """
+
+    def __init__(self, max_events: int = 16):
+        self.events: Deque[str] = deque(maxlen=max_events)
+        self.status: Optional[str] = None
+        self.dropped = 0  # Statuses and events replaced before being sent
+        self._ready = asyncio.Event()
+
+    def offer_status(self, text: str):
+        if self.status is not None:
+            self.dropped += 1
+        self.status = text
+        self._ready.set()
+
+    def offer_event(self, text: str):
+        if len(self.events) == self.events.maxlen:
+            self.dropped += 1
+        self.events.append(text)
+        self._ready.set()
+
+    async def get(self) -> str:
+        """Wait for the next message, events first"""
+        while True:
+            if self.events:
+                return self.events.popleft()
+            if self.status is not None:
+                text, self.status = self.status, None
+                return text
+            self._ready.clear()
+            await self._ready.wait()
+
+
+class StatusBroadcaster:
+    """Single publisher fanning status snapshots out to websocket clients
+
+    One task calls ``producer`` every ``interval`` seconds while clients are
+    connected, serializes the snapshot once and offers the text to every
+    subscriber. ``publish_event()`` bypasses the tick and reaches every
+    mailbox immediately. Each client is drained by its own sender, so one
+    slow connection never delays the others.
+    """
+
+    def __init__(
+        self,
+        producer: Callable[[], Awaitable[Dict[str, Any]]],
+        interval: float = 1.0,
+        max_events: int = 16,
+    ):
+        self.producer = producer
+        self.interval = interval
+        self.max_events = max_events
+        self.subscribers: Set[Subscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> Subscriber:
+        """Register a client and start the publisher if needed"""
+        subscriber = Subscriber(self.max_events)
+        self.subscribers.add(subscriber)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        """Remove a client; the publisher stops with the last one"""
+        self.subscribers.discard(subscriber)
+        if not self.subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def publish_status(self, message: Dict[str, Any]):
+        """Offer a status snapshot to every client, replacing unsent ones"""
+        text = json.dumps(message)
+        for subscriber in tuple(self.subscribers):
+            subscriber.offer_status(text)
+
+    def publish_event(self, message: Dict[str, Any]):
+        """Push an event to every client without waiting for the next tick"""
+        text = json.dumps(message)
+        for subscriber in tuple(self.subscribers):
+            subscriber.offer_event(text)
+
+    async def serve(self, send_text: Callable[[str], Awaitable[None]]):
+        """Forward messages to one client until sending fails or is cancelled"""
+        subscriber = self.subscribe()
+        try:
+            while True:
+                await send_text(await subscriber.get())
+        finally:
+            self.unsubscribe(subscriber)
+
+    async def _run(self):
+        while self.subscribers:
+            try:
+                self.publish_status(await self.producer())
+            except Exception as e:
+                print(f"⚠️ Status snapshot failed: {e}")
+            await asyncio.sleep(self.interval)
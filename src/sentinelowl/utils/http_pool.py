@@ -0,0 +1,115 @@
+import threading
+import http.client
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class HTTPResult(NamedTuple):
+    """Fully read HTTP response"""
+
+    status: int
+    headers: Dict[str, str]  # Lower-cased header names
+    body: bytes
+
+
+class HTTPConnectionPool:
+    """Thread-safe pool of persistent (keep-alive) HTTP connections
+
+    Idle connections are kept per (scheme, host, port) and reused for the
+    next request to the same origin, so polling a camera does not pay for a
+    new TCP handshake on every frame. A request that fails on a reused
+    connection (the server may have closed it while idle) is retried once on
+    a fresh one.
+    """
+
+    def __init__(self, max_idle_per_host: int = 4):
+        self.max_idle_per_host = max_idle_per_host
+        self.connections_created = 0
+        self._idle: Dict[Tuple[str, str, int], List] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _origin(url: str) -> Tuple[Tuple[str, str, int], str]:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        return (parts.scheme, parts.hostname, port), path
+
+    def _acquire(self, origin, timeout: float):
+        with self._lock:
+            idle = self._idle[origin]
+            if idle:
+                connection = idle.pop()
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                return connection, True
+
+        scheme, host, port = origin
+        connection_class = (
+            http.client.HTTPSConnection
+            if scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self.connections_created += 1
+        return connection_class(host, port, timeout=timeout), False
+
+    def _release(self, origin, connection):
+        with self._lock:
+            idle = self._idle[origin]
+            if len(idle) < self.max_idle_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def request(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 10.0,
+        method: str = "GET",
+    ) -> HTTPResult:
+        """Send a request over a pooled connection and read the full body"""
+        origin, path = self._origin(url)
+        for attempt in range(2):
+            connection, reused = self._acquire(origin, timeout)
+            try:
+                connection.request(method, path, headers=headers or {})
+                response = connection.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                if reused and attempt == 0:
+                    continue  # Stale keep-alive connection; retry on a new one
+                raise
+
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(origin, connection)
+            result_headers = {k.lower(): v for k, v in response.getheaders()}
+            return HTTPResult(response.status, result_headers, body)
+
+    def close(self):
+        """Close all idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, defaultdict(list)
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+
+_shared_pool: Optional[HTTPConnectionPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def shared_pool() -> HTTPConnectionPool:
+    """Process-wide connection pool shared by all printers"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = HTTPConnectionPool()
+        return _shared_pool
@@ -0,0 +1,77 @@
+import json
+import time
+import cv2
+import numpy as np
+from click.testing import CliRunner
+from sentinelowl.cli import cli
+from sentinelowl.core.sources import SyntheticSource
+from sentinelowl.scripts.bench import check_thresholds, run_benchmark
+
+
+def test_synthetic_source_frames():
+    """Test the synthetic source yields moving frames of the requested size"""
+    source = SyntheticSource.from_url("synthetic://64x48")
+    ok, first = source.read()
+    ok2, second = source.read()
+    assert ok and ok2
+    assert first.shape == (48, 64, 3)
+    assert not (first == second).all()
+    source.release()
+    assert source.read() == (False, None)
+
+
+def test_run_benchmark_report():
+    """Test the benchmark reports throughput and per-stage percentiles"""
+    report = run_benchmark(source="synthetic://320x240", frames=20, warmup=2)
+    assert report["frames"] == 20
+    assert report["fps"] > 0
+    assert report["peak_rss_mb"] > 0
+    for stage in ("capture", "preprocess", "inference", "action"):
+        assert set(report["stages_ms"][stage]) == {"p50", "p95", "p99"}
+
+
+def test_check_thresholds():
+    """Test regressions are reported against the thresholds"""
+    report = {
+        "fps": 10.0,
+        "peak_rss_mb": 100.0,
+        "stages_ms": {"inference": {"p50": 1.0, "p95": 5.0, "p99": 9.0}},
+    }
+    assert check_thresholds(report, min_fps=5, max_p95_ms=10, max_rss_mb=200) == []
+    failures = check_thresholds(report, min_fps=20, max_p95_ms=1, max_rss_mb=50)
+    assert len(failures) == 3
+
+
+def test_bench_command_fails_on_regression(tmp_path):
+    """Test the bench command writes JSON and exits non-zero on regression"""
+    json_path = tmp_path / "bench.json"
+    result = CliRunner().invoke(
+        cli,
+        [
+            "bench",
+            "--source",
+            "synthetic://160x120",
+            "--frames",
+            "5",
+            "--json",
+            str(json_path),
+            "--min-fps",
+            "1e9",
+        ],
+    )
+    assert result.exit_code == 1
+    assert json.loads(json_path.read_text())["failures"]
+
+
+def test_run_benchmark_loops_short_video(tmp_path):
+    """Test a video shorter than --frames is replayed instead of reconnecting"""
+    video = tmp_path / "clip.avi"
+    writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for i in range(5):
+        writer.write(np.full((48, 64, 3), i * 40, dtype=np.uint8))
+    writer.release()
+
+    start = time.monotonic()
+    report = run_benchmark(source=str(video), frames=12, warmup=2)
+    assert report["frames"] == 12
+    assert time.monotonic() - start < 5  # No reconnect sleeps
@@ -0,0 +1,59 @@
+import json
+import asyncio
+from sentinelowl.utils.broadcast import StatusBroadcaster, Subscriber
+
+
+def test_subscriber_coalesces_status_and_prioritizes_events():
+    """Test slow clients only get the newest status, after pending events"""
+
+    async def scenario():
+        subscriber = Subscriber(max_events=2)
+        subscriber.offer_status("s1")
+        subscriber.offer_status("s2")
+        for event in ("e1", "e2", "e3"):
+            subscriber.offer_event(event)
+        received = [await subscriber.get() for _ in range(3)]
+        return received, subscriber.dropped
+
+    received, dropped = asyncio.run(scenario())
+    assert received == ["e2", "e3", "s2"]
+    assert dropped == 2
+
+
+def test_broadcaster_fans_out_once_and_isolates_slow_clients():
+    """Test one snapshot per tick reaches fast clients while one is stalled"""
+    calls = []
+
+    async def producer():
+        calls.append(1)
+        return {"tick": len(calls)}
+
+    async def scenario():
+        broadcaster = StatusBroadcaster(producer, interval=0.01)
+        fast, stalled = [], asyncio.Event()
+
+        async def fast_send(text):
+            fast.append(json.loads(text))
+
+        async def slow_send(text):
+            await stalled.wait()
+
+        tasks = [
+            asyncio.create_task(broadcaster.serve(fast_send)),
+            asyncio.create_task(broadcaster.serve(slow_send)),
+        ]
+        await asyncio.sleep(0.1)
+        broadcaster.publish_event({"event": "critical"})
+        await asyncio.sleep(0.01)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return broadcaster, fast
+
+    broadcaster, fast = asyncio.run(scenario())
+    assert len(fast) >= 3
+    assert {"event": "critical"} in fast
+    ticks = [m["tick"] for m in fast if "tick" in m]
+    assert ticks == sorted(set(ticks))  # One snapshot per tick, in order
+    assert len(calls) <= ticks[-1] + 1  # Not computed once per client
+    assert not broadcaster.subscribers
@@ -1,3 +1,6 @@
+import time
+import cv2
+import numpy as np
 import pytest
 from sentinelowl.config import CameraConfig
 from sentinelowl.core.camera import CameraHandler, CameraConnectionError
@@ -11,3 +14,57 @@ def test_camera_reconnect_failure():
     with pytest.raises(CameraConnectionError):
         for _ in range(5):  # 超过最大重试次数
             camera.capture_frame()
+
+
+def _write_video(path, frames=30, size=(64, 48)):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 30, size)
+    for i in range(frames):
+        writer.write(np.full((size[1], size[0], 3), i * 8, dtype=np.uint8))
+    writer.release()
+
+
+def test_threaded_capture_latest_frame(tmp_path):
+    """Test the reader thread publishes frames into the latest-frame slot"""
+    video = tmp_path / "clip.avi"
+    _write_video(video)
+    config = CameraConfig(url=str(video), threaded=True, reconnect_interval=0)
+    camera = CameraHandler(config)
+    try:
+        first = camera.wait_frame(timeout=5)
+        assert first is not None
+        assert first.image.shape == (48, 64, 3)
+
+        newer = camera.wait_frame(after_sequence=first.sequence, timeout=5)
+        assert newer is None or newer.sequence > first.sequence
+        assert camera.capture_frame() is not None
+    finally:
+        camera.release()
+
+
+def test_threaded_capture_does_not_block():
+    """Test threaded mode keeps retrying in the background without raising"""
+    config = CameraConfig(url="invalid_url", threaded=True, reconnect_interval=0)
+    camera = CameraHandler(config)
+    try:
+        start = time.monotonic()
+        for _ in range(5):
+            assert camera.capture_frame() is None
+        assert time.monotonic() - start < 0.5
+    finally:
+        camera.release()
+
+
+def test_reader_backoff_has_floor_and_ceiling():
+    """Test reconnect delays never reach zero and the attempt count stops growing"""
+    config = CameraConfig(
+        url="invalid_url",
+        threaded=True,
+        reconnect_interval=0,
+        reconnect_max_interval=1.0,
+    )
+    camera = CameraHandler(config)
+    try:
+        assert camera._backoff_delay(0) >= 0.1
+        assert camera._backoff_delay(1000) <= 1.0 * (1 + config.reconnect_jitter)
+    finally:
+        camera.release()
@@ -1,4 +1,8 @@
 # tests/test_core.py
+import os
+import json
+import asyncio
+import numpy as np
 from sentinelowl.core.engine import SentinelOwl
 from sentinelowl.config import AppConfig, DetectionConfig
 from sentinelowl.core.detector import DefectDetector, DetectionResult
@@ -49,3 +53,133 @@ def test_detector_analysis():
     result = detector.analyze(None)  # Pass None as a mock frame
     assert isinstance(result, DetectionResult)
     assert 0.0 <= result.confidence <= 1.0
+
+
+def test_monitoring_follows_print_state():
+    """Test the camera and model are released between print jobs"""
+    config = AppConfig(
+        camera={"url": "synthetic://64x48", "type": "synthetic"},
+        detection={"interval": 0, "min_interval": 0.01},
+    )
+    owl = SentinelOwl(config)
+
+    async def scenario():
+        monitor = asyncio.create_task(owl._monitor_loop())
+        await asyncio.sleep(0.1)
+        owl.on_print_state("standby")
+        await asyncio.sleep(0.1)
+        suspended = (owl.camera, owl.detector, owl.performance.total_frames)
+        await asyncio.sleep(0.1)
+        idle_frames = owl.performance.total_frames
+        owl.on_print_state("printing")
+        await asyncio.sleep(0.1)
+        monitor.cancel()
+        return suspended, idle_frames
+
+    (camera, detector, frames), idle_frames = asyncio.run(scenario())
+    assert camera is None and detector is None
+    assert frames > 0 and idle_frames == frames
+    assert owl.performance.total_frames > idle_frames
+    assert owl.is_active
+
+
+def test_critical_result_dumps_evidence_clip(tmp_path):
+    """Test entering the critical state dumps the recent frames to a clip"""
+    config = AppConfig(
+        evidence={
+            "enabled": True,
+            "path": str(tmp_path / "frames.ring"),
+            "capacity": 4,
+            "slot_bytes": 64 * 48 * 3,
+            "clip_dir": str(tmp_path / "clips"),
+        }
+    )
+    owl = SentinelOwl(config)
+    owl.evidence.append(np.zeros((48, 64, 3), dtype=np.uint8))
+    for _ in range(4):  # The smoothed score needs a few frames to turn critical
+        owl._handle_result(DetectionResult(0.95, True, True))
+    assert owl.get_alarm_state() == "critical"
+    assert owl.last_clip is not None and os.path.exists(owl.last_clip)
+
+
+def test_evidence_dump_failures_are_reported(tmp_path, capsys):
+    """Test a failing clip dump is logged and awaited before the ring closes"""
+    config = AppConfig(
+        evidence={
+            "enabled": True,
+            "path": str(tmp_path / "frames.ring"),
+            "clip_dir": str(tmp_path / "clips"),
+        }
+    )
+    owl = SentinelOwl(config)
+
+    def broken_dump(clip_path, fps):
+        raise OSError("disk full")
+
+    async def scenario():
+        owl.evidence.dump = broken_dump
+        owl._dump_evidence("critical")
+        assert len(owl._dumps) == 1
+        await asyncio.gather(*owl._dumps, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert owl._dumps == set()
+    assert "Evidence clip failed: disk full" in capsys.readouterr().out
+    owl.evidence.close()
+
+
+def test_alarm_events_reach_websocket_clients_at_once():
+    """Test a critical result is pushed to clients without waiting for a tick"""
+    from sentinelowl.moonraker_plugin import AIGuardPlugin
+
+    owl = SentinelOwl(
+        AppConfig(detection={"smoothing": 1.0}, printer={"port": 9, "timeout": 0.1})
+    )
+    plugin = AIGuardPlugin(owl.config, engine=owl)
+    plugin.broadcaster.interval = 3600  # Only the first status tick
+
+    async def scenario():
+        received = []
+
+        async def send_text(text):
+            received.append(json.loads(text))
+
+        client = asyncio.create_task(plugin.broadcaster.serve(send_text))
+        await asyncio.sleep(0.05)  # First status snapshot
+        owl._handle_result(DetectionResult(0.95, True, True))
+        await asyncio.sleep(0.05)
+        client.cancel()
+        await asyncio.gather(client, return_exceptions=True)
+        if owl.printer._estop_task is not None:
+            owl.printer._estop_task.cancel()
+        await owl.printer.close()
+        return received
+
+    received = asyncio.run(scenario())
+    events = [message for message in received if "event" in message]
+    assert [event["event"] for event in events] == ["critical", "estop"]
+    assert events[0]["confidence"] == 0.95 and events[0]["printer"] == "default"
+    assert len(received) == 3  # Status, then both events before any new tick
+
+
+def test_model_calibrates_onto_the_alarm_thresholds(tmp_path):
+    """Test a class over its critical threshold raises a critical alarm"""
+    from tests.test_models import _yolo_head_model
+
+    config = AppConfig(
+        model={
+            "type": "yolo",
+            "path": _yolo_head_model(tmp_path),
+            "class_names": ["spaghetti", "blob"],
+            "class_thresholds": {"blob": (0.5, 0.6)},  # The blob box scores 0.65
+        },
+        detection={"warning_threshold": 0.5, "critical_threshold": 0.9, "smoothing": 1},
+    )
+    owl = SentinelOwl(config)
+    assert owl.detector.model.critical_threshold == 0.9
+    result = owl.detector.analyze(np.zeros((32, 32, 3), dtype=np.uint8))
+    assert result.is_critical
+    owl._handle_result(result)
+    assert owl.get_alarm_state() == "critical"
+    owl._close_pipeline()
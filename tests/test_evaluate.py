@@ -0,0 +1,173 @@
+import json
+import cv2
+import numpy as np
+import pytest
+from click.testing import CliRunner
+from sentinelowl.cli import cli
+from sentinelowl.config import ModelConfig
+from sentinelowl.scripts.evaluate import (
+    SweepCounts,
+    evaluate,
+    find_sources,
+    iter_chunks,
+    model_config,
+    suggest_thresholds,
+    sweep_thresholds,
+)
+from tests.test_models import MNIST_MODEL
+
+
+@pytest.fixture
+def footage(tmp_path):
+    """A 20-frame video and a 5-image timelapse, plus labels for the video"""
+    root = tmp_path / "footage"
+    (root / "timelapse").mkdir(parents=True)
+    writer = cv2.VideoWriter(
+        str(root / "print.avi"), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48)
+    )
+    for i in range(20):
+        writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+    writer.release()
+    for i in range(5):
+        cv2.imwrite(str(root / "timelapse" / f"{i:03d}.png"), np.zeros((48, 64, 3)))
+    labels = tmp_path / "labels.csv"
+    labels.write_text("source,onset_frame\nprint.avi,12\ntimelapse,\n")
+    return str(root), str(labels)
+
+
+def test_iter_chunks_streams_batches_in_order(footage):
+    """Test frames are decoded in bounded batches across worker processes"""
+    root, _ = footage
+    sources = find_sources(root)
+    assert [(s.name, s.kind) for s in sources] == [
+        ("print.avi", "video"),
+        ("timelapse", "images"),
+    ]
+    chunks = list(
+        iter_chunks(sources, (1, 3, 8, 8), np.float32, batch_size=8, workers=2)
+    )
+    assert [len(c.frames) for c in chunks] == [8, 8, 4, 5]
+    assert list(np.concatenate([c.frames for c in chunks[:3]])) == list(range(20))
+    assert chunks[0].tensors.shape == (8, 3, 8, 8)
+
+
+@pytest.mark.parametrize("frame_count", [0, -1])
+def test_iter_chunks_reads_videos_of_unknown_length(footage, frame_count):
+    """Test a video without a usable frame count is decoded to the end"""
+    root, _ = footage
+    video = find_sources(root)[0]._replace(frame_count=frame_count)
+    for workers in (0, 2):
+        chunks = list(
+            iter_chunks(
+                [video],
+                (1, 3, 8, 8),
+                np.float32,
+                batch_size=8,
+                stride=3,
+                workers=workers,
+            )
+        )
+        assert [len(c.frames) for c in chunks] == [7]
+        assert list(chunks[0].frames) == list(range(0, 20, 3))
+
+
+def test_sweep_precision_recall_and_delay():
+    """Test the threshold sweep against a known onset"""
+    frames = {"a": np.arange(10), "b": np.arange(10)}
+    scores = {
+        "a": np.array([0.1] * 5 + [0.6, 0.9, 0.9, 0.9, 0.9], dtype=np.float32),
+        "b": np.array([0.1] * 9 + [0.6], dtype=np.float32),
+    }
+    sweep = sweep_thresholds(
+        scores, frames, {"a": 5}, {"a": 2.0, "b": 2.0}, np.array([0.5, 0.8])
+    )
+    low, high = sweep
+    assert low["recall"] == 1.0 and low["precision"] == 5 / 6
+    assert low["mean_delay_s"] == 0.0 and low["false_alarm_sources"] == 1
+    assert high["precision"] == 1.0 and high["mean_delay_s"] == 0.5
+    assert suggest_thresholds(sweep, critical_precision=0.95) == {
+        "warning_threshold": 0.5,
+        "critical_threshold": 0.8,
+    }
+
+
+def test_sweep_counts_stream_chunks():
+    """Test chunk-by-chunk counts match a sweep over the whole scores"""
+    rng = np.random.default_rng(0)
+    frames = {"a": np.arange(0, 40, 2), "b": np.arange(20), "c": np.arange(0)}
+    scores = {name: rng.random(len(f)).astype(np.float32) for name, f in frames.items()}
+    labels = {"a": 10, "c": 3}
+    fps = {"a": 5.0, "b": 1.0, "c": 1.0}
+    thresholds = np.array([0.2, 0.5, 0.8, 0.99])
+
+    counts = SweepCounts(thresholds, labels, fps)
+    for name in frames:
+        for start in range(0, len(frames[name]), 3):
+            part = slice(start, start + 3)
+            counts.update(name, frames[name][part], scores[name][part])
+    assert counts.frames == 40
+    whole = sweep_thresholds(scores, frames, labels, fps, thresholds)
+    assert counts.rows() == whole
+    assert all(row["missed_sources"] >= 1 for row in whole)  # "c" has no frames
+    assert whole[-1]["mean_delay_s"] is None
+
+
+def test_evaluate_with_onnx_model(footage):
+    """Test the full evaluation over video and images with a real model"""
+    root, labels = footage
+    report = evaluate(
+        root,
+        labels,
+        batch_size=8,
+        workers=0,
+        config=ModelConfig(type="onnx", path=MNIST_MODEL, class_index=0),
+    )
+    assert report["frames"] == 25
+    assert len(report["sweep"]) == 19
+    assert set(report["suggested"]) == {"warning_threshold", "critical_threshold"}
+
+
+def test_model_path_overrides_only_the_path():
+    """Test --model keeps the rest of the configured model"""
+    config = ModelConfig(
+        type="yolo", path="a.onnx", class_index=3, roi=(1, 2, 3, 4), letterbox=True
+    )
+    overridden = model_config(config, "b.onnx")
+    assert overridden.path == "b.onnx" and overridden.type == "yolo"
+    assert overridden.class_index == 3 and overridden.letterbox
+    assert overridden.roi == (1, 2, 3, 4)
+    assert model_config(None, "b.onnx").type == "onnx"
+    assert model_config(config, "placeholder").type == "placeholder"
+    assert model_config(config) is config
+
+
+def test_evaluate_command_uses_configured_cascade(footage, tmp_path):
+    """Test a cascade from the app config is evaluated on raw frames"""
+    root, labels = footage
+    stage = {"type": "onnx", "path": MNIST_MODEL, "class_index": 0}
+    config_path = tmp_path / "config.json"
+    config_path.write_text(
+        json.dumps({"model": dict(stage, prefilter=stage, prefilter_threshold=0.0)})
+    )
+    json_path = tmp_path / "report.json"
+    result = CliRunner().invoke(
+        cli,
+        ["evaluate", root, "--labels", labels, "--workers", "0"]
+        + ["--config", str(config_path), "--json", str(json_path)],
+    )
+    assert result.exit_code == 0, result.output
+    report = json.loads(json_path.read_text())
+    assert report["frames"] == 25 and report["model"] == MNIST_MODEL
+
+
+def test_evaluate_command(footage, tmp_path):
+    """Test the evaluate command writes a JSON report"""
+    root, labels = footage
+    json_path = tmp_path / "report.json"
+    result = CliRunner().invoke(
+        cli,
+        ["evaluate", root, "--labels", labels, "--workers", "0"]
+        + ["--json", str(json_path)],
+    )
+    assert result.exit_code == 0, result.output
+    assert json_path.exists()
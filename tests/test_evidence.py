@@ -0,0 +1,83 @@
+import os
+import json
+import threading
+import cv2
+import numpy as np
+import pytest
+from sentinelowl.core.detector import DetectionResult
+from sentinelowl.core.evidence import FrameRingBuffer
+
+
+def _frame(value: int) -> np.ndarray:
+    return np.full((48, 64, 3), value, dtype=np.uint8)
+
+
+def test_ring_buffer_overwrites_oldest(tmp_path):
+    """Test only the last N frames are kept and the file size is constant"""
+    ring = FrameRingBuffer(
+        str(tmp_path / "frames.ring"), capacity=4, slot_bytes=64 * 48 * 3
+    )
+    size = os.path.getsize(ring.path)
+    for i in range(10):
+        ring.append(_frame(i * 10), DetectionResult(i / 10, False, False))
+
+    frames = ring.frames()
+    assert len(ring) == 4
+    assert [int(meta["sequence"]) for meta, _ in frames] == [7, 8, 9, 10]
+    assert [int(image[0, 0, 0]) for _, image in frames] == [60, 70, 80, 90]
+    assert os.path.getsize(ring.path) == size
+    assert not ring.append(np.zeros((100, 100, 3), dtype=np.uint8))  # Too large
+    ring.close()
+
+
+def test_ring_buffer_dump_clip(tmp_path):
+    """Test compressed and raw frames are dumped to a clip with their results"""
+    ring = FrameRingBuffer(
+        str(tmp_path / "frames.ring"), capacity=8, slot_bytes=64 * 48 * 3
+    )
+    ok, jpeg = cv2.imencode(".jpg", _frame(200))
+    ring.append(jpeg.tobytes(), DetectionResult(0.2, False, False))
+    ring.append(_frame(100), DetectionResult(0.9, True, True))
+
+    clip = ring.dump(str(tmp_path / "clips" / "event.avi"))
+    cap = cv2.VideoCapture(clip)
+    assert cap.get(cv2.CAP_PROP_FRAME_COUNT) == 2
+    cap.release()
+    with open(tmp_path / "clips" / "event.json") as f:
+        results = json.load(f)
+    assert [r["is_critical"] for r in results] == [False, True]
+    assert results[1]["confidence"] == np.float32(0.9)
+    ring.close()
+
+
+def test_ring_buffer_close_waits_for_dump(tmp_path):
+    """Test close() lets a running dump finish and later dumps are refused"""
+    ring = FrameRingBuffer(
+        str(tmp_path / "frames.ring"), capacity=4, slot_bytes=64 * 48 * 3
+    )
+    ring.append(_frame(50))
+    started, release = threading.Event(), threading.Event()
+    frames = ring.frames
+
+    def slow_frames():
+        started.set()
+        release.wait(5)
+        return frames()
+
+    ring.frames = slow_frames
+    clips = []
+    dump = threading.Thread(
+        target=lambda: clips.append(ring.dump(str(tmp_path / "event.avi")))
+    )
+    dump.start()
+    started.wait(5)
+    closer = threading.Thread(target=ring.close)
+    closer.start()
+    closer.join(0.1)
+    assert closer.is_alive()  # Blocked until the dump is done with the mmap
+    release.set()
+    dump.join(5)
+    closer.join(5)
+    assert clips == [str(tmp_path / "event.avi")]
+    with pytest.raises(ValueError):
+        ring.dump(str(tmp_path / "late.avi"))
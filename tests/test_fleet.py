@@ -0,0 +1,99 @@
+# tests/test_fleet.py
+import os
+import asyncio
+import pytest
+from sentinelowl.config import AppConfig
+from sentinelowl.core.fleet import SentinelFleet
+from sentinelowl.core.slots import PRIORITY_ALARM, InferenceSlots
+from sentinelowl.moonraker_plugin import AIGuardPlugin
+
+MNIST_MODEL = os.path.join(os.path.dirname(__file__), "..", "models", "mnist-12.onnx")
+
+
+def _fleet_config(count, **overrides):
+    printers = [
+        {"name": f"p{i}", "camera": {"url": "synthetic://64x48", "type": "synthetic"}}
+        for i in range(count)
+    ]
+    return AppConfig(
+        detection={"interval": 0, "min_interval": 0.01},
+        fleet=printers,
+        **overrides,
+    )
+
+
+def test_inference_slots_order():
+    """Test alarmed printers go first, then the least recently served"""
+
+    async def scenario():
+        slots = InferenceSlots(1)
+        await slots.acquire("a")  # "a" was served most recently
+        order = []
+
+        async def wait(name, priority=10):
+            await slots.acquire(name, priority)
+            order.append(name)
+            slots.release()
+
+        tasks = [
+            asyncio.create_task(wait("a")),
+            asyncio.create_task(wait("b")),
+            asyncio.create_task(wait("c", PRIORITY_ALARM)),
+        ]
+        await asyncio.sleep(0)
+        assert slots.waiting == 3
+        slots.release()
+        await asyncio.gather(*tasks)
+        return order, slots.in_use
+
+    order, in_use = asyncio.run(scenario())
+    assert order == ["c", "b", "a"]
+    assert in_use == 0
+
+
+def test_fleet_shares_models():
+    """Test printers with the same model configuration share one session"""
+    config = _fleet_config(3)
+    config.fleet[2].model = {"type": "onnx", "path": MNIST_MODEL, "class_index": 0}
+    fleet = SentinelFleet(config)
+    detectors = [member.detector for member in fleet.members.values()]
+    assert len(fleet.models) == 2
+    assert detectors[0].model is detectors[1].model
+    assert detectors[2].model is not detectors[0].model
+
+    # Suspending a printer must not unload the model the others still use
+    fleet.members["p0"]._close_pipeline()
+    assert detectors[1].model is not None
+    fleet.models.close()
+
+    with pytest.raises(ValueError):
+        SentinelFleet(AppConfig(fleet=[{"name": "x"}, {"name": "x"}]))
+
+
+def test_fleet_monitors_every_printer():
+    """Test every printer gets inference time and per-printer status"""
+    fleet = SentinelFleet(_fleet_config(3))
+    plugin = AIGuardPlugin(fleet.config, engine=fleet)
+    assert all(
+        member.on_event == plugin.broadcaster.publish_event
+        for member in fleet.members.values()
+    )
+
+    async def scenario():
+        loops = [
+            asyncio.create_task(member._monitor_loop())
+            for member in fleet.members.values()
+        ]
+        await asyncio.sleep(0.5)
+        for task in loops:
+            task.cancel()
+        await asyncio.gather(*loops, return_exceptions=True)
+        return await plugin.get_status(), await plugin.get_printer("p1")
+
+    status, printer = asyncio.run(scenario())
+    fleet.models.close()
+    assert set(status["printers"]) == {"p0", "p1", "p2"}
+    assert all(p["inferences"] > 0 for p in status["printers"].values())
+    # The placeholder model scores at random, so any alarm state is possible
+    assert printer["alarm"] == fleet.members["p1"].get_alarm_state()
+    assert "sentinelowl_p2_fps" in fleet.to_prometheus()
@@ -0,0 +1,121 @@
+# tests/test_history.py
+import os
+import time
+import asyncio
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from sentinelowl.config import AppConfig
+from sentinelowl.core.detector import DetectionResult
+from sentinelowl.core.engine import SentinelOwl
+from sentinelowl.core.history import FILE_DTYPE, FLAG_ALARM_CRITICAL, DetectionHistory
+from sentinelowl.moonraker_plugin import AIGuardPlugin
+
+
+def _filled(count, chunk_size=1000, **kwargs):
+    history = DetectionHistory(chunk_size=chunk_size, **kwargs)
+    confidence = np.random.default_rng(0).random(count).astype(np.float16)
+    for i, value in enumerate(confidence):
+        history.append(float(value), flags=i % 3, timestamp=1000.0 + i * 0.5)
+    return history, confidence
+
+
+def test_history_downsampling():
+    """Test bucket min/max/mean across chunk boundaries"""
+    history, confidence = _filled(5000)
+    # [1500, 2500) covers samples 1000..2999 in 10 buckets of 200
+    buckets = history.query(1500.0, 2500.0, buckets=10)
+    expected = confidence[1000:3000].astype(np.float32).reshape(10, 200)
+    assert list(buckets.count) == [200] * 10
+    assert np.allclose(buckets.min, expected.min(axis=1))
+    assert np.allclose(buckets.max, expected.max(axis=1))
+    assert np.allclose(buckets.mean, expected.mean(axis=1), atol=1e-4)
+    assert list(buckets.flags) == [3] * 10
+
+    # Empty buckets are left out
+    sparse = history.query(3000.0, 4000.0, buckets=4)
+    assert list(sparse.start) == [3000.0, 3250.0]
+
+
+def test_history_retention_and_persistence(tmp_path):
+    """Test old chunks are dropped and the file is read back on start-up"""
+    history, _ = _filled(5000, max_samples=2000)
+    assert len(history) == 2000  # The two newest chunks
+    assert history.query(1000.0, 2000.0).count.size == 0
+
+    path = str(tmp_path / "history.bin")
+    history, confidence = _filled(2500, path=path)
+    history.append(0.9, 0.9, FLAG_ALARM_CRITICAL, timestamp=5000.0)
+    history.close()
+    reloaded = DetectionHistory(chunk_size=1000, path=path)
+    assert len(reloaded) == 2501
+    buckets = reloaded.query(1000.0, 5001.0, buckets=1)
+    assert buckets.count[0] == 2501
+    assert buckets.flags[0] & FLAG_ALARM_CRITICAL
+    assert np.isclose(buckets.max[0], max(confidence.max(), 0.9), atol=1e-3)
+    reloaded.close()
+
+
+def test_history_footprint():
+    """Test a 48-hour print at 5 samples/s stays small and queries fast"""
+    history = DetectionHistory()
+    samples = 48 * 3600 * 5
+    for i in range(samples):
+        history.append(0.1, 0.1, 0, timestamp=i * 0.2)
+    assert history.nbytes < 10 * 1024 * 1024
+
+    start = time.perf_counter()
+    buckets = history.query(3600.0, 7200.0, buckets=360)
+    elapsed = time.perf_counter() - start
+    assert buckets.count.sum() == 3600 * 5
+    assert elapsed < 0.05
+
+
+def test_engine_history_endpoint():
+    """Test detections land in the history served by the plugin"""
+    owl = SentinelOwl(AppConfig())
+    plugin = AIGuardPlugin(owl.config, engine=owl)
+    for confidence in (0.1, 0.2, 0.95):
+        owl._handle_result(DetectionResult(confidence, False, confidence > 0.85))
+
+    history = asyncio.run(plugin.get_history(buckets=1))
+    assert len(history["buckets"]) == 1
+    bucket = history["buckets"][0]
+    assert bucket["count"] == 3
+    assert np.isclose(bucket["max"], 0.95, atol=1e-3)
+
+
+def test_history_rejects_oversized_queries():
+    """Test bucket counts are capped and short windows get fewer buckets"""
+    owl = SentinelOwl(AppConfig())
+    plugin = AIGuardPlugin(owl.config, engine=owl)
+    with pytest.raises(HTTPException) as error:
+        query = {"start": 0.0, "end": 1e6, "buckets": 1_000_000_000}
+        asyncio.run(plugin.get_history(**query))
+    assert error.value.status_code == 400
+
+    now = time.time()
+    for confidence in (0.1, 0.2, 0.3):
+        owl._handle_result(DetectionResult(confidence, False, False))
+    # 120 s at a 1 s minimum interval: at most 120 buckets instead of a 400
+    history = asyncio.run(plugin.get_history(start=now - 120, end=now + 1))
+    assert sum(bucket["count"] for bucket in history["buckets"]) == 3
+    assert history["bucket_seconds"] >= owl.config.detection.min_interval
+
+
+def test_history_file_is_compacted(tmp_path):
+    """Test the file is cut back to max_samples instead of growing forever"""
+    path = str(tmp_path / "history.bin")
+    history = DetectionHistory(chunk_size=100, max_samples=300, path=path)
+    for i in range(650):
+        history.append(0.1, timestamp=1000.0 + i)
+    history.close()
+    # Compacted once at 600 records, then 50 more were appended
+    assert os.path.getsize(path) == 350 * FILE_DTYPE.itemsize
+
+    reloaded = DetectionHistory(chunk_size=100, max_samples=300, path=path)
+    assert os.path.getsize(path) == 300 * FILE_DTYPE.itemsize
+    assert len(reloaded) == 300
+    assert reloaded.query(0.0, 2000.0, buckets=1).start.size == 1
+    assert reloaded.query(1000.0, 1350.0).count.size == 0  # Oldest were dropped
+    reloaded.close()
@@ -1,5 +1,11 @@
+import os
+import time
+import threading
+import pytest
 import numpy as np
-from sentinelowl.core.models import PlaceholderModel
+from sentinelowl.core.models import BaseModel, PlaceholderModel
+
+MNIST_MODEL = os.path.join(os.path.dirname(__file__), "..", "models", "mnist-12.onnx")
 
 
 def test_placeholder_model():
@@ -11,3 +17,333 @@ def test_placeholder_model():
     assert 0.0 <= confidence <= 1.0
     assert isinstance(is_warning, bool)
     assert isinstance(is_critical, bool)
+
+
+def test_onnx_model():
+    """Test the ONNX model reuses its bound buffers across frames"""
+    from sentinelowl.config import ModelConfig
+    from sentinelowl.core.models import OnnxModel, create_model
+
+    model = create_model(ModelConfig(type="onnx", path=MNIST_MODEL, class_index=0))
+    assert isinstance(model, OnnxModel)
+    assert model.input_shape == (1, 1, 28, 28)
+
+    input_buffer = model._input
+    frame = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+    for _ in range(2):
+        confidence, is_warning, is_critical = model.predict(frame)
+        assert 0.0 <= confidence <= 1.0
+        assert isinstance(is_warning, bool)
+        assert isinstance(is_critical, bool)
+    assert model._input is input_buffer
+    assert set(model.timings) == {"preprocess", "inference", "postprocess"}
+
+    # Timings belong to the thread that ran predict(), not the shared model
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(dict(model.timings)))
+    thread.start()
+    thread.join()
+    assert seen == [{}]
+
+
+def test_onnx_model_requires_class_index_for_multiclass_outputs():
+    """Test a multi-class output without class_index fails at load time"""
+    from sentinelowl.config import ModelConfig
+    from sentinelowl.core.models import create_model
+
+    with pytest.raises(ValueError, match="class_index"):
+        create_model(ModelConfig(type="onnx", path=MNIST_MODEL))
+
+
+class _FixedModel(BaseModel):
+    """Returns queued scores and counts its calls"""
+
+    def __init__(self, *scores):
+        self.scores = list(scores)
+        self.calls = 0
+
+    def predict(self, frame):
+        self.calls += 1
+        score = self.scores.pop(0)
+        return score, score > 0.7, score > 0.85
+
+
+def test_cascade_escalates_only_suspicious_frames():
+    """Test the second stage only runs on frames above the pre-threshold"""
+    from sentinelowl.core.models import CascadeModel
+
+    prefilter = _FixedModel(0.1, 0.5, 0.2, 0.9)
+    heavy = _FixedModel(0.95, 0.3)
+    cascade = CascadeModel(prefilter, heavy, threshold=0.4)
+    frame = np.zeros((8, 8, 3), dtype=np.uint8)
+
+    results = [cascade.predict(frame) for _ in range(4)]
+    assert results == [
+        (0.1, False, False),
+        (0.95, True, True),
+        (0.2, False, False),
+        (0.3, False, False),  # Heavy model overrules a prefilter false positive
+    ]
+    assert heavy.calls == 2
+    assert cascade.escalation_rate == 0.5
+    assert set(cascade.timings) == {"prefilter", "inference"}
+
+
+def test_cascade_from_config_reports_statistics():
+    """Test a configured cascade feeds escalation stats to the monitor"""
+    from sentinelowl.config import ModelConfig
+    from sentinelowl.core.detector import DefectDetector
+    from sentinelowl.core.models import CascadeModel
+    from sentinelowl.core.performance import PerformanceMonitor
+
+    config = ModelConfig(
+        type="onnx",
+        path=MNIST_MODEL,
+        class_index=0,
+        prefilter=ModelConfig(type="placeholder"),
+        prefilter_threshold=0.0,  # Escalate everything
+    )
+    monitor = PerformanceMonitor()
+    detector = DefectDetector(config, performance=monitor)
+    assert isinstance(detector.model, CascadeModel)
+    detector.analyze(np.zeros((28, 28, 3), dtype=np.uint8))
+    assert monitor.get_escalation_rate() == 1.0
+    assert monitor.stages["prefilter"].count == 1
+    assert monitor.stages["inference"].count == 1
+    assert "sentinelowl_cascade_escalated_total 1" in monitor.to_prometheus()
+    detector.close()
+
+
+class _SingleBufferModel(BaseModel):
+    """Fails if two threads are inside predict() at once"""
+
+    def __init__(self, score):
+        self.score = score
+        self.busy = False
+        self.overlaps = 0
+
+    def predict(self, frame):
+        self.overlaps += self.busy
+        self.busy = True
+        time.sleep(0.001)
+        self.busy = False
+        return self.score, False, False
+
+
+def test_cascade_is_safe_to_share_between_threads():
+    """Test concurrent callers never overlap in the prefilter or mix up state"""
+    from concurrent.futures import ThreadPoolExecutor
+    from sentinelowl.core.models import CascadeModel
+
+    prefilter = _SingleBufferModel(0.5)
+    cascade = CascadeModel(prefilter, PlaceholderModel(), threshold=0.4)
+    frame = np.zeros((8, 8, 3), dtype=np.uint8)
+
+    def call(_):
+        cascade.predict(frame)
+        return cascade.last_escalated, set(cascade.timings)
+
+    with ThreadPoolExecutor(4) as pool:
+        outcomes = list(pool.map(call, range(40)))
+    assert prefilter.overlaps == 0
+    assert cascade.frames == cascade.escalated == 40
+    assert all(escalated is True and "prefilter" in t for escalated, t in outcomes)
+    assert cascade.last_escalated is None  # Nothing ran on this thread
+
+
+def _greedy_nms(boxes, scores, classes, iou_threshold):
+    """Reference one-box-at-a-time NMS"""
+    from sentinelowl.core.models.yolo_model import box_iou
+
+    order = list(np.argsort(-scores, kind="stable"))
+    iou = box_iou(boxes)
+    keep = []
+    while order:
+        best = order.pop(0)
+        keep.append(best)
+        order = [
+            i
+            for i in order
+            if classes[i] != classes[best] or iou[best, i] <= iou_threshold
+        ]
+    return keep
+
+
+def _raw_head(rng, count=8400, classes=3):
+    """Random YOLOv8-layout head output (1, 4 + C, N) in 640 px space"""
+    output = np.zeros((1, 4 + classes, count), dtype=np.float32)
+    output[0, :2] = rng.uniform(0, 640, (2, count))
+    output[0, 2:4] = rng.uniform(10, 80, (2, count))
+    output[0, 4:] = rng.random((classes, count)) ** 4
+    return output
+
+
+def test_vectorized_nms_matches_greedy():
+    """Test matrix NMS keeps exactly the boxes greedy NMS keeps"""
+    from sentinelowl.core.models.yolo_model import (
+        decode_predictions,
+        non_max_suppression,
+    )
+
+    rng = np.random.default_rng(1)
+    candidates = decode_predictions(_raw_head(rng, 2000), score_threshold=0.3)
+    kept = non_max_suppression(candidates, 0.45, max_detections=10_000)
+    reference = _greedy_nms(*candidates, 0.45)
+    assert np.array_equal(kept.scores, candidates.scores[reference])
+    assert np.array_equal(kept.classes, candidates.classes[reference])
+
+
+def test_yolo_postprocess_layouts_and_speed():
+    """Test both head layouts decode alike and post-processing is fast"""
+    import time
+    from sentinelowl.core.models.yolo_model import (
+        calibrate_scores,
+        decode_predictions,
+        non_max_suppression,
+    )
+
+    rng = np.random.default_rng(2)
+    v8 = _raw_head(rng)
+    # YOLOv5: (1, N, 5 + C), objectness 1 so the class scores are unchanged
+    v5 = np.concatenate([v8[0, :4], np.ones((1, v8.shape[2])), v8[0, 4:]]).T[None]
+    a = decode_predictions(v8, "yolov8")
+    b = decode_predictions(v5.astype(np.float32), "yolov5")
+    assert np.allclose(np.sort(a.scores), np.sort(b.scores))
+
+    start = time.perf_counter()
+    for _ in range(5):
+        non_max_suppression(decode_predictions(v8), 0.45, 100)
+    assert (time.perf_counter() - start) / 5 < 0.03
+
+    # Class thresholds (0.5, 0.6) map onto the global (0.7, 0.85)
+    scores = np.array([0.25, 0.5, 0.55, 0.6, 1.0])
+    calibrated = calibrate_scores(scores, 0.5, 0.6, 0.7, 0.85)
+    assert np.allclose(calibrated, [0.35, 0.7, 0.775, 0.85, 1.0])
+
+
+class _BoxModel(BaseModel):
+    """Reports one fixed box, like a detector with a letterboxed input"""
+
+    def __init__(self):
+        from sentinelowl.core.models.yolo_model import Detections
+        from sentinelowl.core.preprocess import Preprocessor
+
+        self.preprocessor = Preprocessor((1, 3, 64, 64), letterbox=True)
+        self.class_names = ["spaghetti", "blob"]
+        self.last_detections = Detections(
+            np.array([[16.0, 24.0, 48.0, 40.0]], dtype=np.float32),
+            np.array([0.9], dtype=np.float32),
+            np.array([1]),
+        )
+
+    def predict(self, frame):
+        self.preprocessor(frame)
+        return 0.9, True, True
+
+
+def test_detector_maps_boxes_to_frame():
+    """Test detector boxes come back in frame pixels on both code paths"""
+    from sentinelowl.config import ModelConfig
+    from sentinelowl.core.detector import DefectDetector
+
+    detector = DefectDetector(ModelConfig(), model=_BoxModel())
+    frame = np.zeros((64, 128, 3), dtype=np.uint8)  # Letterboxed by 0.5, dy=16
+
+    for result in (detector.analyze(frame), detector.infer(detector.prepare(frame))):
+        assert np.allclose(result.boxes, [[32.0, 16.0, 96.0, 48.0]])
+        assert result.defect_type == "blob"
+        assert list(result.classes) == [1]
+
+
+def _yolo_head_model(tmp_path) -> str:
+    """YOLOv8 ONNX model whose head output ignores the image"""
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper, numpy_helper
+
+    # Two overlapping "blob" boxes and a weak third one
+    head = np.zeros((1, 6, 3), dtype=np.float32)
+    head[0, :, 0] = [10, 10, 8, 8, 0.1, 0.65]
+    head[0, :, 1] = [11, 10, 8, 8, 0.1, 0.6]
+    head[0, :, 2] = [25, 25, 4, 4, 0.3, 0.0]
+    graph = helper.make_graph(
+        [
+            helper.make_node("ReduceMean", ["images"], ["mean"], keepdims=0),
+            helper.make_node("Mul", ["mean", "zero"], ["nothing"]),
+            helper.make_node("Add", ["head", "nothing"], ["output0"]),
+        ],
+        "head",
+        [helper.make_tensor_value_info("images", TensorProto.FLOAT, [1, 3, 32, 32])],
+        [helper.make_tensor_value_info("output0", TensorProto.FLOAT, [1, 6, 3])],
+        [
+            numpy_helper.from_array(head, "head"),
+            numpy_helper.from_array(np.zeros((), np.float32), "zero"),
+        ],
+    )
+    path = str(tmp_path / "yolo.onnx")
+    opset = [helper.make_opsetid("", 13)]
+    onnx.save(helper.make_model(graph, opset_imports=opset, ir_version=8), path)
+    return path
+
+
+def test_yolo_model(tmp_path):
+    """Test a YOLO ONNX model end to end with per-class thresholds"""
+    from sentinelowl.config import ModelConfig
+    from sentinelowl.core.models import YoloModel, create_model
+
+    path = _yolo_head_model(tmp_path)
+    model = create_model(
+        ModelConfig(
+            type="yolo",
+            path=path,
+            class_names=["spaghetti", "blob"],
+            class_thresholds={"blob": (0.5, 0.6)},
+        )
+    )
+    assert isinstance(model, YoloModel)
+    confidence, is_warning, is_critical = model.predict(
+        np.zeros((32, 32, 3), dtype=np.uint8)
+    )
+    assert len(model.last_detections.scores) == 2  # Second blob box suppressed
+    assert is_warning and is_critical
+    assert confidence > model.critical_threshold
+    model.close()
+
+    # "blob" is unnamed here: it gets the global thresholds, not spaghetti's
+    config = ModelConfig(
+        type="yolo",
+        path=path,
+        class_names=["spaghetti"],
+        class_thresholds={"spaghetti": (0.4, 0.5)},
+    )
+    model = create_model(config)
+    _, is_warning, is_critical = model.predict(np.zeros((32, 32, 3), np.uint8))
+    assert not is_warning and not is_critical
+    model.close()
+
+    with pytest.raises(ValueError, match="below its critical"):
+        create_model(
+            config.model_copy(update={"class_thresholds": {"spaghetti": (0.6, 0.5)}})
+        )
+
+
+def test_cascade_forwards_yolo_detections(tmp_path):
+    """Test boxes of a YOLO second stage reach the result, only if escalated"""
+    from sentinelowl.config import ModelConfig
+    from sentinelowl.core.detector import DefectDetector
+
+    config = ModelConfig(
+        type="yolo",
+        path=_yolo_head_model(tmp_path),
+        class_names=["spaghetti", "blob"],
+        prefilter=ModelConfig(type="placeholder"),
+        prefilter_threshold=0.0,  # Escalate everything
+    )
+    detector = DefectDetector(config)
+    frame = np.zeros((64, 64, 3), dtype=np.uint8)
+    for result in (detector.analyze(frame), detector.infer(detector.prepare(frame))):
+        assert result.defect_type == "blob"
+        assert np.allclose(result.boxes[0], [12.0, 12.0, 28.0, 28.0])
+    detector.model.threshold = 1.0  # The placeholder prefilter never gets there
+    result = detector.analyze(frame)
+    assert detector.model.last_detections is None and result.boxes is None
+    detector.close()
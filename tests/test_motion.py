@@ -0,0 +1,54 @@
+import numpy as np
+from sentinelowl.config import DetectionConfig
+from sentinelowl.core.detector import DefectDetector
+from sentinelowl.core.motion import MotionGate
+
+
+def test_motion_gate_skips_static_scene():
+    """Test unchanged frames are skipped until the forced refresh"""
+    gate = MotionGate(threshold=0.02, refresh_interval=3)
+    frame = np.full((480, 640, 3), 100, dtype=np.uint8)
+
+    assert gate.should_analyze(frame)  # First frame always analysed
+    assert not gate.should_analyze(frame)
+    assert not gate.should_analyze(frame)
+    assert gate.should_analyze(frame)  # Forced refresh
+
+
+def test_motion_gate_detects_change():
+    """Test a changed scene triggers inference"""
+    gate = MotionGate(threshold=0.02, refresh_interval=100)
+    frame = np.full((480, 640, 3), 100, dtype=np.uint8)
+    assert gate.should_analyze(frame)
+
+    changed = frame.copy()
+    changed[:240] = 200
+    assert gate.should_analyze(changed)
+    assert gate.last_score > 0.02
+
+
+def test_detector_reuses_result_when_gated():
+    """Test the detector returns the previous result for skipped frames"""
+    config = DetectionConfig()
+    detector = DefectDetector(config, gate=MotionGate(refresh_interval=100))
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+    first = detector.analyze(frame)
+    assert not detector.last_skipped
+    assert detector.analyze(frame) is first
+    assert detector.last_skipped
+
+
+def test_dropped_prepared_frame_is_not_the_reference():
+    """Test a change stays visible when its prepared frame never reaches infer()"""
+    detector = DefectDetector(DetectionConfig(), gate=MotionGate(refresh_interval=100))
+    still = np.full((480, 640, 3), 100, dtype=np.uint8)
+    changed = still.copy()
+    changed[:240] = 200
+
+    detector.infer(detector.prepare(still))
+    assert not detector.prepare(changed).skip  # Dropped by the queue
+    prepared = detector.prepare(changed)
+    assert not prepared.skip  # Still compared against the analysed frame
+    detector.infer(prepared)
+    assert detector.prepare(changed).skip
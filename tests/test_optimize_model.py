@@ -0,0 +1,113 @@
+import os
+import shutil
+import pytest
+from tests.test_models import MNIST_MODEL
+
+
+@pytest.fixture
+def model_copy(tmp_path):
+    path = tmp_path / "mnist-12.onnx"
+    shutil.copy(MNIST_MODEL, path)
+    return str(path)
+
+
+def test_cached_optimized_graph_is_used(model_copy):
+    """Test the runtime loads the optimized graph while its fingerprint matches"""
+    from sentinelowl.core.models import OnnxModel
+    from sentinelowl.core.models.model_cache import cached_model
+    from sentinelowl.scripts.optimize_model import optimize_graph
+
+    assert cached_model(model_copy, "all") is None
+    optimized = optimize_graph(model_copy)
+    assert os.path.exists(optimized)
+    assert cached_model(model_copy, "all") == optimized
+    assert cached_model(model_copy, "basic") is None
+    assert OnnxModel(model_copy, class_index=0).session_path == optimized
+    assert (
+        OnnxModel(model_copy, class_index=0, use_cache=False).session_path == model_copy
+    )
+
+    with open(model_copy, "ab") as f:
+        f.write(b"\0")  # Any change to the source invalidates the cache
+    assert cached_model(model_copy, "all") is None
+
+
+def test_cache_hashes_only_touched_models(model_copy, monkeypatch):
+    """Test the cache trusts an unchanged size and mtime and rehashes otherwise"""
+    from sentinelowl.core.models import model_cache
+    from sentinelowl.scripts.optimize_model import optimize_graph
+
+    optimized = optimize_graph(model_copy)
+    hashed = []
+    sha256 = model_cache._sha256
+    monkeypatch.setattr(
+        model_cache, "_sha256", lambda path: hashed.append(path) or sha256(path)
+    )
+    assert model_cache.cached_model(model_copy, "all") == optimized
+    assert hashed == []
+
+    stat = os.stat(model_copy)
+    os.utime(model_copy, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert model_cache.cached_model(model_copy, "all") == optimized
+    assert hashed == [model_copy]
+    assert model_cache.cached_model(model_copy, "all") == optimized
+    assert hashed == [model_copy]  # The new mtime was recorded
+
+    with open(model_copy, "r+b") as f:
+        f.write(b"\1")  # Same size, different content
+    assert model_cache.cached_model(model_copy, "all") is None
+
+
+def test_compare_models_reports_delta_and_speedup(model_copy):
+    """Test the comparison of an optimized model against its original"""
+    from sentinelowl.scripts.optimize_model import (
+        compare_models,
+        load_frames,
+        optimize_graph,
+    )
+
+    optimize_graph(model_copy)
+    report = compare_models(model_copy, model_copy, load_frames(limit=4))
+    assert report["frames"] == 4
+    assert report["candidate"].endswith(".optimized.onnx")
+    assert report["top1_agreement"] == 1.0
+    assert report["max_confidence_delta"] < 1e-4
+    assert report["speedup"] > 0
+
+
+def test_dynamic_quantization(model_copy):
+    """Test dynamic int8 quantization produces a loadable model"""
+    pytest.importorskip("onnx")
+    from sentinelowl.core.models import OnnxModel
+    from sentinelowl.scripts.optimize_model import quantize_model
+
+    quantized = quantize_model(model_copy, "dynamic")
+    assert quantized.endswith(".int8.onnx")
+    assert OnnxModel(quantized, class_index=0, use_cache=False).input_shape == (
+        1,
+        1,
+        28,
+        28,
+    )
+
+
+def test_quantization_without_onnx_names_the_extra(model_copy, monkeypatch):
+    """Test a missing onnx package points at the optimize extra"""
+    import sys
+    from sentinelowl.scripts.optimize_model import quantize_model
+
+    monkeypatch.setitem(sys.modules, "onnxruntime.quantization", None)
+    with pytest.raises(RuntimeError, match=r"sentinelowl\[optimize\]"):
+        quantize_model(model_copy, "dynamic")
+
+
+def test_optimize_model_prints_quantized_model_path(model_copy, capsys):
+    """Test the command tells which model.path runs the int8 model"""
+    pytest.importorskip("onnx")
+    from sentinelowl.scripts.optimize_model import main
+
+    report = main(model_copy, "dynamic", limit=2)
+    assert report["model_path"] == os.path.abspath(
+        model_copy.replace(".onnx", ".int8.onnx")
+    )
+    assert f"model.path to: {report['model_path']}" in capsys.readouterr().out
@@ -1,5 +1,9 @@
 import time
-from sentinelowl.core.performance import PerformanceMonitor, PerformanceStats
+from sentinelowl.core.performance import (
+    LatencyHistogram,
+    PerformanceMonitor,
+    PerformanceStats,
+)
 
 
 def test_performance_monitor():
@@ -19,3 +23,47 @@ def test_performance_monitor():
     stats = monitor.get_stats()
     assert stats.fps > 0.0  # 现在应该大于0
     assert stats.processing_time > 0.0
+
+
+def test_performance_skip_ratio():
+    """Test skipped frames are reported as a ratio"""
+    monitor = PerformanceMonitor()
+    for skipped in (False, True, True, True):
+        monitor.start_frame()
+        monitor.end_frame(skipped=skipped)
+
+    assert monitor.get_stats().skip_ratio == 0.75
+
+
+def test_latency_histogram_percentiles():
+    """Test histogram percentiles stay within one bucket of the truth"""
+    histogram = LatencyHistogram(factor=1.2)
+    for i in range(1, 1001):
+        histogram.observe(i / 1000)  # 1 ms .. 1 s
+
+    assert histogram.count == 1000
+    assert abs(histogram.percentile(50) - 0.5) / 0.5 < 0.2
+    assert abs(histogram.percentile(99) - 0.99) / 0.99 < 0.2
+
+
+def test_stage_timing_and_prometheus_export():
+    """Test stage timers and the Prometheus text output"""
+    monitor = PerformanceMonitor()
+    with monitor.stage("inference"):
+        time.sleep(0.01)
+
+    @monitor.timed("preprocess")
+    def preprocess():
+        return 42
+
+    assert preprocess() == 42
+    monitor.record_frame_age(0.2)
+    monitor.record_dropped(3)
+
+    assert monitor.stages["inference"].count == 1
+    assert monitor.get_percentiles("inference")["p50"] >= 0.005
+    text = monitor.to_prometheus()
+    assert 'sentinelowl_stage_latency_seconds_count{stage="inference"} 1' in text
+    assert 'sentinelowl_stage_latency_seconds_count{stage="preprocess"} 1' in text
+    assert "sentinelowl_frames_dropped_total 3" in text
+    assert "sentinelowl_frame_age_seconds_count 1" in text
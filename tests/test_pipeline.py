@@ -0,0 +1,134 @@
+# tests/test_pipeline.py
+import os
+import time
+import asyncio
+import numpy as np
+from sentinelowl.config import ModelConfig
+from sentinelowl.core.detector import DefectDetector, DetectionResult
+from sentinelowl.core.performance import PerformanceMonitor
+from sentinelowl.core.pipeline import DropOldestQueue, FramePipeline
+
+MNIST_MODEL = os.path.join(os.path.dirname(__file__), "..", "models", "mnist-12.onnx")
+
+
+def test_drop_oldest_queue():
+    """Test a full queue evicts its oldest item and counts the drop"""
+
+    async def scenario():
+        queue = DropOldestQueue(2)
+        evicted = [queue.put_nowait(i) for i in range(4)]
+        return evicted, queue.dropped, [await queue.get(), await queue.get()]
+
+    evicted, dropped, items = asyncio.run(scenario())
+    assert evicted == [0, 0, 1, 1]
+    assert dropped == 2
+    assert items == [2, 3]
+
+
+def _run_pipeline(duration, stage_seconds, queue_size=1):
+    performance = PerformanceMonitor()
+    counter = iter(range(1, 1_000_000))
+    acted = []
+
+    def capture():
+        return np.zeros((4, 4), np.uint8), time.monotonic(), next(counter)
+
+    def prepare(frame):
+        time.sleep(stage_seconds)
+        return frame
+
+    def infer(prepared):
+        time.sleep(stage_seconds)
+        return DetectionResult(0.1, False, False), False
+
+    async def scenario():
+        pipeline = FramePipeline(
+            capture,
+            prepare,
+            infer,
+            acted.append,
+            pace=lambda: asyncio.sleep(0.002),
+            performance=performance,
+            queue_size=queue_size,
+        )
+        task = asyncio.ensure_future(pipeline.run())
+        await asyncio.sleep(duration)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+    return acted, performance
+
+
+def test_pipeline_overlaps_stages():
+    """Test throughput follows the slowest stage rather than their sum"""
+    acted, performance = _run_pipeline(1.0, 0.04)
+    # Serial processing would manage 1.0 / (0.04 + 0.04) = 12 frames
+    assert len(acted) >= 16
+    stats = performance.get_stats()
+    assert performance.dropped_frames > 0  # Capture outpaces the model
+    assert stats.frame_queue_size == 0  # Reset once the pipeline stops
+    # Only fresh frames reach the action stage, in capture order
+    sequences = [item.sequence for item in acted]
+    assert sequences == sorted(sequences)
+
+
+def test_pipeline_survives_stage_failures():
+    """Test a failing frame is counted and skipped instead of stopping the run"""
+    performance = PerformanceMonitor()
+    counter = iter(range(1, 1_000_000))
+    acted = []
+
+    def capture():
+        sequence = next(counter)
+        if sequence == 2:
+            raise ConnectionError("camera hiccup")
+        return np.zeros((4, 4), np.uint8), time.monotonic(), sequence
+
+    def prepare(frame):
+        return frame
+
+    def infer(prepared):
+        if len(acted) == 1 and not performance.failures.get("inference"):
+            raise RuntimeError("bad frame")
+        return DetectionResult(0.1, False, False), False
+
+    def act(item):
+        acted.append(item)
+        if len(acted) == 2:
+            raise OSError("disk full")
+
+    async def scenario():
+        pipeline = FramePipeline(
+            capture,
+            prepare,
+            infer,
+            act,
+            pace=lambda: asyncio.sleep(0.01),
+            performance=performance,
+        )
+        task = asyncio.ensure_future(pipeline.run())
+        await asyncio.sleep(0.3)
+        assert not task.done()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert performance.failures == {"capture": 1, "inference": 1, "action": 1}
+    assert len(acted) > 5
+    assert 'stage_failures_total{stage="action"} 1' in performance.to_prometheus()
+
+
+def test_detector_prepare_infer_matches_analyze():
+    """Test the split detector API gives the same result as analyze()"""
+    config = ModelConfig(type="onnx", path=MNIST_MODEL, class_index=0)
+    detector = DefectDetector(config)
+    frame = np.random.default_rng(0).integers(0, 255, (48, 64, 3), dtype=np.uint8)
+
+    expected = detector.analyze(frame)
+    prepared = detector.prepare(frame)
+    assert not prepared.skip
+    assert prepared.input.shape == tuple(detector.model.input_shape)
+    result = detector.infer(prepared)
+    assert np.isclose(result.confidence, expected.confidence)
+    detector.close()
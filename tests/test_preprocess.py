@@ -0,0 +1,60 @@
+import numpy as np
+from sentinelowl.core.preprocess import Preprocessor
+from sentinelowl.scripts.validate import preprocess_frame
+
+
+def _frame(height=1080, width=1920):
+    rng = np.random.default_rng(0)
+    # Smooth gradient so resize order does not dominate the comparison
+    base = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    noise = rng.integers(0, 8, (height, 1, 3))
+    return np.clip(base + noise, 0, 255).astype(np.uint8)
+
+
+def test_preprocessor_matches_reference():
+    """Test the fused pipeline matches preprocess_frame"""
+    frame = _frame()
+    for shape in ([1, 3, 224, 224], [1, 1, 28, 28]):
+        metadata = {"name": "input", "shape": shape, "dtype": "tensor(float)"}
+        expected = preprocess_frame(frame, metadata)
+        result = Preprocessor.from_metadata(metadata)(frame)
+
+        assert result.shape == expected.shape
+        assert result.dtype == np.float32
+        assert result.flags["C_CONTIGUOUS"]
+        assert np.abs(result - expected).max() <= 2 / 255
+
+
+def test_preprocessor_reuses_buffer():
+    """Test the output buffer is reused across calls"""
+    preprocessor = Preprocessor((1, 3, 64, 64), dtype=np.uint8)
+    first = preprocessor(_frame(480, 640))
+    second = preprocessor(_frame(480, 640))
+    assert first is second is preprocessor.output
+
+
+def test_preprocessor_letterbox_and_roi():
+    """Test letterboxing pads instead of stretching and ROI crops first"""
+    frame = np.full((100, 200, 3), 255, dtype=np.uint8)
+    preprocessor = Preprocessor((1, 3, 64, 64), letterbox=True, pad_value=0)
+    output = preprocessor(frame)
+
+    assert preprocessor.scale == (0.32, 0.32)
+    assert output[0, :, 0, 32].max() == 0  # Top padding row
+    assert output[0, :, 32, 32].min() == 1.0  # Image content
+
+    cropped = Preprocessor((1, 3, 10, 10), roi=(50, 0, 100, 100))
+    cropped(frame)
+    assert cropped.offset == (-5.0, 0.0)
+
+
+def test_preprocessor_grayscale_frame():
+    """Test 2-D frames are expanded to BGR and written into the bound buffer"""
+    gray = _frame(480, 640)[:, :, 0]
+    preprocessor = Preprocessor((1, 3, 64, 64))
+    output = preprocessor(gray)
+
+    assert output is preprocessor.output
+    expected = Preprocessor((1, 3, 64, 64))(np.dstack([gray] * 3))
+    assert np.array_equal(output, expected)
+    assert np.array_equal(output[0, 0], output[0, 2])
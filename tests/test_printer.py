@@ -0,0 +1,250 @@
+import json
+import asyncio
+import tornado.web
+import tornado.websocket
+from tornado.httpserver import HTTPServer
+from tornado.netutil import bind_sockets
+from sentinelowl.core.performance import PerformanceMonitor
+from sentinelowl.services.moonraker_client import MoonrakerClient
+from sentinelowl.services.printer import PrinterController
+
+
+class FakeMoonraker:
+    """Stand-in Moonraker answering gcode over websocket and HTTP"""
+
+    def __init__(
+        self, websocket: bool = True, respond: bool = True, http_failures: int = 0
+    ):
+        self.scripts = []  # (transport, script)
+        self.sockets = []
+        self.status = {"print_stats": {"state": "standby", "info": {}}}
+        self.subscribed = {}  # Objects of the last status subscription
+        self.http_failures = http_failures  # HTTP requests to answer with a 503
+        fake = self
+
+        class Socket(tornado.websocket.WebSocketHandler):
+            def open(self):
+                if not websocket:
+                    self.close()
+                fake.sockets.append(self)
+
+            def on_message(self, text):
+                message = json.loads(text)
+                if message["method"] == "printer.objects.subscribe":
+                    fake.subscribed = message["params"]["objects"]
+                    result = {"eventtime": 0.0, "status": fake.status}
+                else:
+                    fake.scripts.append(("ws", message["params"]["script"]))
+                    result = "ok"
+                    if not respond:
+                        return
+                reply = {"jsonrpc": "2.0", "result": result, "id": message["id"]}
+                self.write_message(json.dumps(reply))
+
+        class Script(tornado.web.RequestHandler):
+            def post(self):
+                if fake.http_failures:
+                    fake.http_failures -= 1
+                    raise tornado.web.HTTPError(503)
+                fake.scripts.append(("http", json.loads(self.request.body)["script"]))
+                self.write({"result": "ok"})
+
+        app = tornado.web.Application(
+            [(r"/websocket", Socket), (r"/printer/gcode/script", Script)]
+        )
+        sockets = bind_sockets(0, "127.0.0.1")
+        self.port = sockets[0].getsockname()[1]
+        self.server = HTTPServer(app)
+        self.server.add_sockets(sockets)
+
+    def notify(self, status):
+        """Push a notify_status_update to every connected client"""
+        message = {"jsonrpc": "2.0", "method": "notify_status_update"}
+        message["params"] = [status, 0.0]
+        for socket in self.sockets:
+            socket.write_message(json.dumps(message))
+
+
+def test_gcode_over_persistent_websocket():
+    """Test requests are pipelined over one websocket connection"""
+
+    async def scenario():
+        fake = FakeMoonraker()
+        client = MoonrakerClient("127.0.0.1", fake.port)
+        await client.start()
+        assert await client.wait_connected(timeout=5)
+        results = await asyncio.gather(
+            *(client.send_gcode(f"M117 {i}") for i in range(5))
+        )
+        await client.close()
+        fake.server.stop()
+        return fake.scripts, results, client.http_fallbacks
+
+    scripts, results, fallbacks = asyncio.run(scenario())
+    assert results == ["ok"] * 5
+    assert sorted(scripts) == [("ws", f"M117 {i}") for i in range(5)]
+    assert fallbacks == 0
+
+
+def test_emergency_pause_overtakes_queued_requests():
+    """Test PAUSE is written before requests queued ahead of it"""
+
+    async def scenario():
+        fake = FakeMoonraker()
+        client = MoonrakerClient("127.0.0.1", fake.port)
+        await client.start()
+        assert await client.wait_connected(timeout=5)
+        calls = [asyncio.create_task(client.send_gcode(f"M117 {i}")) for i in range(3)]
+        calls.append(asyncio.create_task(client.emergency_pause()))
+        await asyncio.gather(*calls)
+        await client.close()
+        fake.server.stop()
+        return fake.scripts
+
+    scripts = asyncio.run(scenario())
+    assert scripts[0] == ("ws", "PAUSE")
+
+
+def test_http_fallback_and_estop_latency_metric():
+    """Test PAUSE falls back to HTTP and its latency is recorded"""
+
+    async def scenario():
+        fake = FakeMoonraker(websocket=False)
+        performance = PerformanceMonitor()
+        printer = PrinterController(
+            MoonrakerClient("127.0.0.1", fake.port), performance=performance
+        )
+        task = printer.schedule_emergency_stop()
+        assert printer.schedule_emergency_stop() is task  # No duplicate PAUSE
+        await task
+        fake.server.stop()
+        return fake.scripts, printer, performance
+
+    scripts, printer, performance = asyncio.run(scenario())
+    assert scripts == [("http", "PAUSE")]
+    assert printer.client.http_fallbacks == 1
+    assert printer.last_estop_latency > 0
+    assert performance.stages["estop"].count == 1
+
+
+def test_no_http_resend_after_websocket_timeout():
+    """Test a request that timed out after being written is not sent again"""
+    from sentinelowl.services.moonraker_client import MoonrakerError
+
+    async def scenario():
+        fake = FakeMoonraker(respond=False)
+        client = MoonrakerClient("127.0.0.1", fake.port, timeout=0.2)
+        await client.start()
+        assert await client.wait_connected(timeout=5)
+        try:
+            await client.emergency_pause()
+        except MoonrakerError as e:
+            error = e
+        await client.close()
+        fake.server.stop()
+        return fake.scripts, client, error
+
+    scripts, client, error = asyncio.run(scenario())
+    assert "after it was sent" in str(error)
+    assert scripts == [("ws", "PAUSE")]  # PAUSE ran once, not again over HTTP
+    assert client.http_fallbacks == 0
+
+
+def test_print_state_subscription():
+    """Test print state and layer changes are reported from notifications"""
+
+    async def scenario():
+        fake = FakeMoonraker()
+        printer = PrinterController(MoonrakerClient("127.0.0.1", fake.port))
+        states, layers = [], []
+        printer.watch_print_state(states.append, layers.append)
+        await printer.start()
+        assert await printer.client.wait_connected(timeout=5)
+        await asyncio.sleep(0.05)
+        fake.notify({"print_stats": {"state": "printing"}})
+        fake.notify({"print_stats": {"info": {"current_layer": 3}}})
+        await asyncio.sleep(0.05)
+        await printer.close()
+        fake.server.stop()
+        return states, layers
+
+    states, layers = asyncio.run(scenario())
+    assert states == ["standby", "printing"]
+    assert layers == [3]
+
+
+def test_virtual_sdcard_reports_job_start_and_end():
+    """Test job start/end is picked up from virtual_sdcard updates alone"""
+
+    async def scenario():
+        fake = FakeMoonraker()
+        printer = PrinterController(MoonrakerClient("127.0.0.1", fake.port))
+        states = []
+        printer.watch_print_state(states.append)
+        await printer.start()
+        assert await printer.client.wait_connected(timeout=5)
+        await asyncio.sleep(0.05)
+        fake.notify({"virtual_sdcard": {"is_active": True}})
+        fake.notify({"print_stats": {"state": "printing"}})  # No repeat
+        fake.notify({"virtual_sdcard": {"is_active": False}})
+        await asyncio.sleep(0.05)
+        await printer.close()
+        fake.server.stop()
+        return fake.subscribed, states
+
+    subscribed, states = asyncio.run(scenario())
+    assert "virtual_sdcard" in subscribed
+    assert states == ["standby", "printing", "standby"]
+
+
+def test_engine_pauses_once_per_alarm():
+    """Test a lasting critical alarm sends a single PAUSE"""
+    from sentinelowl.config import AppConfig
+    from sentinelowl.core.detector import DetectionResult
+    from sentinelowl.core.engine import SentinelOwl
+
+    async def scenario():
+        fake = FakeMoonraker(websocket=False)
+        owl = SentinelOwl(AppConfig(printer={"port": fake.port}))
+        for _ in range(6):
+            owl._handle_result(DetectionResult(1.0, True, True))
+            await asyncio.sleep(0)
+        await owl.printer._estop_task
+        for _ in range(3):
+            owl._handle_result(DetectionResult(1.0, True, True))
+        await asyncio.sleep(0.05)
+        fake.server.stop()
+        return fake.scripts, owl
+
+    scripts, owl = asyncio.run(scenario())
+    assert owl.get_alarm_state() == "critical"
+    assert scripts == [("http", "PAUSE")]
+
+
+def test_engine_retries_pause_until_accepted():
+    """Test a rejected PAUSE is retried on the next critical tick, not dropped"""
+    from sentinelowl.config import AppConfig
+    from sentinelowl.core.detector import DetectionResult
+    from sentinelowl.core.engine import SentinelOwl
+
+    async def critical_ticks(owl, count):
+        for _ in range(count):
+            owl._handle_result(DetectionResult(1.0, True, True))
+            if owl.printer._estop_task is not None:
+                await asyncio.gather(owl.printer._estop_task, return_exceptions=True)
+
+    async def scenario():
+        fake = FakeMoonraker(websocket=False, http_failures=1)
+        owl = SentinelOwl(AppConfig(printer={"port": fake.port}))
+        await critical_ticks(owl, 4)
+        accepted = list(fake.scripts)
+
+        while owl.get_alarm_state() != "normal":
+            owl._handle_result(DetectionResult(0.0, False, False))
+        await critical_ticks(owl, 4)  # A new alarm pauses again
+        fake.server.stop()
+        return accepted, fake.scripts
+
+    accepted, scripts = asyncio.run(scenario())
+    assert accepted == [("http", "PAUSE")]  # First attempt failed, retry accepted
+    assert scripts == [("http", "PAUSE")] * 2
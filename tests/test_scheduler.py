@@ -0,0 +1,48 @@
+from sentinelowl.config import DetectionConfig
+from sentinelowl.core.scheduler import AdaptiveScheduler
+
+
+def test_scheduler_backs_off_when_stable():
+    """Test the interval grows toward max_interval on a healthy print"""
+    scheduler = AdaptiveScheduler(interval=5, min_interval=1, max_interval=30)
+    for _ in range(20):
+        decision = scheduler.update(0.05)
+    assert decision.interval > 20
+    assert not decision.is_warning
+
+
+def test_scheduler_speeds_up_as_confidence_rises():
+    """Test the interval shrinks to the floor near the warning threshold"""
+    scheduler = AdaptiveScheduler(interval=30, min_interval=1, max_interval=30)
+    scheduler.update(0.1)
+    for _ in range(5):
+        decision = scheduler.update(0.8)
+    assert decision.interval == 1
+    assert scheduler.rate == 1.0
+
+
+def test_scheduler_ignores_single_noisy_frame():
+    """Test one critical frame does not raise a critical alarm"""
+    scheduler = AdaptiveScheduler.from_config(DetectionConfig())
+    for _ in range(5):
+        scheduler.update(0.1)
+    assert not scheduler.update(0.95).is_critical
+
+    decisions = [scheduler.update(0.95) for _ in range(5)]
+    assert decisions[-1].is_critical
+
+
+def test_scheduler_ignores_high_first_frame():
+    """Test a noisy first frame cannot raise an alarm on its own"""
+    scheduler = AdaptiveScheduler.from_config(DetectionConfig())
+    decision = scheduler.update(0.9)
+    assert not decision.is_warning and not decision.is_critical
+    assert scheduler.update(0.1).smoothed_confidence < 0.7
+
+
+def test_scheduler_hysteresis():
+    """Test alarms clear only below threshold minus hysteresis"""
+    scheduler = AdaptiveScheduler(smoothing=1.0, hysteresis=0.05)
+    assert scheduler.update(0.9).is_critical
+    assert scheduler.update(0.82).is_critical
+    assert not scheduler.update(0.79).is_critical
@@ -0,0 +1,102 @@
+import asyncio
+import cv2
+import numpy as np
+from sentinelowl.config import AppConfig
+from sentinelowl.core.detector import DetectionResult
+from sentinelowl.core.engine import SentinelOwl
+from sentinelowl.core.pipeline import PipelineItem
+from sentinelowl.core.snapshot import SnapshotCache, draw_overlay
+from sentinelowl.moonraker_plugin import AIGuardPlugin, mjpeg_parts
+
+FRAME = np.full((120, 160, 3), 64, dtype=np.uint8)
+RESULT = DetectionResult(0.2, False, False)
+
+
+def test_snapshot_encodes_only_when_watched():
+    """Test frames are skipped without viewers and encoded once for many"""
+
+    async def scenario():
+        demands = []
+        cache = SnapshotCache(linger=60.0, on_demand=lambda: demands.append(1))
+        assert not cache.publish(FRAME, RESULT)
+        assert cache.skipped_frames == 1 and cache.encoded_frames == 0
+
+        # A cold request asks for an analysis and waits for its frame
+        request = asyncio.ensure_future(cache.snapshot())
+        await asyncio.sleep(0)
+        assert demands == [1]
+        assert cache.publish(FRAME, RESULT)
+        first = await request
+        assert cv2.imdecode(np.frombuffer(first.jpeg, np.uint8), 1).shape == (
+            120,
+            160,
+            3,
+        )
+
+        # Warm: every client shares the cached bytes without re-encoding
+        snapshots = await asyncio.gather(*(cache.snapshot() for _ in range(5)))
+        assert all(snapshot.jpeg is first.jpeg for snapshot in snapshots)
+        assert cache.encoded_frames == 1 and demands == [1]
+
+    asyncio.run(scenario())
+
+
+def test_snapshot_stream_subscribers():
+    """Test stream subscribers get each new frame and unsubscribe cleanly"""
+
+    async def scenario():
+        cache = SnapshotCache(linger=0.0)
+        streams = [cache.stream() for _ in range(2)]
+        pending = [asyncio.ensure_future(stream.__anext__()) for stream in streams]
+        await asyncio.sleep(0)
+        assert cache.subscribers == 2
+        cache.publish(FRAME, DetectionResult(0.9, True, True))
+        first, second = await asyncio.gather(*pending)
+        assert first is second
+        for stream in streams:
+            await stream.aclose()
+        assert cache.subscribers == 0
+        assert not cache.publish(FRAME, RESULT)  # Nobody left to encode for
+
+    asyncio.run(scenario())
+
+
+def test_draw_overlay_boxes():
+    """Test boxes are drawn in the result's colour and the input is kept"""
+    result = DetectionResult(
+        0.95,
+        True,
+        True,
+        boxes=np.array([[20, 30, 80, 90]], dtype=np.float32),
+        scores=np.array([0.95], dtype=np.float32),
+        classes=np.array([0]),
+        defect_type="spaghetti",
+    )
+    image = draw_overlay(FRAME.copy(), result)
+    assert tuple(image[60, 20]) == (0, 0, 255)  # Left edge, critical red
+    assert tuple(image[60, 50]) == (64, 64, 64)  # Box interior untouched
+    assert (FRAME == 64).all()
+
+
+def test_plugin_snapshot_and_stream():
+    """Test the plugin serves the engine's analysed frames"""
+
+    async def scenario():
+        owl = SentinelOwl(AppConfig())
+        plugin = AIGuardPlugin(owl.config, engine=owl)
+        request = asyncio.ensure_future(plugin.get_snapshot())
+        await asyncio.sleep(0)
+        assert owl._wakeup.is_set()  # The snapshot asked for an analysis
+        owl._act(PipelineItem(FRAME, 0.0, 1, result=RESULT))
+        response = await request
+        assert response.media_type == "image/jpeg"
+        assert response.body == owl.snapshots.latest().jpeg
+
+        parts = mjpeg_parts(owl.snapshots)
+        header = await parts.__anext__()
+        assert header.startswith(b"--frame\r\nContent-Type: image/jpeg")
+        assert await parts.__anext__() is owl.snapshots.latest().jpeg
+        await parts.aclose()
+        assert owl.snapshots.subscribers == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,72 @@
+import json
+from click.testing import CliRunner
+from sentinelowl.cli import cli
+from sentinelowl.scripts.soak import check_slopes, growth_slopes, run_soak
+
+
+def _samples(rss_per_hour, hours=1.0, count=13):
+    return [
+        {
+            "t": hours * 3600 * i / (count - 1),
+            "rss_mb": 100.0 + rss_per_hour * hours * i / (count - 1),
+            "traced_mb": 10.0,
+            "fds": 7 + (i == 0) * 5,  # Opened during the warm-up only
+            "threads": 4,
+            "tasks": 8 + i % 2,
+        }
+        for i in range(count)
+    ]
+
+
+def test_growth_slopes_flag_leaks():
+    """Test slopes are fitted after the warm-up and checked against budgets"""
+    slopes = growth_slopes(_samples(rss_per_hour=120.0), warmup=60.0)
+    assert abs(slopes["rss_mb"] - 120.0) < 1e-6
+    assert abs(slopes["fds"]) < 1e-6  # The warm-up step is ignored
+    assert check_slopes(slopes) == ["rss_mb grows +120.00/h > 64.0/h"]
+    assert check_slopes(growth_slopes(_samples(rss_per_hour=2.0))) == []
+    assert growth_slopes(_samples(0.0)[:1]) == {}
+
+
+def test_run_soak_report():
+    """Test a short soak samples resources while clients come and go"""
+    report = run_soak(
+        source="synthetic://160x120",
+        duration=2.0,
+        rate=50.0,
+        sample_interval=0.5,
+        threaded=True,
+        max_slopes={metric: None for metric in ("rss_mb", "traced_mb", "tasks")},
+    )
+    assert report["frames"] > 10
+    assert len(report["samples"]) >= 4
+    assert report["websocket_messages"] > 0
+    assert all(sample["clients"] == 0 for sample in report["samples"])
+    assert {sample["threads"] for sample in report["samples"][1:]} == {
+        report["samples"][-1]["threads"]
+    }
+    assert report["failures"] == []
+    json.dumps(report)
+
+
+def test_soak_command_fails_on_growth(tmp_path):
+    """Test the soak command writes JSON and exits non-zero past a budget"""
+    json_path = tmp_path / "soak.json"
+    result = CliRunner().invoke(
+        cli,
+        [
+            "soak",
+            "--source",
+            "synthetic://160x120",
+            "--duration",
+            "1",
+            "--sample-interval",
+            "0.25",
+            "--json",
+            str(json_path),
+            "--max-fd-slope",
+            "-1",
+        ],
+    )
+    assert result.exit_code == 1
+    assert json.loads(json_path.read_text())["failures"]
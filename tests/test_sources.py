@@ -0,0 +1,358 @@
+import sys
+import shutil
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import cv2
+import numpy as np
+import pytest
+from sentinelowl.config import CameraConfig
+from sentinelowl.core.camera import CameraHandler
+from sentinelowl.core.sources import (
+    FfmpegSource,
+    MjpegSource,
+    SnapshotSource,
+    is_buffered_source,
+)
+from sentinelowl.core.sources.ffmpeg import (
+    FrameInfo,
+    build_command,
+    ffmpeg_version,
+    parse_showinfo,
+)
+from sentinelowl.utils.http_pool import HTTPConnectionPool, shared_pool
+
+
+def _jpeg(value, size=(160, 120)):
+    image = np.full((size[1], size[0], 3), value, dtype=np.uint8)
+    return cv2.imencode(".jpg", image)[1].tobytes()
+
+
+class _MjpegHandler(BaseHTTPRequestHandler):
+    frames = [_jpeg(v) for v in range(0, 250, 10)]
+    with_length = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header(
+            "Content-Type", "multipart/x-mixed-replace; boundary=boundarydonotcross"
+        )
+        self.end_headers()
+        try:
+            for i in range(1000):
+                jpeg = self.frames[i % len(self.frames)]
+                self.wfile.write(b"--boundarydonotcross\r\n")
+                self.wfile.write(b"Content-Type: image/jpeg\r\n")
+                if self.with_length:
+                    self.wfile.write(f"Content-Length: {len(jpeg)}\r\n".encode())
+                self.wfile.write(b"\r\n" + jpeg + b"\r\n")
+                time.sleep(0.005)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def mjpeg_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MjpegHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/?action=stream"
+    server.shutdown()
+    server.server_close()
+
+
+def test_mjpeg_source_decodes_on_demand(mjpeg_server):
+    """Test only requested frames are decoded, at reduced scale"""
+    source = MjpegSource(mjpeg_server, timeout=5, decode_scale=2)
+    try:
+        frame = source.wait(timeout=5)
+        assert frame is not None
+        assert frame.image.shape == (60, 80, 3)
+
+        newer = source.wait(after_sequence=frame.sequence + 20, timeout=5)
+        assert newer is not None
+        assert source.frames_received > 20
+        assert source.frames_decoded == 2
+    finally:
+        source.release()
+
+
+def test_mjpeg_source_without_content_length(mjpeg_server, monkeypatch):
+    """Test parts are split on the boundary when Content-Length is missing"""
+    monkeypatch.setattr(_MjpegHandler, "with_length", False)
+    source = MjpegSource(mjpeg_server, timeout=5)
+    try:
+        ret, image = source.read()
+        assert ret
+        assert image.shape == (120, 160, 3)
+    finally:
+        source.release()
+
+
+def test_camera_handler_uses_mjpeg_source(mjpeg_server):
+    """Test threaded CameraHandler reads through the native MJPEG source"""
+    camera = CameraHandler(CameraConfig(url=mjpeg_server, threaded=True))
+    try:
+        assert isinstance(camera.cap, MjpegSource)
+        assert camera.wait_frame(timeout=5) is not None
+        assert camera.capture_frame() is not None
+    finally:
+        camera.release()
+
+
+def test_synchronous_mjpeg_camera_starts_no_receiver():
+    """Test a down unthreaded camera spawns no thread and reports failure"""
+    before = threading.active_count()
+    camera = CameraHandler(CameraConfig(url="http://127.0.0.1:9/?action=stream"))
+    try:
+        assert camera.cap is None  # Not reported as connected
+        assert threading.active_count() == before
+    finally:
+        camera.release()
+
+
+def test_synchronous_mjpeg_camera(mjpeg_server):
+    """Test an unthreaded camera reads MJPEG parts natively in read()"""
+    camera = CameraHandler(CameraConfig(url=mjpeg_server))
+    try:
+        assert isinstance(camera.cap, MjpegSource)
+        assert camera.cap._thread is None  # No receiver thread
+        for _ in range(3):
+            assert camera.capture_frame().shape == (120, 160, 3)
+        assert camera.cap.frames_received == 3
+    finally:
+        camera.release()
+    assert not camera.cap.connected
+
+
+class _SnapshotHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    jpeg = _jpeg(128)
+    etag = '"frame-1"'
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(self.jpeg)))
+        self.end_headers()
+        self.wfile.write(self.jpeg)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def snapshot_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SnapshotHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/?action=snapshot"
+    server.shutdown()
+    server.server_close()
+
+
+def test_snapshot_source_reuses_connection(snapshot_server):
+    """Test polling reuses one keep-alive connection and honours ETags"""
+    pool = HTTPConnectionPool()
+    source = SnapshotSource(snapshot_server, poll_interval=60, timeout=5, pool=pool)
+    try:
+        frame = source.wait(timeout=5)
+        assert frame is not None
+        assert frame.image.shape == (120, 160, 3)
+
+        assert not source.poll()  # 304 Not Modified
+        assert not source.poll()
+        assert source.not_modified == 2
+        assert source.frames_received == 1
+        assert pool.connections_created == 1
+    finally:
+        source.release()
+        pool.close()
+
+
+def test_camera_handler_snapshot_type(snapshot_server):
+    """Test CameraConfig.type = "snapshot" opens a shared-pool source"""
+    config = CameraConfig(url=snapshot_server, type="snapshot", threaded=True)
+    camera = CameraHandler(config)
+    try:
+        assert isinstance(camera.cap, SnapshotSource)
+        assert camera.cap.pool is shared_pool()
+        assert camera.wait_frame(timeout=5) is not None
+    finally:
+        camera.release()
+
+
+def test_synchronous_snapshot_camera(snapshot_server):
+    """Test an unthreaded snapshot camera polls in read() and survives a 304"""
+    camera = CameraHandler(CameraConfig(url=snapshot_server, type="snapshot"))
+    try:
+        assert isinstance(camera.cap, SnapshotSource)
+        assert camera.cap._thread is None  # No background polling
+        for _ in range(5):  # Unchanged image: 304 every time after the first
+            assert camera.capture_frame() is not None
+        assert camera.cap.not_modified >= 5
+    finally:
+        camera.release()
+
+    down = CameraHandler(CameraConfig(url="http://127.0.0.1:9/", type="snapshot"))
+    assert down.cap is None  # Not reported as connected
+
+
+def test_ffmpeg_command_and_showinfo():
+    """Test the ffmpeg reduced-decode options and frame metadata parsing"""
+    command = build_command(
+        "rtsp://cam/stream", decode_mode="keyframes", frame_step=5, decode_scale=2
+    )
+    assert command[command.index("-skip_frame") + 1] == "nokey"
+    assert command.index("-skip_frame") < command.index("-i")
+    assert "select=not(mod(n\\,5)),scale=iw/2:ih/2" in command[command.index("-vf") + 1]
+    assert "-rtsp_transport" in command
+    # Frames keep their timestamps instead of being duplicated to a fixed rate
+    assert command[command.index("-fps_mode") + 1] == "passthrough"
+    assert command.index("-vf") < command.index("-fps_mode") < command.index("-f")
+    legacy = build_command("clip.mp4", legacy_vsync=True)
+    assert legacy[legacy.index("-vsync") + 1] == "passthrough"
+    assert "-fps_mode" not in legacy
+
+    line = (
+        "[Parsed_showinfo_2 @ 0x55d0] n:  12 pts: 491520 pts_time:40.96 "
+        "duration: 1024 fmt:bgr24 cl:unspecified sar:1/1 s:960x540 i:P iskey:1"
+    )
+    assert parse_showinfo(line) == FrameInfo(12, 40.96, 960, 540)
+    assert parse_showinfo("Stream #0:0: Video: h264, yuv420p, 1920x1080") is None
+
+
+@pytest.fixture
+def h264_file(tmp_path):
+    if shutil.which("ffmpeg") is None:
+        pytest.skip("ffmpeg is not installed")
+    path = str(tmp_path / "clip.mp4")
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", "testsrc=size=320x240:rate=25"]
+        + ["-t", "4", "-g", "10", "-c:v", "mpeg4", "-an", path],
+        check=True,
+    )
+    return path
+
+
+def _read_all(source, timeout=10):
+    frames = []
+    while True:
+        frame = source.wait(frames[-1].sequence if frames else 0, timeout=timeout)
+        if frame is None:
+            return frames
+        frames.append(frame)
+        timeout = 2
+
+
+def test_ffmpeg_source_keyframes_only(h264_file):
+    """Test keyframe mode decodes one frame per GOP into reused buffers"""
+    every = FfmpegSource(h264_file, reconnect_interval=60)
+    keyframes = FfmpegSource(h264_file, decode_mode="keyframes", reconnect_interval=60)
+    try:
+        all_frames = _read_all(every)
+        key_frames = _read_all(keyframes)
+    finally:
+        every.release()
+        keyframes.release()
+
+    assert len(all_frames) == 100
+    assert len(key_frames) == 10
+    assert [round(f.pts, 2) for f in key_frames[:3]] == [0.0, 0.4, 0.8]
+    assert key_frames[0].image.shape == (240, 320, 3)
+
+
+def test_ffmpeg_version(tmp_path):
+    """Test the version probe that picks -vsync for ffmpeg before 5.1"""
+    fake = tmp_path / "ffmpeg"
+    fake.write_text(
+        f"#!{sys.executable}\n"
+        "print('ffmpeg version 4.3.6-0+deb11u1 Copyright (c) 2000-2023')\n"
+    )
+    fake.chmod(0o755)
+    assert ffmpeg_version(str(fake)) == (4, 3)
+    assert ffmpeg_version(str(tmp_path / "missing")) is None
+
+
+def test_ffmpeg_source_sends_no_duplicate_frames(tmp_path):
+    """Test selected frames reach stdout once each, matching their pts"""
+    if shutil.which("ffmpeg") is None:
+        pytest.skip("ffmpeg is not installed")
+    # Frame n is a flat grey that brightens with n, so content tracks pts
+    path = str(tmp_path / "ramp.mp4")
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-f", "lavfi"]
+        + ["-i", "nullsrc=size=64x48:rate=25,geq=lum='16+2*N':cb=128:cr=128"]
+        + ["-frames:v", "100", "-c:v", "mpeg4", "-q:v", "2", "-an", path],
+        check=True,
+    )
+    source = FfmpegSource(path, frame_step=5, reconnect_interval=60)
+    try:
+        frames = _read_all(source)
+    finally:
+        source.release()
+
+    assert source.frames_decoded == 20  # 100 frames, every 5th kept
+    indices = [frame.pts * 25 for frame in frames]
+    assert np.allclose(indices, np.round(np.array(indices) / 5) * 5, atol=0.1)
+    # A duplicated frame would repeat its predecessor's grey under a newer pts
+    means = [frame.image.mean() for frame in frames]
+    assert all(b - a > 5 for a, b in zip(means, means[1:]))
+
+
+FAKE_FFMPEG = """#!{python}
+import sys, time
+for i in range({frames}):
+    sys.stderr.write(
+        "[Parsed_showinfo_1 @ 0x1] n:%4d pts:%7d pts_time:%g "
+        "fmt:bgr24 sar:1/1 s:32x24 i:P iskey:1\\n" % (i, i * 40, i * 0.04)
+    )
+    sys.stderr.flush()
+    sys.stdout.buffer.write(bytes([i]) * (32 * 24 * 3))
+    sys.stdout.buffer.flush()
+    time.sleep(0.01)
+"""
+
+
+def test_ffmpeg_source_hands_out_copies(tmp_path):
+    """Test frames stay intact after the reader reuses their ring slot"""
+    fake = tmp_path / "ffmpeg"
+    fake.write_text(FAKE_FFMPEG.format(python=sys.executable, frames=12))
+    fake.chmod(0o755)
+    source = FfmpegSource("clip.mp4", reconnect_interval=60, ffmpeg_path=str(fake))
+    try:
+        frames = _read_all(source)
+    finally:
+        source.release()
+
+    assert len(frames) >= 6  # wait() may skip frames, never repeat them
+    assert frames[-1].image.shape == (24, 32, 3)
+    for frame in frames:
+        # Each frame still holds its own pixels, long after its slot was reused
+        assert (frame.image == frame.sequence - 1).all()
+        assert frame.pts == pytest.approx((frame.sequence - 1) * 0.04)
+
+
+def test_unthreaded_rtsp_skips_ffmpeg(tmp_path):
+    """Test only threaded RTSP cameras, which poll latest(), use ffmpeg"""
+    fake = tmp_path / "ffmpeg"
+    fake.write_text(FAKE_FFMPEG.format(python=sys.executable, frames=1))
+    fake.chmod(0o755)
+    config = CameraConfig(
+        url="rtsp://127.0.0.1:9/stream", type="rtsp", ffmpeg_path=str(fake)
+    )
+    assert not is_buffered_source(config)
+    assert is_buffered_source(config.model_copy(update={"threaded": True}))
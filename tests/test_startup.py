@@ -0,0 +1,55 @@
+import os
+import sys
+import subprocess
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "src")
+HEAVY_MODULES = ("cv2", "numpy", "onnxruntime", "pydantic", "fastapi", "tornado")
+
+# Import-time budgets (ms) for the code under test, excluding interpreter startup
+VERSION_BUDGET_MS = 150
+PLUGIN_BUDGET_MS = 50
+
+VERSION = "from sentinelowl.cli import cli; cli(['version'], standalone_mode=False)"
+PLUGIN = "import sentinelowl.moonraker_plugin"
+
+
+def _run(code: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([SRC, *sys.path]))
+    report = (
+        f"import sys; print(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"{code}\n{report}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+
+def _import_ms(stderr: str) -> float:
+    """Sum the top-level cumulative import times after interpreter startup"""
+    total, started = 0, False
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if started and not name.startswith("  "):
+            total += int(cumulative)
+        started = started or name.strip() == "site"
+    return total / 1000
+
+
+def test_version_command_startup_budget():
+    """Test `sentinelowl version` loads no heavy dependency and stays in budget"""
+    result = _run(VERSION)
+    assert "SentinelOwl version" in result.stdout
+    assert result.stdout.strip().endswith("[]")
+    assert _import_ms(result.stderr) < VERSION_BUDGET_MS
+
+
+def test_plugin_import_startup_budget():
+    """Test plugin discovery loads no heavy dependency and stays in budget"""
+    result = _run(PLUGIN)
+    assert result.stdout.strip() == "[]"
+    assert _import_ms(result.stderr) < PLUGIN_BUDGET_MS
@@ -0,0 +1,76 @@
+import os
+import queue
+import signal
+import numpy as np
+import pytest
+from sentinelowl.config import ModelConfig
+from sentinelowl.core.detector import DefectDetector, DetectionResult
+from sentinelowl.core.workers import InferencePool
+
+MNIST_MODEL = os.path.join(os.path.dirname(__file__), "..", "models", "mnist-12.onnx")
+
+
+def test_inference_pool_runs_frames():
+    """Test frames are scored by worker processes via shared memory"""
+    config = ModelConfig(type="onnx", path=MNIST_MODEL, class_index=0)
+    pool = InferencePool(config, workers=2, slots=2, slot_bytes=640 * 480 * 3)
+    try:
+        frames = [np.full((480, 640, 3), v, dtype=np.uint8) for v in range(0, 200, 25)]
+        futures = [pool.submit(frame) for frame in frames]
+        for future in futures:
+            confidence, is_warning, is_critical = future.result(timeout=60)
+            assert 0.0 <= confidence <= 1.0
+            assert isinstance(is_warning, bool)
+
+        with pytest.raises(ValueError):
+            pool.submit(np.zeros((1080, 1920, 3), dtype=np.uint8))
+    finally:
+        pool.close()
+
+
+def test_detector_uses_inference_pool():
+    """Test ModelConfig.workers selects the process-pool execution mode"""
+    detector = DefectDetector(ModelConfig(workers=1, max_frame_bytes=64 * 64 * 3))
+    try:
+        assert isinstance(detector.model, InferencePool)
+        result = detector.analyze(np.zeros((64, 64, 3), dtype=np.uint8))
+        assert isinstance(result, DetectionResult)
+    finally:
+        detector.close()
+
+
+def test_inference_pool_reports_worker_failures():
+    """Test load errors, dead workers and timeouts surface instead of hanging"""
+    with pytest.raises(RuntimeError, match="failed to load model"):
+        InferencePool(ModelConfig(type="onnx", path="/nonexistent/model.onnx"))
+
+    frame = np.zeros((64, 64, 3), dtype=np.uint8)
+    pool = InferencePool(
+        ModelConfig(type="onnx", path=MNIST_MODEL, class_index=0), workers=1, slots=1
+    )
+    try:
+        # A stalled worker: the prediction times out, but its slot only comes
+        # back once the worker is done with the frame in it
+        worker = pool._processes[0]
+        os.kill(worker.pid, signal.SIGSTOP)
+        pool.timeout = 0.5
+        with pytest.raises(TimeoutError):
+            pool.predict(frame)
+        assert pool._free_slots.qsize() == 0
+        with pytest.raises(queue.Empty):
+            pool.submit(frame)  # The slot count still bounds the work queued
+        os.kill(worker.pid, signal.SIGCONT)
+        pool.timeout = 30.0
+        assert 0.0 <= pool.predict(frame)[0] <= 1.0
+        assert pool._abandoned == {}
+
+        # A dead worker fails the prediction in flight and every later one
+        worker.kill()
+        worker.join()
+        future = pool.submit(frame)
+        with pytest.raises(RuntimeError, match="worker exited"):
+            future.result(timeout=10)
+        with pytest.raises(RuntimeError, match="worker exited"):
+            pool.submit(frame)
+    finally:
+        pool.close()